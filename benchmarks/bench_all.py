@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the all command on a large
+storage: time to the first byte written, total time and peak memory
+allocated while printing.
+
+Usage: python3 benchmarks/bench_all.py [number of objects]
+    (default: 200000)
+
+    before  the previous do_all(): the list of the string
+            representations of every object is built, then printed
+    after   the all command, printing objects by chunks as they are
+            iterated
+    page    the all command with limit=100 (one page)
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+class Sink:
+    """Output discarding what is written, recording when the first
+    write happened"""
+
+    def __init__(self):
+        self.first = None
+
+    def write(self, text):
+        if self.first is None:
+            self.first = time.perf_counter()
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def before():
+    """Print every user like the previous do_all() did"""
+    listed_objs = [str(obj) for obj in storage.all("User").values()]
+    print(listed_objs)
+
+
+def measure(run):
+    """Return the time to the first byte (s), the total time (s) and
+    the peak memory allocated (MB) by 'run'"""
+    sink = Sink()
+    with redirect_stdout(sink):
+        start = time.perf_counter()
+        run()
+        total = time.perf_counter() - start
+    first = sink.first - start
+    tracemalloc.start()
+    with redirect_stdout(Sink()):
+        run()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return first, total, peak
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for i in range(count):
+        User().email = f"user{i}@hbnb.io"
+    console = HBNBCommand()
+    print(f"{count} objects")
+    print(f"{'':>7} {'first byte (s)':>15} {'total (s)':>10} "
+          f"{'peak (MB)':>10}")
+    for name, run in [("before", before),
+                      ("after", lambda: console.onecmd("all User")),
+                      ("page", lambda: console.onecmd("all User limit=100"))]:
+        first, total, peak = measure(run)
+        print(f"{name:>7} {first:>15.4f} {total:>10.3f} {peak:>10.1f}")
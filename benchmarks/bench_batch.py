@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the console running a script of
+create and update commands, with and without batch mode.
+
+Usage: python3 benchmarks/bench_batch.py [number of commands]
+    (default: 100000)
+
+The script creates users then updates each of them (half of the
+commands each). It is run:
+    batch   with ./console.py --batch (the file is written once)
+    piped   piped to ./console.py (the file is written after every
+            command), on a smaller script as it gets slower with the
+            number of objects
+"""
+
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONSOLE = os.path.join(REPO, "console.py")
+PIPED_COMMANDS = 2000
+
+
+def run(commands, batch):
+    """Run 'commands' creates then updates in a new directory and
+    return the number of commands per second"""
+    os.chdir(tempfile.mkdtemp())
+    creates = commands // 2
+    args = [sys.executable, CONSOLE] + (["--batch"] if batch else [])
+    start = time.perf_counter()
+    created = subprocess.run(args, input="create User\n" * creates,
+                             capture_output=True, text=True, check=True)
+    # Without --batch, the output also holds the intro and prompts
+    ids = re.findall(r"[0-9a-f-]{36}", created.stdout)
+    updates = "".join(f'update User {id_} email "user{i}@hbnb.io"\n'
+                      for i, id_ in enumerate(ids))
+    subprocess.run(args, input=updates, capture_output=True, text=True,
+                   check=True)
+    elapsed = time.perf_counter() - start
+    assert len(ids) == creates
+    return 2 * creates / elapsed
+
+
+if __name__ == "__main__":
+    commands = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{'mode':>6} {'commands':>9} {'commands/s':>11}")
+    print(f"{'batch':>6} {commands:>9} {run(commands, True):>11.0f}")
+    piped = min(commands, PIPED_COMMANDS)
+    print(f"{'piped':>6} {piped:>9} {run(piped, False):>11.0f}")
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the console parsing and running
+a large stream of mixed <class name>.<method>(...) commands.
+
+Usage: python3 benchmarks/bench_console.py [number of commands]
+    (default: 200000)
+
+The storage holds a few users and places. The stream mixes all(),
+count(), show(), destroy() of a missing instance, update() with an
+attribute and with a dictionary, where(), near(), relations and
+unknown commands. It prints the number of commands per second:
+    parse   parsed into a handler and its arguments
+            (HBNBCommand.parse_dot_command())
+    run     parsed and run (HBNBCommand.onecmd()), in a batch (see
+            storage.begin()) so the file is not written, the output
+            of the commands is discarded
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def command_stream(count, user_id, place_id):
+    """Return 'count' mixed commands"""
+    commands = [
+        "Amenity.all()",
+        "User.count()",
+        f'User.show("{user_id}")',
+        'User.show("missing")',
+        'Place.destroy("missing")',
+        f'User.update("{user_id}", "first_name", "Betty")',
+        f'User.update("{user_id}", {{"last_name": "H", "age": 30}})',
+        "Place.where(number_rooms>=3, price_by_night<100)",
+        "Place.near(10.0, 20.0, 5)",
+        f'User.places("{user_id}")',
+        f'Place.reviews("{place_id}")',
+        "State.bogus()",
+    ]
+    return [commands[i % len(commands)] for i in range(count)]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    user = User()
+    for i in range(5):
+        place = Place()
+        place.user_id = user.id
+        place.number_rooms = i
+        place.latitude = 10.0 + i
+        place.longitude = 20.0
+    storage.save()
+    stream = command_stream(count, user.id, place.id)
+    with redirect_stdout(io.StringIO()):
+        # Unknown commands are reported to the stdout of the console
+        console = HBNBCommand()
+        start = time.perf_counter()
+        for line in stream:
+            console.parse_dot_command(line)
+        parse = time.perf_counter() - start
+        storage.begin()
+        start = time.perf_counter()
+        for line in stream:
+            console.onecmd(line)
+        run = time.perf_counter() - start
+        storage.commit()
+    print(f"{count} commands")
+    print(f"parse: {count / parse:>9.0f} commands/s")
+    print(f"  run: {count / run:>9.0f} commands/s")
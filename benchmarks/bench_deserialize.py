@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a micro-benchmark of the deserialization of
+objects (what FileStorage.reload() does for every record).
+
+Usage: python3 benchmarks/bench_deserialize.py [number of records]
+    (default: 500000)
+
+A file of records of every class is generated and loaded with json,
+then the records are turned into objects with:
+    before  the previous reload() loop: the class dictionary rebuilt
+            for every record, re.sub + strptime for both datetimes and
+            setattr for every attribute
+    after   FileStorage._load_dicts(): cached class registry,
+            BaseModel.from_dict() and datetime.fromisoformat()
+"""
+
+from datetime import datetime
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+
+CLASS_ATTRS = {"BaseModel": {},
+               "User": {"email": "betty@hbnb.io", "first_name": "Betty"},
+               "State": {"name": "California"},
+               "City": {"state_id": "0001", "name": "San Francisco"},
+               "Amenity": {"name": "Wifi"},
+               "Place": {"city_id": "0001", "user_id": "0001",
+                         "name": "Loft", "max_guest": 4,
+                         "price_by_night": 120},
+               "Review": {"place_id": "0001", "user_id": "0001",
+                          "text": "Great"}}
+
+
+def generate(path, size):
+    """Write a file.json of 'size' records of every class at 'path'"""
+    records = {}
+    class_names = list(CLASS_ATTRS)
+    for i in range(size):
+        class_name = class_names[i % len(class_names)]
+        obj_id = str(uuid.uuid4())
+        obj_dict = {"id": obj_id, "created_at": "2024-02-18T07:24:55.583025",
+                    "updated_at": "2024-02-18T07:24:55.583038"}
+        obj_dict.update(CLASS_ATTRS[class_name])
+        obj_dict["__class__"] = class_name
+        records[f"{class_name}.{obj_id}"] = obj_dict
+    with open(path, 'w') as f:
+        json.dump(records, f)
+
+
+def legacy_classes():
+    """Class dictionary as it was rebuilt for every record"""
+    from models.base_model import BaseModel
+    from models.user import User
+    from models.state import State
+    from models.city import City
+    from models.amenity import Amenity
+    from models.place import Place
+    from models.review import Review
+    return {"BaseModel": BaseModel, "User": User, "State": State,
+            "City": City, "Amenity": Amenity, "Place": Place,
+            "Review": Review}
+
+
+def legacy_load(records):
+    """Build the objects of 'records' the way reload() used to"""
+    objects = {}
+    for key, obj_dict in records.items():
+        cls = legacy_classes()[obj_dict["__class__"]]
+        obj = cls.__new__(cls)
+        # BaseModel.__setattr__ (dirty tracking) didn't exist then
+        set_attr = object.__setattr__
+        set_attr(obj, "id", str(uuid.uuid4()))
+        set_attr(obj, "created_at", datetime.now())
+        set_attr(obj, "updated_at", datetime.now())
+        for name, value in obj_dict.items():
+            time_fmt = '%Y-%m-%d %H:%M:%S.%f'
+            if name == "id":
+                set_attr(obj, "id", str(value))
+            elif name in ("created_at", "updated_at"):
+                value_fmt = re.sub('T', ' ', value)
+                set_attr(obj, name, datetime.strptime(value_fmt, time_fmt))
+            elif name != "__class__":
+                set_attr(obj, name, value)
+        objects[key] = obj
+    return objects
+
+
+def timed(function, *args):
+    """Return the time (seconds) taken by function(*args)"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    generate("file.json", size)
+    with open("file.json", 'r') as f:
+        records = json.load(f)
+    before = timed(legacy_load, records)
+    storage._reset()
+    after = timed(storage._load_dicts, records)
+    print(f"{'path':>8} {'seconds':>10} {'records/s':>12}")
+    for name, seconds in (("before", before), ("after", after)):
+        print(f"{name:>8} {seconds:>10.2f} {size / seconds:>12.0f}")
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the spatial queries on Place
+objects (storage.within, storage.near and storage.nearest) compared to
+a scan of every Place.
+
+Usage: python3 benchmarks/bench_geo.py [number of places]
+    (default: 1000000)
+
+Places are spread over the continental United States. The time reported
+for the spatial queries is the mean over 1000 random queries, the first
+query (building the index) is reported separately.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.engine.geo_index import distance  # noqa: E402
+
+BOX = (25.0, -125.0, 49.0, -67.0)
+QUERIES = 1000
+
+
+def add_places(count):
+    """Store 'count' places at random positions in BOX"""
+    Place = storage.classes()["Place"]
+    min_lat, min_lon, max_lat, max_lon = BOX
+    for i in range(count):
+        storage._add(f"Place.{i}", Place.from_dict({
+            "id": str(i),
+            "latitude": random.uniform(min_lat, max_lat),
+            "longitude": random.uniform(min_lon, max_lon)}))
+
+
+def random_point():
+    """Return a random (latitude, longitude) in BOX"""
+    min_lat, min_lon, max_lat, max_lon = BOX
+    return random.uniform(min_lat, max_lat), random.uniform(min_lon, max_lon)
+
+
+def mean_time(query):
+    """Return the mean time (s) of QUERIES calls of 'query' on random
+    points and the mean number of objects returned"""
+    points = [random_point() for i in range(QUERIES)]
+    found = 0
+    start = time.perf_counter()
+    for latitude, longitude in points:
+        found += len(query(latitude, longitude))
+    return (time.perf_counter() - start) / QUERIES, found / QUERIES
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    random.seed(0)
+    add_places(count)
+    places = storage.all("Place")
+
+    start = time.perf_counter()
+    storage.near("Place", 37.77, -122.41, 5)
+    print(f"index build: {time.perf_counter() - start:.2f} s")
+
+    latitude, longitude = random_point()
+    start = time.perf_counter()
+    [obj for obj in places.values()
+     if distance(latitude, longitude, obj.latitude, obj.longitude) <= 5]
+    print(f"scan of {count} places: {time.perf_counter() - start:.2f} s")
+
+    queries = {
+        "near 5 km": lambda lat, lon: storage.near("Place", lat, lon, 5),
+        "nearest 10": lambda lat, lon: storage.nearest("Place", lat, lon,
+                                                       10),
+        "within 0.2 x 0.2 deg": lambda lat, lon: storage.within(
+            "Place", lat, lon, lat + 0.2, lon + 0.2)}
+    for name, query in queries.items():
+        seconds, found = mean_time(query)
+        print(f"{name:>21}: {seconds * 1000:.3f} ms "
+              f"({found:.0f} places per query)")
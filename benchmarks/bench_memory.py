@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the memory used per object by
+the regular and the compact (HBNB_COMPACT_MODELS=1) model classes.
+
+Usage: python3 benchmarks/bench_memory.py [objects per class]
+    (default: 100000)
+
+Objects are built with from_dict() (as reload() does) with values for
+every declared attribute. The memory reported includes the attribute
+values (strings and datetimes) that are not shared between objects.
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.compact import compact_class  # noqa: E402
+
+CLASS_ATTRS = {"User": {"email": "betty@hbnb.io", "password": "pwd",
+                        "first_name": "Betty", "last_name": "Holberton"},
+               "State": {"name": "California"},
+               "City": {"state_id": "0001", "name": "San Francisco"},
+               "Amenity": {"name": "Wifi"},
+               "Place": {"city_id": "0001", "user_id": "0001",
+                         "name": "Loft", "description": "Nice",
+                         "number_rooms": 2, "number_bathrooms": 1,
+                         "max_guest": 4, "price_by_night": 120,
+                         "latitude": 37.77, "longitude": -122.41},
+               "Review": {"place_id": "0001", "user_id": "0001",
+                          "text": "Great"}}
+
+
+def per_object(cls, attrs, count):
+    """Return the memory (bytes) used per object of class 'cls'"""
+    tracemalloc.start()
+    objects = []
+    for i in range(count):
+        obj_dict = {"id": str(uuid.uuid4()),
+                    "created_at": "2024-02-18T07:24:55.583025",
+                    "updated_at": "2024-02-18T07:24:55.583038"}
+        obj_dict.update(attrs)
+        objects.append(cls.from_dict(obj_dict))
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used / count
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    classes = storage.classes()
+    print(f"{'class':>8} {'regular (B)':>12} {'compact (B)':>12}")
+    for name, attrs in CLASS_ATTRS.items():
+        regular = per_object(classes[name], attrs, count)
+        compact = per_object(compact_class(classes[name]), attrs, count)
+        print(f"{name:>8} {regular:>12.0f} {compact:>12.0f}")
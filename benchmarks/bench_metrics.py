@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the overhead of the metrics (see
+models.engine.metrics) on a stream of console commands.
+
+Usage: python3 benchmarks/bench_metrics.py [number of commands]
+    (default: 100000)
+
+The storage holds a few users and places, and the commands (show,
+count, update, where() and all()) run in a batch (the file is not
+written), with:
+    off         metrics off (the default): nothing is timed, the
+                methods are the original ones (HBNBCommand.onecmd is
+                cmd.Cmd.onecmd)
+    on          metrics on (stats on): commands and storage methods
+                recorded
+    profile     metrics on and profile mode (cProfile and tracemalloc)
+Each stream is run 5 times: the fastest run is reported, with the
+spread between the fastest and the slowest run (the noise of the
+measure).
+"""
+
+import cmd
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from console import HBNBCommand  # noqa: E402
+from models import metrics, storage  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.user import User  # noqa: E402
+
+RUNS = 5
+
+
+class Sink:
+    """Output discarding what is written"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def command_stream(count, user_id):
+    """Return 'count' mixed commands"""
+    commands = [
+        f"show User {user_id}",
+        "User.count()",
+        f'User.update("{user_id}", "first_name", "Betty")',
+        "Place.where(number_rooms>=3)",
+        "Place.all()",
+    ]
+    return [commands[i % len(commands)] for i in range(count)]
+
+
+def run(console, stream):
+    """Return the number of commands of 'stream' run per second by
+    'console' (the fastest of RUNS runs) and the spread between the
+    fastest and the slowest run"""
+    times = []
+    storage.begin()
+    with redirect_stdout(Sink()):
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            for line in stream:
+                console.onecmd(line)
+            times.append(time.perf_counter() - start)
+    storage.commit()
+    return len(stream) / min(times), max(times) / min(times) - 1
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    user = User()
+    for i in range(5):
+        place = Place()
+        place.user_id = user.id
+        place.number_rooms = i
+    storage.save()
+    stream = command_stream(count, user.id)
+    console = HBNBCommand()
+    unchanged = HBNBCommand.onecmd is cmd.Cmd.onecmd
+    results = [("off", run(console, stream))]
+    metrics.enable(storage)
+    results.append(("on", run(console, stream)))
+    metrics.start_profile()
+    # Profiling is much slower, a tenth of the stream is enough
+    results.append(("profile", run(console, stream[:count // 10])))
+    metrics.stop_profile()
+    metrics.disable()
+    print(f"{count} commands, best of {RUNS} runs "
+          f"(onecmd unchanged while off: {unchanged})")
+    base = results[0][1][0]
+    for name, (rate, spread) in results:
+        print(f"{name:>8}: {rate:>9.0f} commands/s "
+              f"({rate / base - 1:+.1%}, runs within {spread:.1%})")
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the parallel reload of FileStorage
+(see models.engine.parallel_load) with 1, 2, 4 and 8 processes.
+
+Usage: python3 benchmarks/bench_parallel_reload.py [number of objects]
+    (default: 500000)
+
+A file.json holding 'number of objects' users and places is written
+once, then loaded by a new process for each number of workers
+(HBNB_RELOAD_WORKERS), which reports the time of reload(). The speedup
+is bounded by the number of CPUs and by the objects being built by the
+main process.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CREATE = """
+import sys
+sys.path.insert(0, {repo!r})
+from models import storage
+from models.place import Place
+from models.user import User
+storage.begin()
+for i in range({count} // 2):
+    user = User()
+    user.email = "user" + str(i) + "@hbnb.io"
+    place = Place()
+    place.user_id = user.id
+    place.amenity_ids = ["wifi", "pool"]
+storage.commit()
+"""
+
+RELOAD = """
+import sys
+import time
+sys.path.insert(0, {repo!r})
+start = time.perf_counter()
+from models import storage
+elapsed = time.perf_counter() - start
+print(storage.count(), elapsed)
+"""
+
+
+def reload_time(workers, count):
+    """Return the time (s) to import models (and reload the storage)
+    with 'workers' processes"""
+    env = dict(os.environ, HBNB_RELOAD_WORKERS=str(workers))
+    result = subprocess.run(
+        [sys.executable, "-c", RELOAD.format(repo=REPO)], env=env,
+        capture_output=True, text=True, check=True)
+    loaded, elapsed = result.stdout.split()
+    if int(loaded) != count:
+        raise RuntimeError(f"{loaded} objects loaded instead of {count}")
+    return float(elapsed)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    count -= count % 2
+    # Run in a temporary directory so the real file.json is not touched
+    os.chdir(tempfile.mkdtemp())
+    subprocess.run([sys.executable, "-c",
+                    CREATE.format(repo=REPO, count=count)], check=True)
+    size = os.path.getsize("file.json") / 1e6
+    print(f"{count} objects ({size:.0f} MB), {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'reload (s)':>11} {'speedup':>8}")
+    base = None
+    for workers in (1, 2, 4, 8):
+        elapsed = min(reload_time(workers, count) for _ in range(2))
+        base = base or elapsed
+        print(f"{workers:>8} {elapsed:>11.2f} {base / elapsed:>7.2f}x")
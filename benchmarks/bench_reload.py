@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the console start up time
+(import of models, which reloads the storage) for a large file.json.
+
+Usage: python3 benchmarks/bench_reload.py [number of objects]
+    (default: 1000000)
+
+Each start up runs in a new process:
+    eager       the whole file is loaded (default)
+    lazy/scan   HBNB_LAZY_RELOAD=1, first start (the file is scanned)
+    lazy/index  HBNB_LAZY_RELOAD=1, next starts (the saved index is used)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import uuid
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+START_UP = """
+import time
+start = time.perf_counter()
+import models
+print(time.perf_counter() - start, models.storage.count())
+"""
+
+
+def generate(path, size):
+    """Write a file.json of 'size' User objects at 'path'"""
+    parts = []
+    for i in range(size):
+        obj_id = str(uuid.uuid4())
+        obj_dict = {"id": obj_id,
+                    "created_at": "2024-02-18T07:24:55.583025",
+                    "updated_at": "2024-02-18T07:24:55.583038",
+                    "email": f"user{i}@hbnb.io", "first_name": "Betty",
+                    "__class__": "User"}
+        parts.append(f'{json.dumps("User." + obj_id)}: '
+                     f'{json.dumps(obj_dict)}')
+    with open(path, 'w') as f:
+        f.write("{" + ", ".join(parts) + "}")
+
+
+def start_up(directory, lazy):
+    """Return the start up time (seconds) and the number of objects
+    of a new process importing models in 'directory'"""
+    env = dict(os.environ, PYTHONPATH=REPO,
+               HBNB_LAZY_RELOAD="1" if lazy else "0")
+    out = subprocess.run([sys.executable, "-c", START_UP], cwd=directory,
+                         env=env, capture_output=True, text=True,
+                         check=True).stdout.split()
+    return float(out[0]), int(out[1])
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    directory = tempfile.mkdtemp()
+    generate(os.path.join(directory, "file.json"), size)
+    print(f"{'mode':>12} {'start up (s)':>14} {'objects':>10}")
+    for mode, lazy in (("eager", False), ("lazy/scan", True),
+                       ("lazy/index", True)):
+        seconds, count = start_up(directory, lazy)
+        print(f"{mode:>12} {seconds:>14.3f} {count:>10}")
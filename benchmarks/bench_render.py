@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the render cache (the string
+representation and dictionary of the objects, see
+FileStorage.render_str() and FileStorage.render_dict()).
+
+Usage: python3 benchmarks/bench_render.py [number of objects]
+    (default: 100000)
+
+Each rendering is run once on a new storage (first), once more on the
+unchanged storage (again), then after 1% of the objects changed,
+without the cache (RENDER_CACHE False) and with it:
+    all      the all command printing every object
+    to_dict  to_dict() of every object (as done by the journal
+             compaction)
+The hits and misses of the cache are printed at the end.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+class Sink:
+    """Output discarding what is written"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def to_dicts():
+    """Return the dictionaries of every user"""
+    return [obj.to_dict() for obj in storage.all("User").values()]
+
+
+def measure(run, users):
+    """Return the time (s) of the first run of 'run', of the run again
+    on the unchanged storage and of the run after 1% of 'users' changed
+    """
+    times = []
+    with redirect_stdout(Sink()):
+        for step in range(3):
+            if step == 2:
+                for user in users[::100]:
+                    user.first_name = "changed"
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+    return times
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    users = []
+    for i in range(count):
+        user = User()
+        user.email = f"user{i}@hbnb.io"
+        users.append(user)
+    with redirect_stdout(Sink()):
+        console = HBNBCommand()
+    runs = {"all": lambda: console.onecmd("all User"), "to_dict": to_dicts}
+    print(f"{count} objects")
+    print(f"{'':>8} {'cache':>6} {'first (s)':>10} {'again (s)':>10} "
+          f"{'1% changed (s)':>15}")
+    for name, run in runs.items():
+        for cache in (False, True):
+            storage.RENDER_CACHE = cache
+            first, again, changed = measure(run, users)
+            print(f"{name:>8} {'on' if cache else 'off':>6} "
+                  f"{first:>10.3f} {again:>10.3f} {changed:>15.3f}")
+    print(storage.render_stats())
@@ -0,0 +1,81 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the cost of one write
+(update + save) as the number of stored objects grows.
+
+Usage: python3 benchmarks/bench_save.py [size ...]
+    (default sizes: 1000 10000 100000 1000000)
+
+For each store size it prints the average time of a save after
+changing a single object (incremental) and of a save after every
+object was marked as changed (full re-serialization, what every
+save used to cost).
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.user import User  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+WRITES = 20
+
+
+def fill(size):
+    """Reset storage and fill it with 'size' User objects
+
+    Parameters
+    ----------
+    size : int
+        number of objects to create
+
+    Returns
+    -------
+    list
+        the created objects
+    """
+    storage._reset()
+    users = []
+    for i in range(size):
+        user = User()
+        user.email = f"user{i}@hbnb.io"
+        user.first_name = "Betty"
+        users.append(user)
+    # The first save serializes everything
+    storage.save()
+    return users
+
+
+def bench(size):
+    """Return the average incremental and full save time (seconds)
+    for a store of 'size' objects"""
+    users = fill(size)
+    start = time.perf_counter()
+    for i in range(WRITES):
+        users[i % size].first_name = f"Betty{i}"
+        users[i % size].save()
+    incremental = (time.perf_counter() - start) / WRITES
+    writes = max(1, WRITES // max(1, size // 10000))
+    start = time.perf_counter()
+    for i in range(writes):
+        for user in users:
+            storage.mark_dirty(user)
+        storage.save()
+    full = (time.perf_counter() - start) / writes
+    return incremental, full
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(f"{'objects':>10} {'incremental (ms)':>18} {'full (ms)':>12}")
+    for size in sizes:
+        incremental, full = bench(size)
+        print(f"{size:>10} {incremental * 1000:>18.2f} {full * 1000:>12.2f}")
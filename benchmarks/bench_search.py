@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the search of reviews by words
+(see models.engine.text_index) against going through every review.
+
+Usage: python3 benchmarks/bench_search.py [number of reviews]
+    (default: 100000)
+
+The reviews are made of words drawn from a vocabulary of 5000 words.
+    scan        every review whose text contains the words (substring
+                checks on storage.all("Review"), the previous way)
+    search      storage.search() of the same words (ranked)
+    build       first search of a new process: the index is built
+                from the reviews (and saved next to file.json)
+    load        first search of the next process: the saved index is
+                loaded
+"""
+
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CREATE = """
+import random
+import sys
+sys.path.insert(0, {repo!r})
+from models import storage
+from models.review import Review
+rng = random.Random(0)
+words = ["word" + str(i) for i in range(5000)]
+storage.begin()
+for i in range({count}):
+    Review().text = " ".join(rng.choice(words) for _ in range(20))
+storage.commit()
+"""
+
+SEARCH = """
+import sys
+import time
+sys.path.insert(0, {repo!r})
+from models import storage
+storage.all("Review")
+start = time.perf_counter()
+storage.search("Review", "word1")
+print(time.perf_counter() - start)
+"""
+
+
+def first_search():
+    """Return the time (s) of the first search of a new process"""
+    result = subprocess.run(
+        [sys.executable, "-c", SEARCH.format(repo=REPO)],
+        capture_output=True, text=True, check=True)
+    return float(result.stdout)
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    # Run in a temporary directory so the real file.json is not touched
+    os.chdir(tempfile.mkdtemp())
+    subprocess.run([sys.executable, "-c",
+                    CREATE.format(repo=REPO, count=count)], check=True)
+    build = first_search()
+    load = first_search()
+    sys.path.insert(0, REPO)
+    from models import storage
+    reviews = storage.all("Review")
+    storage.search("Review", "word1")
+    rng = random.Random(1)
+    queries = [f"word{rng.randrange(5000)} word{rng.randrange(5000)}"
+               for _ in range(20)]
+    start = time.perf_counter()
+    for query in queries:
+        words = query.split()
+        [obj for obj in reviews.values()
+         if all(f" {word} " in f" {obj.text} " for word in words)]
+    scan = (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    for query in queries:
+        storage.search("Review", query)
+    search = (time.perf_counter() - start) / len(queries)
+    print(f"{count} reviews")
+    print(f"  scan: {scan * 1000:>9.3f} ms/query")
+    print(f"search: {search * 1000:>9.3f} ms/query")
+    print(f" build: {build:>9.3f} s")
+    print(f"  load: {load:>9.3f} s")
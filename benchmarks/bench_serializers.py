@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the storage file formats
+(see models/engine/serializers.py): file size, dump and load throughput
+of the json and binary formats.
+
+Usage: python3 benchmarks/bench_serializers.py [number of objects]
+    (default: 200000)
+
+Objects of every class are generated with realistic attribute values.
+For each format:
+    dump    the objects are written to the file (FORMATS[...].dump)
+    load    the file is read back into dictionaries (FORMATS[...].load)
+    reload  the file is read back into objects (load + what reload()
+            does with the dictionaries)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from models import storage  # noqa: E402
+from models.engine.serializers import FORMATS  # noqa: E402
+
+CLASS_ATTRS = {"User": {"email": "betty@hbnb.io", "password": "pwd",
+                        "first_name": "Betty", "last_name": "Holberton"},
+               "State": {"name": "California"},
+               "City": {"state_id": "0001", "name": "San Francisco"},
+               "Amenity": {"name": "Wifi"},
+               "Place": {"city_id": "0001", "user_id": "0001",
+                         "name": "Loft", "description": "Nice",
+                         "number_rooms": 2, "number_bathrooms": 1,
+                         "max_guest": 4, "price_by_night": 120,
+                         "latitude": 37.77, "longitude": -122.41,
+                         "amenity_ids": ["0001", "0002"]},
+               "Review": {"place_id": "0001", "user_id": "0001",
+                          "text": "Great"}}
+
+
+def generate(count):
+    """Return 'count' objects of every class by <class name>.id"""
+    classes = storage.classes()
+    class_names = list(CLASS_ATTRS)
+    objects = {}
+    for i in range(count):
+        class_name = class_names[i % len(class_names)]
+        obj_dict = {"id": str(uuid.uuid4()),
+                    "created_at": "2024-02-18T07:24:55.583025",
+                    "updated_at": "2024-02-18T07:24:55.583038"}
+        obj_dict.update(CLASS_ATTRS[class_name])
+        if class_name == "Place":
+            obj_dict["price_by_night"] = random.randint(50, 500)
+            obj_dict["latitude"] = random.uniform(-90, 90)
+        obj = classes[class_name].from_dict(obj_dict)
+        objects[f"{class_name}.{obj.id}"] = obj
+    return objects
+
+
+def measure(serializer, objects):
+    """Return the file size and the dump, load and reload times (s)
+    of 'objects' in the format of 'serializer'"""
+    path = "file" + serializer.extension
+    start = time.perf_counter()
+    with open(path, 'wb') as f:
+        serializer.dump(f, objects)
+    dump = time.perf_counter() - start
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        serializer.load(f)
+    load = time.perf_counter() - start
+    storage._reset()
+    storage.FORMAT = serializer.name
+    start = time.perf_counter()
+    storage.reload()
+    reload = time.perf_counter() - start
+    assert storage.count() == len(objects)
+    storage._reset()
+    return os.path.getsize(path), dump, load, reload
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    random.seed(0)
+    objects = generate(count)
+    print(f"{count} objects")
+    print(f"{'format':>8} {'size (MB)':>10} {'dump (obj/s)':>13} "
+          f"{'load (obj/s)':>13} {'reload (obj/s)':>15}")
+    for name, serializer in FORMATS.items():
+        size, dump, load, reload = measure(serializer, objects)
+        print(f"{name:>8} {size / 1e6:>10.1f} {count / dump:>13.0f} "
+              f"{count / load:>13.0f} {count / reload:>15.0f}")
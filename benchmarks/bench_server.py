@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a load generator for the HBNB server (see
+server.py): requests per second and latency as the number of clients
+grows.
+
+Usage: python3 benchmarks/bench_server.py [requests per client]
+                                          [pipeline depth]
+    (default: 2000 1)
+
+A server is started (in a new process and directory) on a Unix socket,
+or on TCP where Unix sockets are not available, with a few users and
+places. For 1, 4, 16 and 64 clients connected at the same time, each
+client sends 'requests per client' commands, mixing show, count and
+where() (reads) with update (a write, 1 in 10), keeping up to
+'pipeline depth' commands sent and not answered. The latency of a
+command is the time from its sending to its response.
+"""
+
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETUP = """
+import sys
+sys.path.insert(0, {repo!r})
+from models import storage
+from models.place import Place
+from models.user import User
+storage.begin()
+for i in range(100):
+    user = User()
+    user.first_name = "name" + str(i % 10)
+    place = Place()
+    place.user_id = user.id
+storage.commit()
+print(" ".join(key.split(".")[1] for key in storage.all("User")))
+"""
+
+
+def commands(user_ids, count):
+    """Return 'count' mixed commands on the users 'user_ids'"""
+    rng = random.Random(0)
+    lines = []
+    for i in range(count):
+        user_id = rng.choice(user_ids)
+        kind = i % 10
+        if kind == 0:
+            lines.append(f'User.update("{user_id}", "age", {i})')
+        elif kind < 7:
+            lines.append(f"show User {user_id}")
+        elif kind < 9:
+            lines.append("User.count()")
+        else:
+            lines.append('User.where(first_name="name3")')
+    return [(line + "\n").encode() for line in lines]
+
+
+async def connect(address):
+    """Open a connection to the server at 'address'"""
+    if isinstance(address, tuple):
+        return await asyncio.open_connection(*address)
+    return await asyncio.open_unix_connection(address)
+
+
+async def client(address, lines, depth, latencies):
+    """Send the commands 'lines' keeping up to 'depth' of them not
+    answered, and append the latency of each one to 'latencies'"""
+    reader, writer = await connect(address)
+    sent = []
+
+    async def receive():
+        size = int(await reader.readline())
+        await reader.readexactly(size)
+        latencies.append(time.perf_counter() - sent.pop(0))
+
+    for line in lines:
+        if len(sent) == depth:
+            await receive()
+        sent.append(time.perf_counter())
+        writer.write(line)
+        await writer.drain()
+    while sent:
+        await receive()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(address, user_ids, clients, count, depth):
+    """Return (requests/s, latencies (s)) of 'clients' clients sending
+    'count' commands each"""
+    latencies = []
+    tasks = [client(address, commands(user_ids, count), depth, latencies)
+             for _ in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return clients * count / elapsed, sorted(latencies)
+
+
+def start_server(directory):
+    """Start a server in 'directory' and return (process, address)"""
+    if hasattr(socket, "AF_UNIX"):
+        address = os.path.join(directory, "hbnb.sock")
+        argument = address
+    else:
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        address = ("127.0.0.1", port)
+        argument = f"127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO, "server.py"), argument],
+        cwd=directory, stderr=subprocess.DEVNULL)
+    # Waits until the server accepts connections
+    for _ in range(500):
+        try:
+            if isinstance(address, tuple):
+                socket.create_connection(address).close()
+            else:
+                with socket.socket(socket.AF_UNIX) as s:
+                    s.connect(address)
+            break
+        except OSError:
+            time.sleep(0.01)
+    return process, address
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    directory = tempfile.mkdtemp()
+    result = subprocess.run(
+        [sys.executable, "-c", SETUP.format(repo=REPO)], cwd=directory,
+        capture_output=True, text=True, check=True)
+    user_ids = result.stdout.split()
+    process, address = start_server(directory)
+    try:
+        print(f"{count} commands per client, pipeline depth {depth}, "
+              f"{os.cpu_count()} CPUs")
+        print(f"{'clients':>8} {'requests/s':>11} {'p50 (ms)':>9} "
+              f"{'p99 (ms)':>9}")
+        for clients in (1, 4, 16, 64):
+            rate, latencies = asyncio.run(
+                run(address, user_ids, clients, count, depth))
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            print(f"{clients:>8} {rate:>11.0f} {p50:>9.2f} {p99:>9.2f}")
+    finally:
+        process.terminate()
+        process.wait()
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of ShardedStorage against
+FileStorage: time to save one changed object of a large storage, and
+time to reload it.
+
+Usage: python3 benchmarks/bench_shards.py [number of objects]
+    (default: 100000)
+
+The storage holds 'number of objects' users and one review. The
+review is changed and saved 10 times, then the storage is reloaded:
+    file                FileStorage (one file.json)
+    sharded threads     ShardedStorage, shards loaded by threads
+    sharded processes   ShardedStorage, shards loaded by processes
+Each engine runs in its own process (HBNB_TYPE_STORAGE is read when
+models is imported).
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUN = """
+import sys
+import time
+sys.path.insert(0, {repo!r})
+from models import storage
+from models.review import Review
+from models.user import User
+storage.RELOAD_POOL = {pool!r}
+storage.begin()
+for i in range({count}):
+    User().email = "user" + str(i) + "@hbnb.io"
+review = Review()
+storage.commit()
+start = time.perf_counter()
+for i in range(10):
+    review.text = "text" + str(i)
+    review.save()
+save = (time.perf_counter() - start) / 10
+storage._reset()
+start = time.perf_counter()
+storage.reload()
+reload = time.perf_counter() - start
+assert storage.get("Review", review.id).text == "text9"
+print(save, reload)
+"""
+
+
+def run(engine, pool, count):
+    """Return the time (s) to save one review and to reload the storage
+    with the engine 'engine' (in a new directory)"""
+    env = dict(os.environ, HBNB_TYPE_STORAGE=engine)
+    result = subprocess.run(
+        [sys.executable, "-c", RUN.format(repo=REPO, pool=pool,
+                                          count=count)],
+        cwd=tempfile.mkdtemp(), env=env, capture_output=True, text=True,
+        check=True)
+    return map(float, result.stdout.split())
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print(f"{count} users, {os.cpu_count()} CPUs")
+    print(f"{'':>18} {'save one (s)':>13} {'reload (s)':>11}")
+    for name, engine, pool in (("file", "file", "threads"),
+                               ("sharded threads", "sharded", "threads"),
+                               ("sharded processes", "sharded",
+                                "processes")):
+        save, reload = run(engine, pool, count)
+        print(f"{name:>18} {save:>13.4f} {reload:>11.3f}")
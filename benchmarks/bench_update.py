@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the console update of several
+attributes at once: <class name>.update(<id>, <dictionary>).
+
+Usage: python3 benchmarks/bench_update.py [number of objects]
+    (default: 10000)
+
+The storage is filled with users, then dictionary updates of 1, 5 and
+10 attributes are timed with:
+    before  the previous do_update(): for every attribute, the object
+            is rebuilt from to_dict() (parsing both datetimes again),
+            set in storage and the storage is saved
+    after   the console command, which sets every attribute on the
+            object in place and saves once (storage.update())
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+from models.user import User  # noqa: E402
+
+UPDATES = 20
+
+
+def before(class_name, obj_id, attrs):
+    """Update the object like the previous do_update() did, once per
+    attribute"""
+    classes = storage.classes()
+    for name, value in attrs.items():
+        obj = storage.get(class_name, obj_id)
+        obj_dict = obj.to_dict()
+        obj_dict[name] = value
+        new_obj = classes[class_name](**obj_dict)
+        storage.new(new_obj)
+        new_obj.save()
+
+
+def after(console, class_name, obj_id, attrs):
+    """Update the object with the console command"""
+    console.onecmd(f'{class_name}.update("{obj_id}", {attrs!r})')
+
+
+def measure(update, users, count):
+    """Return the average time (ms) of an update of 'count' attributes
+    with 'update'"""
+    start = time.perf_counter()
+    for i in range(UPDATES):
+        attrs = {f"attr{j}": f"value{i}" for j in range(count)}
+        update(users[i].id, attrs)
+    return (time.perf_counter() - start) / UPDATES * 1e3
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    for i in range(size):
+        User().email = f"user{i}@hbnb.io"
+    storage.save()
+    users = list(storage.all(User).values())
+    console = HBNBCommand()
+    print(f"{size} objects")
+    print(f"{'attributes':>10} {'before (ms)':>12} {'after (ms)':>11}")
+    for count in (1, 5, 10):
+        old = measure(lambda obj_id, attrs: before("User", obj_id, attrs),
+                      users, count)
+        with redirect_stdout(io.StringIO()):
+            new = measure(lambda obj_id, attrs:
+                          after(console, "User", obj_id, attrs),
+                          users, count)
+        assert all(storage.get("User", users[i].id).attr0 == f"value{i}"
+                   for i in range(UPDATES))
+        print(f"{count:>10} {old:>12.2f} {new:>11.2f}")
@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a benchmark of the startup (reload()) time of
+WALStorage as the number of changes saved grows, and of the restore of
+the objects as they were at a given time.
+
+Usage: python3 benchmarks/bench_wal.py [objects] [max history]
+    (default: 1000 100000)
+
+Every object is updated and saved again (in batches) until the history
+holds 'max history' records. The storage is reloaded at each step:
+    snapshots   default SNAPSHOT_RECORDS: the latest snapshot and the
+                records after it are read
+    log only    no snapshot: every record since the first save is
+                replayed
+Finally the objects are restored as they were halfway through.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Run in a temporary directory so the real file.json is not touched
+os.chdir(tempfile.mkdtemp())
+os.environ["HBNB_TYPE_STORAGE"] = "wal"
+
+from models import storage  # noqa: E402
+from models.engine.wal_storage import WALStorage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def reload_time():
+    """Return the time (s) to reload the storage"""
+    storage._reset()
+    start = time.perf_counter()
+    storage.reload()
+    return time.perf_counter() - start
+
+
+def run(count, history, snapshots):
+    """Save 'history' records of 'count' users in a new directory and
+    return [(records, reload time (s))] and the (first name of the
+    users, time) halfway through the history"""
+    os.chdir(tempfile.mkdtemp())
+    storage._reset()
+    storage.reload()
+    storage.SNAPSHOT_RECORDS = WALStorage.SNAPSHOT_RECORDS if snapshots\
+        else 2 * history
+    storage.begin()
+    users = [User() for _ in range(count)]
+    storage.commit()
+    times = []
+    halfway = None
+    records = count
+    step = history // 5
+    while records < history:
+        storage.begin()
+        for user in users:
+            user.first_name = f"name{records}"
+        storage.commit()
+        records += count
+        if records >= history // 2 and halfway is None:
+            halfway = (users[0].first_name, datetime.now())
+            time.sleep(0.01)
+        if records % step < count:
+            times.append((records, reload_time()))
+            users = list(storage.all("User").values())
+    return times, halfway
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    history = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    results = {}
+    # The restore is done on the storage with snapshots (the last run)
+    for snapshots in (False, True):
+        results[snapshots], halfway = run(count, history, snapshots)
+    print(f"{count} objects, reload time (s)")
+    print(f"{'records':>10} {'snapshots':>10} {'log only':>10}")
+    for (records, fast), (_, slow) in zip(results[True], results[False]):
+        print(f"{records:>10} {fast:>10.3f} {slow:>10.3f}")
+    name, at = halfway
+    start = time.perf_counter()
+    changes = storage.restore(at)
+    elapsed = time.perf_counter() - start
+    restored = all(user.first_name == name
+                   for user in storage.all("User").values())
+    print(f"restore halfway: {changes} objects in {elapsed:.3f} s "
+          f"({'ok' if restored else 'FAILED'})")
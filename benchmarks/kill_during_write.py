@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a harness checking that the storage file
+survives the process being killed while it is written.
+
+Usage: python3 benchmarks/kill_during_write.py [rounds] [--unsafe]
+    (default: 30 rounds)
+
+Each round starts a process that reloads the storage and saves new
+objects in a loop, kills it (SIGKILL) after a random delay, then
+reloads the storage in a new process and checks that:
+    - the file could be loaded (no damaged file was set aside)
+    - no object saved in a previous round was lost
+The environment is passed to the processes, so the other engines and
+options can be checked the same way (ex: HBNB_STORAGE_FORMAT=binary,
+HBNB_TYPE_STORAGE=journal, HBNB_GROUP_COMMIT_WINDOW=0.05).
+
+With --unsafe the file is written in place (without atomic_open), as it
+used to be, to check that the harness detects damaged files.
+"""
+
+import glob
+import os
+import random
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INITIAL_OBJECTS = 20000
+
+WRITER = """
+import sys
+sys.path.insert(0, {repo!r})
+from contextlib import contextmanager
+import models.engine.file_storage
+if {unsafe!r}:
+    @contextmanager
+    def unsafe_open(path, mode='w', fsync=True):
+        with open(path, mode) as f:
+            yield f
+    models.engine.file_storage.atomic_open = unsafe_open
+from models import storage
+from models.user import User
+if storage.count() == 0:
+    for i in range({initial}):
+        User().email = "user{{}}@hbnb.io".format(i)
+    storage.save()
+print("ready", flush=True)
+while True:
+    user = User()
+    user.email = "new@hbnb.io"
+    user.save()
+"""
+
+CHECKER = """
+import sys
+import warnings
+sys.path.insert(0, {repo!r})
+warnings.simplefilter("error")
+from models import storage
+print(storage.count())
+"""
+
+
+def run_round(unsafe):
+    """Start a writer, kill it while it saves and return the number of
+    objects reloaded afterwards (None if the file was damaged)"""
+    writer = subprocess.Popen(
+        [sys.executable, "-c", WRITER.format(repo=REPO, unsafe=unsafe,
+                                             initial=INITIAL_OBJECTS)],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    writer.stdout.readline()
+    time.sleep(random.uniform(0, 0.5))
+    writer.send_signal(signal.SIGKILL)
+    writer.wait()
+    writer.stdout.close()
+    checker = subprocess.run(
+        [sys.executable, "-c", CHECKER.format(repo=REPO)],
+        capture_output=True, text=True)
+    if checker.returncode != 0 or \
+            glob.glob("**/*.damaged-*", recursive=True):
+        return None
+    return int(checker.stdout)
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--unsafe"]
+    rounds = int(args[0]) if args else 30
+    unsafe = "--unsafe" in sys.argv
+    # Run in a temporary directory so the real file.json is not touched
+    os.chdir(tempfile.mkdtemp())
+    random.seed(0)
+    damaged = lost = 0
+    count = 0
+    for i in range(rounds):
+        reloaded = run_round(unsafe)
+        if reloaded is None:
+            damaged += 1
+            # Start again from an empty storage
+            for path in glob.glob("file*"):
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                else:
+                    os.remove(path)
+            count = 0
+            continue
+        if reloaded < count:
+            lost += 1
+        count = reloaded
+    print(f"{rounds} rounds: {damaged} damaged files, "
+          f"{lost} rounds losing saved objects")
+    sys.exit(1 if damaged or lost else 0)
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+
+"""
+In this module defines a stress test of the storage used by many
+threads of a process, or by many processes, at the same time.
+
+Usage: python3 benchmarks/stress_concurrency.py [threads|processes]
+                                                [workers] [objects]
+    (default: threads 8 200)
+
+Each worker creates 'objects' users, saving after each one, then
+updates every one of them and saves again. The storage is then
+reloaded in a new process, which checks that every user of every
+worker is there with its last value (no write was lost). The
+environment is passed to the processes, so the other engines and
+options can be checked the same way (ex: HBNB_TYPE_STORAGE=journal,
+HBNB_GROUP_COMMIT_WINDOW=0.05).
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import sys
+sys.path.insert(0, {repo!r})
+from models import storage
+from models.user import User
+users = []
+for i in range({objects}):
+    user = User()
+    user.email = "{name}-" + str(i)
+    user.save()
+    users.append(user)
+for user in users:
+    user.first_name = "final"
+    user.save()
+storage.flush()
+"""
+
+THREADS = """
+import sys
+import threading
+sys.path.insert(0, {repo!r})
+from models import storage
+from models.user import User
+
+def work(name):
+    users = []
+    for i in range({objects}):
+        user = User()
+        user.email = name + "-" + str(i)
+        user.save()
+        users.append(user)
+    for user in users:
+        user.first_name = "final"
+        user.save()
+
+threads = [threading.Thread(target=work, args=("worker" + str(i),))
+           for i in range({workers})]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+storage.flush()
+"""
+
+CHECKER = """
+import sys
+sys.path.insert(0, {repo!r})
+from models import storage
+found = 0
+for user in storage.all("User").values():
+    if getattr(user, "first_name", None) == "final":
+        found += 1
+print(found)
+"""
+
+
+def run(mode, workers, objects):
+    """Run the workers and return the number of users saved with their
+    last value (checked by a new process)"""
+    if mode == "threads":
+        subprocess.run([sys.executable, "-c",
+                        THREADS.format(repo=REPO, workers=workers,
+                                       objects=objects)], check=True)
+    else:
+        processes = [subprocess.Popen(
+            [sys.executable, "-c",
+             WORKER.format(repo=REPO, name=f"worker{i}", objects=objects)])
+            for i in range(workers)]
+        for process in processes:
+            if process.wait() != 0:
+                raise RuntimeError("a worker failed")
+    checker = subprocess.run(
+        [sys.executable, "-c", CHECKER.format(repo=REPO)],
+        capture_output=True, text=True, check=True)
+    return int(checker.stdout)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    mode = args[0] if args else "threads"
+    if mode not in ("threads", "processes"):
+        print(__doc__)
+        sys.exit(1)
+    workers = int(args[1]) if len(args) > 1 else 8
+    objects = int(args[2]) if len(args) > 2 else 200
+    # Run in a temporary directory so the real file.json is not touched
+    os.chdir(tempfile.mkdtemp())
+    start = time.perf_counter()
+    found = run(mode, workers, objects)
+    elapsed = time.perf_counter() - start
+    expected = workers * objects
+    print(f"{mode}: {workers} workers x {objects} objects in "
+          f"{elapsed:.1f} s, {expected - found} lost writes")
+    sys.exit(1 if found != expected else 0)
@@ -0,0 +1,296 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the benchmark suite of the storage and of the
+console: the time of the common operations as the storage grows, saved
+as JSON and compared with a previous run (baseline).
+
+Usage: python3 benchmarks/suite.py [--sizes 1000,10000,100000]
+                                   [--repeat 3] [--output <file>]
+                                   [--baseline <file>]
+                                   [--threshold 0.1]
+
+For each size, a new process (in a new directory, with the environment
+of the suite, ex: HBNB_TYPE_STORAGE=wal) creates that number of objects
+of the seven model classes (see generate()) and times:
+    create  BaseModel.__init__() and storage.new() of every object, in a
+            batch (not saved)
+    update  <class>.update(<id>, <attribute>, <value>) commands
+            (HBNBCommand.default()), in a batch
+    save    storage.save() after one object changed
+    reload  storage.reload() of every object
+    all     <class>.all() command (output discarded)
+    count   <class>.count() commands
+    show    show <class> <id> commands
+Each operation is timed 'repeat' times and the fastest time is kept.
+Times (µs) are by object for create, by command for update, count and
+show, and for the whole storage for save, reload and all. They are
+printed, and written as JSON with
+--output. With --baseline (a file written by --output), each time is
+compared with the baseline, and the suite exits with status 1 if one
+is slower by more than 'threshold' (10% by default).
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+OPERATIONS = ("create", "update", "save", "reload", "all", "count",
+              "show")
+# Objects of each class by 100 objects
+MIX = (("State", 2), ("City", 8), ("Amenity", 5), ("User", 25),
+       ("Place", 25), ("Review", 30), ("BaseModel", 5))
+# Number of commands timed by update, count and show
+COMMANDS = 1000
+
+
+def generate(count, seed=0):
+    """Create 'count' objects of the seven model classes (see MIX), with
+    attributes of random values linking them together (cities to
+    states, places to cities and users, ...), the same for a given
+    'seed'
+
+    Returns
+    -------
+    dict
+        ids of the objects created by class name
+    """
+    from models.amenity import Amenity
+    from models.base_model import BaseModel
+    from models.city import City
+    from models.place import Place
+    from models.review import Review
+    from models.state import State
+    from models.user import User
+    rng = random.Random(seed)
+    ids = {name: [] for name, _ in MIX}
+
+    def pick(class_name):
+        return rng.choice(ids[class_name]) if ids[class_name] else ""
+
+    for i in range(count):
+        # Objects are created in the order of MIX for each 100 objects
+        slot = i % 100
+        for class_name, share in MIX:
+            if slot < share:
+                break
+            slot -= share
+        if class_name == "State":
+            obj = State()
+            obj.name = f"state{i}"
+        elif class_name == "City":
+            obj = City()
+            obj.state_id = pick("State")
+            obj.name = f"city{i}"
+        elif class_name == "Amenity":
+            obj = Amenity()
+            obj.name = f"amenity{i}"
+        elif class_name == "User":
+            obj = User()
+            obj.email = f"user{i}@hbnb.io"
+            obj.password = f"{rng.getrandbits(64):x}"
+            obj.first_name = f"first{rng.randrange(1000)}"
+            obj.last_name = f"last{rng.randrange(1000)}"
+        elif class_name == "Place":
+            obj = Place()
+            obj.city_id = pick("City")
+            obj.user_id = pick("User")
+            obj.name = f"place{i}"
+            obj.description = "A nice place " * rng.randrange(1, 5)
+            obj.number_rooms = rng.randrange(1, 6)
+            obj.number_bathrooms = rng.randrange(1, 3)
+            obj.max_guest = rng.randrange(1, 10)
+            obj.price_by_night = rng.randrange(20, 500)
+            obj.latitude = rng.uniform(-60, 60)
+            obj.longitude = rng.uniform(-180, 180)
+            obj.amenity_ids = [pick("Amenity")
+                               for _ in range(rng.randrange(4))]
+        elif class_name == "Review":
+            obj = Review()
+            obj.place_id = pick("Place")
+            obj.user_id = pick("User")
+            obj.text = "Great stay " * rng.randrange(1, 10)
+        else:
+            obj = BaseModel()
+        ids[class_name].append(obj.id)
+    return ids
+
+
+class Sink:
+    """Output discarding what is written"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def best(run, repeat, before=None):
+    """Return the fastest time (s) of 'repeat' runs of 'run' (after
+    calling 'before', not timed)"""
+    times = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def measure(size, repeat):
+    """Time the operations on a storage of 'size' objects (run in a new
+    process and directory by run())
+
+    Returns
+    -------
+    dict
+        time by operation (µs) by operation name
+    """
+    from contextlib import redirect_stdout
+    sys.path.insert(0, REPO)
+    from console import HBNBCommand
+    from models import storage
+    console = HBNBCommand()
+    results = {}
+    ids = {}
+
+    def create():
+        ids.update(generate(size))
+
+    # Each run creates the objects again in an empty storage, in a
+    # batch: only the objects of the last run are saved, untimed
+    storage.begin()
+    results["create"] = best(create, repeat, storage._reset) / size
+    storage.commit()
+    rng = random.Random(1)
+    places = [rng.choice(ids["Place"]) for _ in range(COMMANDS)]
+    updates = [f'Place.update("{place_id}", "max_guest", {i})'
+               for i, place_id in enumerate(places)]
+    shows = [f"show Place {place_id}" for place_id in places]
+
+    def run_commands(lines):
+        with redirect_stdout(Sink()):
+            for line in lines:
+                console.onecmd(line)
+
+    storage.begin()
+    results["update"] = best(lambda: run_commands(updates),
+                             repeat) / COMMANDS
+    storage.commit()
+    place = storage.get("Place", places[0])
+
+    def change():
+        place.name = f"place{time.perf_counter()}"
+
+    results["save"] = best(storage.save, repeat, change)
+    results["reload"] = best(storage.reload, repeat, storage._reset)
+    # Objects built on access (HBNB_LAZY_RELOAD) are built before all
+    storage.all()
+    results["all"] = best(lambda: run_commands(["Place.all()"]), repeat)
+    results["count"] = best(
+        lambda: run_commands(["Place.count()"] * COMMANDS),
+        repeat) / COMMANDS
+    results["show"] = best(lambda: run_commands(shows), repeat) / COMMANDS
+    return {name: seconds * 1e6 for name, seconds in results.items()}
+
+
+def run(size, repeat):
+    """Run measure() in a new process and directory and return its
+    results"""
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--measure",
+         str(size), "--repeat", str(repeat)],
+        cwd=tempfile.mkdtemp(), capture_output=True, text=True,
+        check=True)
+    return json.loads(result.stdout)
+
+
+def environment():
+    """Return the description of the machine and settings of the run"""
+    return {"date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "settings": {name: value for name, value in os.environ.items()
+                         if name.startswith("HBNB_")}}
+
+
+def compare(results, baseline, threshold):
+    """Print the results against the baseline and return the
+    (operation, size) slower by more than 'threshold'"""
+    regressions = []
+    print(f"{'operation':>10} {'size':>9} {'baseline (µs)':>14} "
+          f"{'now (µs)':>12} {'change':>8}")
+    for operation in OPERATIONS:
+        for size, now in results[operation].items():
+            before = baseline["results"].get(operation, {}).get(size)
+            if before is None:
+                continue
+            change = now / before - 1
+            flag = ""
+            if change > threshold:
+                regressions.append((operation, size))
+                flag = " slower"
+            print(f"{operation:>10} {size:>9} {before:>14.2f} "
+                  f"{now:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv):
+    """Run the suite with the command line arguments 'argv'"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark suite of the storage and the console")
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="numbers of objects, separated by commas "
+                        "(ex: 1000,10000,100000,1000000)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs of each operation (the fastest is kept)")
+    parser.add_argument("--output", help="JSON file of the results")
+    parser.add_argument("--baseline",
+                        help="JSON file of previous results to compare")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="slowdown reported as a regression")
+    parser.add_argument("--measure", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.measure is not None:
+        json.dump(measure(args.measure, args.repeat), sys.stdout)
+        return 0
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = {operation: {} for operation in OPERATIONS}
+    print(f"{'size':>9} " + " ".join(f"{name:>9}" for name in OPERATIONS)
+          + "  (µs)")
+    for size in sizes:
+        measured = run(size, args.repeat)
+        for operation in OPERATIONS:
+            results[operation][str(size)] = measured[operation]
+        print(f"{size:>9} " + " ".join(f"{measured[name]:>9.2f}"
+                                       for name in OPERATIONS))
+    document = {"environment": environment(), "repeat": args.repeat,
+                "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressions (more than "
+                  f"{args.threshold:.0%} slower)")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
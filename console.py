@@ -3,30 +3,34 @@
 """In this module defines a HBNBCommand class"""
 
 
+import ast
 import cmd
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.amenity import Amenity
-from models.place import Place
-from models.review import Review
+import functools
+from itertools import islice
 import models
 import re
+import sys
+import time
 
 
 class HBNBCommand(cmd.Cmd):
     """Impliment a command line interpreter"""
     intro = "Welcome to HBNB, type 'help' for commands."
     prompt = "(hbnb) "
-    CLASSES = {"BaseModel": BaseModel,
-               "User": User,
-               "State": State,
-               "City": City,
-               "Amenity": Amenity,
-               "Place": Place,
-               "Review": Review}
+    # Classes used by storage (BaseModel and every model class of
+    # models package, registered automatically)
+    CLASSES = models.storage.classes()
     CLASS_NAMES = [name for name in CLASSES]
+    # <class name>.<method>(<arguments>) commands
+    DOT_COMMAND = re.compile(r"^([^.(]+)\.(\w+)\((.*)\)$", re.DOTALL)
+    # One argument of a <class name>.<method>(...) command: a string
+    # between quotes or anything up to the next comma
+    ARGUMENT = re.compile(r'\s*("[^"]*"|\'[^\']*\'|[^,]*?)\s*(?:,|$)')
+    # An argument of update that parses: a string between quotes or
+    # one word without quotes
+    WORD = re.compile(r'^("[^"]*"|\'[^\']*\'|[^\s"\']*)$')
+    # Number of instances written to the output at once by all
+    CHUNK_SIZE = 1000
 
     def do_quit(self, line):
         """
@@ -46,6 +50,128 @@ class HBNBCommand(cmd.Cmd):
         """Do nothing if nothing is passed"""
         pass
 
+    def do_begin(self, line):
+        """
+        Start a batch: the changes are only saved (to the JSON file)
+        by the commit command
+        Usage: begin
+        """
+        models.storage.begin()
+
+    def do_commit(self, line):
+        """
+        Save the changes made since the begin command
+        Usage: commit
+        """
+        models.storage.commit()
+
+    def command_name(self, line):
+        """
+        Return the name of the command 'line' recorded by the metrics
+
+        Paramaters
+        ----------
+        line : str
+            Command line
+
+        Returns
+        -------
+        str
+            the command (ex: show), <class name>.<method>() for the
+            <class name>.<method>(...) commands or "unknown"
+        """
+        command = self.parseline(line)[0]
+        if command and hasattr(self, "do_" + command):
+            return command
+        parsed = self.parse_dot_command(line.strip())
+        if parsed is not None:
+            return f"{parsed[1]}.{parsed[2]}()"
+        return "unknown" if line.strip() else "empty"
+
+    def do_stats(self, line):
+        """
+        Print the number of calls and the latencies of the storage
+        methods and console commands recorded since metrics were
+        turned on, turn them on or off, forget them, or write them to
+        a JSON file
+        Usage: stats [on | off | reset | dump <file>]
+        """
+        args = line.split()
+        metrics = models.metrics
+        if not args:
+            if not metrics.enabled and not metrics.stats():
+                print("** metrics are off (stats on) **")
+                return
+            print(metrics.report())
+        elif args[0] == "on":
+            metrics.enable(models.storage)
+        elif args[0] == "off":
+            metrics.disable()
+        elif args[0] == "reset":
+            metrics.reset()
+        elif args[0] == "dump" and len(args) == 2:
+            try:
+                metrics.dump(args[1])
+            except OSError:
+                print(f"** can't write {args[1]} **")
+        else:
+            print("** invalid arguments **")
+
+    def do_profile(self, line):
+        """
+        Profile every function call (cProfile) and memory allocation
+        (tracemalloc) until profile off, which prints the functions
+        taking the most time and the lines allocating the most memory,
+        and writes the profile to a file if one is given
+        Usage: profile on | off [<file>]
+        """
+        args = line.split()
+        if args == ["on"]:
+            models.metrics.start_profile()
+        elif args and args[0] == "off" and len(args) <= 2:
+            if not models.metrics.profiling:
+                print("** profile is off **")
+                return
+            # The report is printed even if the file can't be written
+            print(models.metrics.stop_profile())
+            if len(args) == 2:
+                try:
+                    models.metrics.dump_profile(args[1])
+                except OSError:
+                    print(f"** can't write {args[1]} **")
+        else:
+            print("** invalid arguments **")
+
+    def run_batch(self, path):
+        """
+        Run the commands of a file, one per line, in a single batch
+        (the changes are saved once, at the end) and print the number
+        of commands per second to the standard error
+
+        Paramaters
+        ----------
+        path : str
+            File of commands ('-' for the standard input)
+        """
+        f = sys.stdin if path == "-" else open(path, 'r')
+        count = 0
+        start = time.perf_counter()
+        models.storage.begin()
+        try:
+            # Commands are run as they are read
+            for line in f:
+                count += 1
+                if self.onecmd(self.precmd(line.rstrip("\n"))):
+                    break
+        finally:
+            models.storage.commit()
+            if f is not sys.stdin:
+                f.close()
+        elapsed = time.perf_counter() - start
+        print(f"{count} commands in {elapsed:.2f} s "
+              f"({count / max(elapsed, 1e-9):.0f} commands/s)",
+              file=sys.stderr)
+
     def do_create(self, line):
         """
         Create a new instance of a class, saves it (to the JSON file)
@@ -93,12 +219,11 @@ class HBNBCommand(cmd.Cmd):
             print("** instance id missing **")
             return
         else:
-            args_concat = args[0] + "." + args[1]
+            obj_str = models.storage.get(args[0], args[1])
             # If class name and id passed doesn't exist
-            if args_concat not in models.storage.all() or len(args) > 2:
+            if obj_str is None or len(args) > 2:
                 print("** no instance found **")
                 return
-            obj_str = models.storage.all()[args_concat]
             # If class name and id passed exist
             print(obj_str)
 
@@ -131,7 +256,7 @@ class HBNBCommand(cmd.Cmd):
         else:
             args_concat = args[0] + "." + args[1]
             # If class name and id passed don't match
-            if args_concat not in models.storage.all() or len(args) < 2:
+            if models.storage.get(args[0], args[1]) is None:
                 print("** no instance found **")
                 return
             models.storage.delete(args_concat)
@@ -149,22 +274,138 @@ class HBNBCommand(cmd.Cmd):
         Print all string representation of all instances based or
         not on the class name in a list format
         Usage: all or all <class name>
+               all [<class name>] [limit=<n>] [offset=<n>] [after=<key>]
+        With limit, at most <n> instances are printed and, if there are
+        more, the cursor of the next page (after=<class name>.<id>).
         """
-        if not line:
-            # If no class name is passed, print all objects
-            listed_objs = [str(obj) for obj in models.storage.all().values()]
-            print(listed_objs)
+        args = line.split()
+        options = [arg for arg in args if "=" in arg]
+        class_name = " ".join(arg for arg in args if "=" not in arg)
+        if class_name and class_name not in self.CLASSES:
+            print("** class doesn't exist **")
             return
-        elif line in self.CLASSES:
-            # If class name is passed and it exist
-            listed_objs = []
-            for obj_id, obj in models.storage.all().items():
-                class_name = obj_id.split(".")[0]
-                if class_name == line:
-                    listed_objs.append(str(obj))
-            print(listed_objs)
-        else:
+        # If no class name is passed, print all objects
+        self.print_page(class_name or None, options, quote=True)
+
+    def do_search(self, line):
+        """
+        Print the instances of a class whose text attributes (ex: the
+        name and description of a Place) match words, best first
+        Usage: search <class name> <query> [limit=<n>]
+        The query is made of words (all of them must match), OR between
+        groups of words, and prefixes ending with '*'
+        (ex: search Place pool OR beach*)
+        """
+        args = line.split()
+        if not args:
+            print("** class name missing **")
+            return
+        if args[0] not in self.CLASSES:
             print("** class doesn't exist **")
+            return
+        if args[0] not in models.storage.TEXT_ATTRS:
+            print("** class can't be searched **")
+            return
+        limit = None
+        if len(args) > 2 and args[-1].startswith("limit="):
+            try:
+                limit = int(args.pop()[len("limit="):])
+            except ValueError:
+                limit = -1
+            if limit < 0:
+                print("** invalid arguments **")
+                return
+        if len(args) < 2:
+            print("** query missing **")
+            return
+        objs = models.storage.search(args[0], " ".join(args[1:]), limit)
+        self.print_objects(objs.items())
+
+    def complete_search(self, text, line, begidx, endidx):
+        """
+        Automatically complete the class name for search command
+        """
+        return [c for c in models.storage.TEXT_ATTRS if c.startswith(text)]
+
+    def print_page(self, class_name, options, quote):
+        """
+        Print the instances (of a class) in a list format, or a page
+        of them
+
+        Paramaters
+        ----------
+        class_name : str
+            Class name of the instances (None for every instance)
+        options : list
+            Page options: 'limit=<n>', 'offset=<n>' and 'after=<key>'
+        quote : bool
+            If True, instances are printed between quotes (like a list
+            of their string representations)
+        """
+        page = {"limit": None, "offset": 0, "after": None}
+        for option in options:
+            name, _, value = option.partition("=")
+            if name not in page or\
+                    (name != "after" and not value.isdigit()):
+                print("** invalid arguments **")
+                return
+            page[name] = self.unquote(value) if name == "after"\
+                else int(value)
+        objs = models.storage.all(class_name)
+        items = iter(objs.items())
+        if page["after"] is not None:
+            if page["after"] not in objs:
+                print("** no instance found **")
+                return
+            # The cursor is looked up without copying the instances
+            for key, _ in items:
+                if key == page["after"]:
+                    break
+        stop = None
+        if page["limit"] is not None:
+            stop = page["offset"] + page["limit"]
+        last = self.print_objects(islice(items, page["offset"], stop),
+                                  quote)
+        if last is not None and page["limit"] is not None and\
+                next(items, None) is not None:
+            print(f"** next page: after={last} **")
+
+    def print_objects(self, items, quote=False):
+        """
+        Print instances in a list format as they are iterated, writing
+        them by chunks of CHUNK_SIZE (the whole list of their string
+        representations is never built)
+
+        Paramaters
+        ----------
+        items : iterable
+            (<class name>.<id>, instance) of the instances to print
+        quote : bool (optional)
+            If True, instances are printed between quotes (like a list
+            of their string representations)
+
+        Returns
+        -------
+        str
+            <class name>.<id> of the last instance printed (None if
+            there is none)
+        """
+        write = sys.stdout.write
+        # repr() of a list of str quotes them like print() of the list
+        join = (lambda chunk: repr(chunk)[1:-1]) if quote else ", ".join
+        separator = "["
+        last = None
+        chunk = []
+        for last, obj in items:
+            chunk.append(str(obj))
+            if len(chunk) == self.CHUNK_SIZE:
+                write(separator + join(chunk))
+                separator = ", "
+                chunk = []
+        if chunk or separator == "[":
+            write(separator + join(chunk))
+        write("]\n")
+        return last
 
     def complete_all(self, text, line, begidx, endidx):
         """
@@ -190,33 +431,56 @@ class HBNBCommand(cmd.Cmd):
             >> All other argument is not used if number of arguments exceed 4.
             >> id, created_at, updated_at attribute name can't be updated.
         """
+        parsed = self.parse_update(line)
+        if parsed is not None:
+            key, attr_name, attr_val = parsed
+            # The instance is changed in place and saved
+            models.storage.update(key, **{attr_name: attr_val})
+
+    def parse_update(self, line):
+        """
+        Check the arguments of the update command and typecast the
+        attribute value (printing the error if they are not valid)
+
+        Paramaters
+        ----------
+        line : str
+            Arguments of the update command ('<class name> <id>
+            <attribute name> <attribute value>')
+
+        Returns
+        -------
+        tuple
+            (<class name>.<id>, attribute name, attribute value) or
+            None if the instance can't be updated
+        """
         # Arguments in a list
         args = line.split()
         forbidden_attr_names = ["id", "created_at", "updated_at"]
         if len(args) == 0:
             # If no class name is passed
             print("** class name missing **")
-            return
+            return None
         elif args[0] not in self.CLASSES:
             # If class name passed doesn't exist
             print("** class doesn't exist **")
-            return
+            return None
         elif len(args) < 2:
             # If id is not passed
             print("** instance id missing **")
-            return
-        elif args[0] + "." + args[1] not in models.storage.all():
+            return None
+        elif models.storage.get(args[0], args[1]) is None:
             # If class name and id passed doesn't exist
             print("** no instance found **")
-            return
+            return None
         elif len(args) < 3:
             # If attribute name is not passed
             print("** attribute name missing **")
-            return
+            return None
         elif len(args) < 4:
             # If attribute value is not passed
             print("** value missing **")
-            return
+            return None
         else:
             in_quote = False
             # Join from the 4th argument to the end of 'line'
@@ -236,19 +500,14 @@ class HBNBCommand(cmd.Cmd):
             if in_quote is False:
                 # Typecast the fourth argument if it's not in quoates
                 try:
-                    args[3] = eval(args[3])
+                    args[3] = ast.literal_eval(args[3])
                 except Exception as e:
                     args[3] = str(args[3])
             if args[2] not in forbidden_attr_names:
                 if type(args[3]) == str or type(args[3]) == int or\
                                     type(args[3]) == float:
-                    class_id_concat = args[0] + "." + args[1]
-                    obj_name = models.storage.all()[class_id_concat]
-                    obj_dict = obj_name.to_dict()
-                    obj_dict[args[2]] = args[3]
-                    new_obj = self.CLASSES[args[0]](**obj_dict)
-                    models.storage.new(new_obj)
-                    new_obj.save()
+                    return f"{args[0]}.{args[1]}", args[2], args[3]
+            return None
 
     def complete_update(self, text, line, begidx, endidx):
         """
@@ -258,143 +517,316 @@ class HBNBCommand(cmd.Cmd):
             return [c for c in self.CLASSES]
         return [c for c in self.CLASSES if c.startswith(text)]
 
-    def run_command(self, command, method):
+    def unquote(self, arg):
         """
-        Run a command if it is valid
+        Return 'arg' without the quotes around it (if any)
 
         Paramaters
         ----------
-        command : str
-            Command to run
-        method : str
-            Part of the 'command'
-        """
-        class_name = command.split(".")[0]
-        id_ = command.split("(")[1].split(")")[0]
-        error = False
-        if '"' in id_ and (id_[0] != '"' or id_[-1] != '"'):
-            error = True
-        if error is False:
-            id_ = re.sub('\"', '', id_)
-        if method == "show":
-            self.do_show(f'{class_name} {id_}')
-        if method == "destroy":
-            self.do_destroy(f'{class_name} {id_}')
-
-    def arg_process(self, arg, list_, idx):
-        """Process argument"""
-        if re.match(r'^.*\,$', list_[idx]):
-            list_[idx] = re.sub(r'\,', '', list_[idx])
-        else:
-            super().default(arg)
-            return
+        arg : str
+            Argument of a command
+        """
+        if len(arg) > 1 and arg[0] == arg[-1] and arg[0] in "\"'":
+            return arg[1:-1]
+        return arg
 
-    def default(self, arg):
+    def split_arguments(self, args):
         """
-        Run command passed if command is recognized else, print
-        default error message and return.
+        Split the arguments of a <class name>.<method>(...) command
+
+        Paramaters
+        ----------
+        args : str
+            Arguments separated by commas (commas between quotes are
+            part of the argument)
+
+        Returns
+        -------
+        list
+            The arguments (str), as written in the command
         """
-        commands = ["BaseModel.all()",
-                    "User.all()",
-                    "State.all()",
-                    "City.all()",
-                    "Amenity.all()",
-                    "Place.all()",
-                    "Review.all()",
-                    "BaseModel.count()",
-                    "User.count()",
-                    "State.count()",
-                    "City.count()",
-                    "Amenity.count()",
-                    "Place.count()",
-                    "Review.count()"]
-        if arg in commands:
-            class_, method = arg.split(".")
-            listed_objs = []
-            for obj_id, obj in models.storage.all().items():
-                if class_ == obj_id.split(".")[0]:
-                    listed_objs.append(str(obj))
-            if method == "all()":
-                # Retrieve all instances of a class and print in
-                # a list format.
-                # Usage: <class name>.all()
-                print("[", end="")
-                for i in range(len(listed_objs)):
-                    print(listed_objs[i], end="")
-                    if i != len(listed_objs) - 1:
-                        print(", ", end="")
-                print(']')
-                return
-            elif method == "count()":
-                # Retrieve the number of instances of a class.
-                # Usage: <class name>.count()
-                print(len(listed_objs))
-                return
-        if re.match(r".+\.show\(.*\)", arg):
-            # Rretrieve an instance based on its ID.
-            # Usage: <class name>.show(<id>)
-            self.run_command(arg, "show")
+        arguments = []
+        end = 0
+        while end < len(args):
+            match = self.ARGUMENT.match(args, end)
+            arguments.append(match.group(1))
+            end = match.end()
+        return arguments
+
+    def run_relation(self, class_name, relation, id_):
+        """
+        Print the objects related to an instance in a list format
+        (ex: the reviews of a Place)
+
+        Paramaters
+        ----------
+        class_name : str
+            Class name of the instance
+        relation : str
+            Name of the relation (see FileStorage.RELATIONS)
+        id_ : str
+            Id of the instance (may be in double quotes)
+        """
+        if class_name not in self.CLASSES:
+            print("** class doesn't exist **")
             return
-        if re.match(r".+\.destroy\(.*\)", arg):
-            # Destroy an instance based on his ID
-            # Usage: <class name>.destroy(<id>)
-            self.run_command(arg, "destroy")
+        id_ = id_.strip()
+        if re.match(r'^\".*\"$', id_):
+            id_ = id_[1:-1]
+        if not id_:
+            print("** instance id missing **")
             return
-        if re.match(r".+\.update\(.*\{.*\}\)", arg):
-            # Update an instance based on his ID with a dictionary
-            # Usage: <class name>.update(<id> <dictionary representation>)
-            class_name = arg.split(".")[0].split("(")[0]
-            id_ = arg.split("(")[1].split(" ")[0]
-            if re.match(r'^.*\,$', id_):
-                id_ = re.sub(',', '', id_)
-            else:
-                super().default(arg)
-                return
-            if '"' in id_ and (id_[0] != '"' or id_[-1] != '"'):
-                self.do_update(f'{class_name} {id_}')
+        if models.storage.get(class_name, id_) is None:
+            print("** no instance found **")
+            return
+        related_objs = models.storage.related(class_name, relation, id_)
+        print("[" + ", ".join(str(obj) for obj in related_objs.values()) +
+              "]")
+
+    def run_where(self, class_name, conditions):
+        """
+        Print the instances of a class matching every condition
+        in a list format
+
+        Paramaters
+        ----------
+        class_name : str
+            Class name of the instances
+        conditions : str
+            Conditions separated by commas (ex: 'price_by_night<100,
+            max_guest>=4'). The operators are <, <=, >, >=, == and !=.
+        """
+        if class_name not in self.CLASSES:
+            print("** class doesn't exist **")
+            return
+        parsed = []
+        end = 0
+        condition_re = re.compile(r'\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*'
+                                  r'("[^"]*"|\'[^\']*\'|[^,]*?)\s*(?:,|$)')
+        while end < len(conditions):
+            match = condition_re.match(conditions, end)
+            if match is None or match.end() == end:
+                print("** invalid condition **")
                 return
-            id_ = re.sub(r'\"', '', id_)
-            in_curly_braces = re.findall(r"\{.*\}", arg)[0]
-            dict_ = False
+            attr, op, value = match.groups()
             try:
-                dict_ = eval(in_curly_braces)
-            except Exception as e:
-                super().default(arg)
-                return
-            if dict_ and len(dict_) == 0:
-                class_and_id = class_name + "." + id_
-                self.do_update(class_and_id)
-                return
-            for attr_name, attr_val in dict_.items():
-                if type(attr_val) == str:
-                    class_args = f'{class_name} {id_} {attr_name} "{attr_val}"'
-                else:
-                    class_args = f'{class_name} {id_} {attr_name} {attr_val}'
-                self.do_update(class_args)
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                # Values that are not Python literals are strings
+                pass
+            parsed.append((attr, op, value))
+            end = match.end()
+        objs = models.storage.where(class_name, parsed)
+        print("[" + ", ".join(str(obj) for obj in objs.values()) + "]")
+
+    def run_geo(self, class_name, method, args):
+        """
+        Print the located instances of a class in a box, near a point
+        or nearest to a point in a list format (nearest first)
+
+        Paramaters
+        ----------
+        class_name : str
+            Class name of the instances (ex: Place)
+        method : str
+            'within' (args: min_lat, min_lon, max_lat, max_lon),
+            'near' (args: latitude, longitude, km) or
+            'nearest' (args: latitude, longitude, k)
+        args : str
+            Numbers separated by commas
+        """
+        if class_name not in self.CLASSES:
+            print("** class doesn't exist **")
             return
-        if re.match(r".+\.update\(.*\)", arg):
-            # Update an instance based on his ID.
-            # Usage: <class name>.update(<id> <attr name> <attr value>)
-            # <id> and <attribute name> but be in quotes
-            class_ = arg.split(".")[0]
-            args = arg.split("(")[1].split(")")[0]
-            class_args = class_ + " " + args
-            class_args_list = class_args.split()
-            if len(class_args_list) >= 2:
-                if len(class_args_list) > 2:
-                    self.arg_process(arg, class_args_list, 1)
-                if re.match(r'^\".*\"$', class_args_list[1]):
-                    class_args_list[1] = re.sub(r'\"', '', class_args_list[1])
-            if len(class_args_list) >= 3:
-                if len(class_args_list) > 3:
-                    self.arg_process(arg, class_args_list, 2)
-                if re.match(r'^\".*\"$', class_args_list[2]):
-                    class_args_list[2] = re.sub(r'\"', '', class_args_list[2])
-            class_args = " ".join(class_args_list)
-            self.do_update(class_args)
+        counts = {"within": 4, "near": 3, "nearest": 3}
+        try:
+            values = ast.literal_eval(f"({args},)") if args.strip() else ()
+        except (ValueError, SyntaxError):
+            values = None
+        if type(values) is not tuple or len(values) != counts[method] or\
+                any(type(value) not in (int, float) for value in values) or\
+                (method == "nearest" and type(values[-1]) is not int):
+            print("** invalid arguments **")
             return
+        objs = getattr(models.storage, method)(class_name, *values)
+        print("[" + ", ".join(str(obj) for obj in objs.values()) + "]")
+
+    def dot_all(self, class_name, method, args):
+        """
+        Print all instances of a class in a list format
+        Usage: <class name>.all()
+               <class name>.all([limit=<n>], [offset=<n>], [after=<key>])
+        (see the all command)
+        """
+        if class_name not in self.CLASSES:
+            return False
+        self.print_page(class_name, self.split_arguments(args), False)
+
+    def dot_count(self, class_name, method, args):
+        """
+        Print the number of instances of a class
+        Usage: <class name>.count()
+        """
+        if class_name not in self.CLASSES or args.strip():
+            return False
+        print(models.storage.count(class_name))
+
+    def dot_show(self, class_name, method, args):
+        """
+        Print the string representation of an instance
+        Usage: <class name>.show(<id>)
+        """
+        self.do_show(f"{class_name} {self.unquote(args.strip())}")
+
+    def dot_destroy(self, class_name, method, args):
+        """
+        Delete an instance
+        Usage: <class name>.destroy(<id>)
+        """
+        self.do_destroy(f"{class_name} {self.unquote(args.strip())}")
+
+    def dot_update(self, class_name, method, args):
+        """
+        Update an instance with an attribute or a dictionary
+        Usage: <class name>.update(<id>, <attribute name>,
+               <attribute value>)
+               <class name>.update(<id>, <dictionary representation>)
+        Arguments that do not parse (not separated by commas, words
+        with spaces not between quotes) are an unknown syntax
+        """
+        match = self.ARGUMENT.match(args)
+        if not self.WORD.match(match.group(1)):
+            # Arguments not separated by commas (ex: <id> <dictionary>)
+            return False
+        id_ = self.unquote(match.group(1))
+        rest = args[match.end():].strip()
+        if not rest.startswith("{"):
+            arguments = self.split_arguments(rest)
+            if not all(self.WORD.match(arg) for arg in arguments[:2]):
+                return False
+            if arguments:
+                arguments[0] = self.unquote(arguments[0])
+            self.do_update(" ".join([class_name, id_] + arguments[:2]))
+            return None
+        try:
+            dict_ = ast.literal_eval(rest)
+        except (ValueError, SyntaxError, TypeError):
+            return False
+        if type(dict_) is not dict:
+            return False
+        # Every attribute is checked like by the update command,
+        # then they are all set at once and saved once
+        key = None
+        attrs = {}
+        for attr_name, attr_val in dict_.items():
+            if type(attr_val) == str:
+                class_args = f'{class_name} {id_} {attr_name} "{attr_val}"'
+            else:
+                class_args = f'{class_name} {id_} {attr_name} {attr_val}'
+            parsed = self.parse_update(class_args)
+            if parsed is not None:
+                key, attr_name, attr_val = parsed
+                attrs[attr_name] = attr_val
+        if attrs:
+            models.storage.update(key, **attrs)
+        return None
+
+    def dot_where(self, class_name, method, args):
+        """
+        Print the instances of a class matching conditions
+        Usage: <class name>.where(<attr><op><value>, ...)
+        (ex: Place.where(price_by_night<100, max_guest>=4))
+        """
+        self.run_where(class_name, args)
+
+    def dot_geo(self, class_name, method, args):
+        """
+        Print the located instances of a class in a box, within a
+        distance (km) of a point or nearest to a point
+        Usage: <class name>.within(<min lat>, <min lon>, <max lat>,
+               <max lon>), <class name>.near(<lat>, <lon>, <km>) or
+               <class name>.nearest(<lat>, <lon>, <number of instances>)
+        """
+        if class_name not in models.storage.GEO_ATTRS:
+            return False
+        self.run_geo(class_name, method, args)
+
+    # Handler of each <class name>.<method>(...) command, returning
+    # False if the command is not valid
+    DOT_METHODS = {"all": dot_all,
+                   "count": dot_count,
+                   "show": dot_show,
+                   "destroy": dot_destroy,
+                   "update": dot_update,
+                   "where": dot_where,
+                   "within": dot_geo,
+                   "near": dot_geo,
+                   "nearest": dot_geo}
+
+    def parse_dot_command(self, arg):
+        """
+        Parse a <class name>.<method>(<arguments>) command
+
+        Paramaters
+        ----------
+        arg : str
+            Command line
+
+        Returns
+        -------
+        tuple
+            (handler, class name, method, arguments) or None if the
+            command is not a <class name>.<method>(...) command. The
+            handler is a function of DOT_METHODS, or run_relation()
+            (ex: Place.reviews(<id>), City.places(<id>))
+        """
+        match = self.DOT_COMMAND.match(arg)
+        if match is None:
+            return None
+        class_name, method, args = match.groups()
+        handler = self.DOT_METHODS.get(method)
+        if handler is None:
+            if (class_name, method) not in models.storage.RELATIONS:
+                return None
+            handler = HBNBCommand.run_relation
+        return handler, class_name, method, args
+
+    def default(self, arg):
+        """
+        Run command passed if command is recognized else, print
+        default error message and return.
+        """
+        parsed = self.parse_dot_command(arg)
+        if parsed is not None:
+            handler, class_name, method, args = parsed
+            if handler(self, class_name, method, args) is not False:
+                return
         super().default(arg)
 
 
+def timed_onecmd(onecmd):
+    """Return 'onecmd' (HBNBCommand.onecmd()) recording the latency of
+    each command (see models.metrics) as console.<command> (ex:
+    console.show, console.User.count())"""
+    @functools.wraps(onecmd)
+    def recorded(self, line):
+        start = time.perf_counter()
+        try:
+            return onecmd(self, line)
+        finally:
+            models.metrics.record("console." + self.command_name(line),
+                                  time.perf_counter() - start)
+    return recorded
+
+
+# Commands are only timed while metrics are on: onecmd() is not changed
+# while they are off
+models.metrics.register(HBNBCommand, "onecmd", timed_onecmd)
+
+
 if __name__ == "__main__":
-    HBNBCommand().cmdloop()
+    if len(sys.argv) > 1 and sys.argv[1] == "--batch":
+        # Usage: ./console.py --batch [<file of commands>]
+        HBNBCommand().run_batch(sys.argv[2] if len(sys.argv) > 2 else "-")
+    else:
+        HBNBCommand().cmdloop()
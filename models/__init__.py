@@ -1,7 +1,63 @@
 #!/usr/bin/python3
 
+import os
 from models.engine.file_storage import FileStorage
+from models.engine.metrics import metrics
 
 
-storage = FileStorage()
+# The storage engine is selected with the HBNB_TYPE_STORAGE environment
+# variable: "file" (default), "journal" (append-only log), "wal"
+# (snapshots and write-ahead log), "sharded" (a file per class and
+# shard) or "db" (SQLite database)
+if os.getenv("HBNB_TYPE_STORAGE") == "journal":
+    from models.engine.journal_storage import JournalStorage
+    storage = JournalStorage()
+elif os.getenv("HBNB_TYPE_STORAGE") == "wal":
+    from models.engine.wal_storage import WALStorage
+    storage = WALStorage()
+elif os.getenv("HBNB_TYPE_STORAGE") == "sharded":
+    from models.engine.sharded_storage import ShardedStorage
+    storage = ShardedStorage()
+    # Directory of the files and number of shards by class
+    if os.getenv("HBNB_STORAGE_ROOT"):
+        storage.ROOT = os.getenv("HBNB_STORAGE_ROOT")
+    if os.getenv("HBNB_SHARDS"):
+        storage.SHARDS = int(os.getenv("HBNB_SHARDS"))
+elif os.getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage()
+else:
+    storage = FileStorage()
+# With HBNB_STORAGE_FORMAT=binary, objects are saved in file.bin in a
+# compact binary format instead of file.json (see models.engine.serializers)
+if os.getenv("HBNB_STORAGE_FORMAT") == "binary":
+    storage.FORMAT = "binary"
+# With HBNB_COMPACT_MODELS=1, objects use less memory (see models.compact)
+if os.getenv("HBNB_COMPACT_MODELS") == "1":
+    storage.COMPACT_MODELS = True
+# With HBNB_LAZY_RELOAD=1, objects are only built when first accessed
+if os.getenv("HBNB_LAZY_RELOAD") == "1":
+    storage.LAZY_RELOAD = True
+# Group commit: with HBNB_GROUP_COMMIT_WINDOW=<seconds> and/or
+# HBNB_GROUP_COMMIT_SIZE=<number of saves>, the saves done within the
+# window (or until the number of saves) are written together
+if os.getenv("HBNB_GROUP_COMMIT_WINDOW"):
+    storage.GROUP_COMMIT_WINDOW = float(os.getenv("HBNB_GROUP_COMMIT_WINDOW"))
+if os.getenv("HBNB_GROUP_COMMIT_SIZE"):
+    storage.GROUP_COMMIT_SIZE = int(os.getenv("HBNB_GROUP_COMMIT_SIZE"))
+# With HBNB_RELOAD_WORKERS=<number of processes>, the file is parsed by
+# several processes on reload (threads for the sharded engine)
+if os.getenv("HBNB_RELOAD_WORKERS"):
+    storage.RELOAD_WORKERS = int(os.getenv("HBNB_RELOAD_WORKERS"))
+# With HBNB_SNAPSHOT_RECORDS=<number of records>, the wal engine takes a
+# snapshot once its log holds that number of records
+if os.getenv("HBNB_SNAPSHOT_RECORDS"):
+    storage.SNAPSHOT_RECORDS = int(os.getenv("HBNB_SNAPSHOT_RECORDS"))
+# With HBNB_RENDER_CACHE=0, str() and to_dict() of objects are not cached
+if os.getenv("HBNB_RENDER_CACHE") == "0":
+    storage.RENDER_CACHE = False
+# With HBNB_METRICS=1, the storage methods and console commands are
+# timed from the start (see models.engine.metrics and the stats command)
+if os.getenv("HBNB_METRICS") == "1":
+    metrics.enable(storage)
 storage.reload()
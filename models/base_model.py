@@ -1,10 +1,10 @@
 #!/usr/bin/python3
 
-"""In this module defines the BaseModel class"""
+"""In this module defines the BaseModel class and attributes_of(), which
+parses the dictionary of an object saved by storage"""
 
 import uuid
 from datetime import datetime
-import re
 from models import storage
 
 
@@ -20,19 +20,54 @@ class BaseModel:
         The date and time a new user is created.
     updated_at : datetime.datetime (instance attribute)
         The date and time a user (profile) is updated.
+    _registry : dict (class attribute)
+        BaseModel and every model class defined from it by class name
+        (see FileStorage.classes())
 
     Methods
     -------
+    __init_subclass__() (class method)
+        Register a new model class in '_registry'
+    _attributes()
+        Return the dictionary of the attributes of the instance
+    from_dict(obj_dict) (class method)
+        Return an object built from the dictionary 'obj_dict' (as
+        returned by to_dict()) without registering it in storage
+    from_attributes(attrs) (class method)
+        Return an object whose attributes are 'attrs' without
+        registering it in storage
+    __setattr__(name, value)
+        Set the attribute 'name' and mark the object as changed
+        in storage
+    __delattr__(name)
+        Delete the attribute 'name' and mark the object as changed
+        in storage
     save()
          Update the public instance attribute updated_at with the
          current datetime (i.e the current datetime object is saved)
          and save the object (user data) in a file
     to_dict()
         Return a dictionary containing all keys/values of __dict__
-        of the instance
+        of the instance (cached by storage until the object changes)
+    _render_dict()
+        Return the dictionary of to_dict() without the cache
     __str__()
          Return and print the string representation of BaseModel object
+         (cached by storage until the object changes)
+    _render_str()
+        Return the string representation without the cache
     """
+    _registry = {}
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Register the model class 'cls' in '_registry' (the first class
+        defined with a name is kept, not its compact version, see
+        models.compact)
+        """
+        super().__init_subclass__(**kwargs)
+        BaseModel._registry.setdefault(cls.__name__, cls)
+
     def __init__(self, *args, **kwargs):
         """
         Parameters
@@ -46,19 +81,14 @@ class BaseModel:
         self.updated_at = datetime.now()
         if kwargs and len(kwargs) > 0:
             for key, value in kwargs.items():
-                time_fmt = '%Y-%m-%d %H:%M:%S.%f'
                 if key == "id":
                     self.id = str(value)
                 elif key == "created_at":
-                    # Replace the 'T' in str type  datetime with ' '
-                    value_fmt = re.sub('T', ' ', value)
                     # Convert the str type datetime to datetime object
-                    self.created_at = datetime.strptime(value_fmt, time_fmt)
+                    self.created_at = _to_datetime(value)
                 elif key == "updated_at":
-                    # Replace the 'T' in str type  datetime with ' '
-                    value_fmt = re.sub('T', ' ', value)
                     # Convert the str type datetime to datetime object
-                    self.updated_at = datetime.strptime(value_fmt, time_fmt)
+                    self.updated_at = _to_datetime(value)
                 else:
                     if key != "__class__":
                         # If key in kwargs is not the instance attribute except
@@ -67,6 +97,78 @@ class BaseModel:
         else:
             storage.new(self)
 
+    @classmethod
+    def from_dict(cls, obj_dict):
+        """
+        Return an object built from 'obj_dict' like cls(**obj_dict)
+        does, without going through __setattr__ for each attribute.
+        This is the fast path used to load objects from storage.
+
+        Parameters
+        ----------
+        obj_dict : dict
+            dictionary of an object (as returned by to_dict())
+
+        Returns
+        -------
+        The object (not registered in storage)
+        """
+        return cls.from_attributes(attributes_of(obj_dict))
+
+    @classmethod
+    def from_attributes(cls, attrs):
+        """
+        Return an object whose attributes are 'attrs' (as returned by
+        attributes_of()), without going through __setattr__
+
+        Parameters
+        ----------
+        attrs : dict
+            attributes by name, in order
+
+        Returns
+        -------
+        The object (not registered in storage)
+        """
+        obj = cls.__new__(cls)
+        obj._load_attributes(attrs)
+        return obj
+
+    def __setattr__(self, name, value):
+        """
+        Set the attribute 'name' to 'value' and mark the object as
+        changed so storage serializes it again on the next save
+        """
+        super().__setattr__(name, value)
+        storage.mark_dirty(self, name)
+
+    def __delattr__(self, name):
+        """
+        Delete the attribute 'name' and mark the object as changed
+        so storage serializes it again on the next save
+        """
+        super().__delattr__(name)
+        storage.mark_dirty(self, name)
+
+    def _attributes(self):
+        """
+        Return the dictionary of the attributes of the instance
+        (its __dict__, see models.compact for compact objects)
+        """
+        return self.__dict__
+
+    def _load_attributes(self, attrs):
+        """
+        Set all attributes of the instance from 'attrs' without
+        marking the object as changed
+
+        Parameters
+        ----------
+        attrs : dict
+            attributes by name, in order
+        """
+        self.__dict__.update(attrs)
+
     def save(self):
         """
         Update the public instance attribute 'updated_at' with the current
@@ -74,6 +176,9 @@ class BaseModel:
         object (user data) in a file
         """
         self.updated_at = datetime.now()
+        # Register the object again so engines that only persist
+        # changed objects (e.g JournalStorage) know it was modified
+        storage.new(self)
         storage.save()
 
     def to_dict(self):
@@ -81,9 +186,19 @@ class BaseModel:
         Return a dictionary containing all keys/values of
         __dict__ of the instance.
         The created_at and updated_at keys in the dictionary
-        are of string type datetime
+        are of string type datetime.
+        The dictionary of a stored object is cached until the object
+        changes (see FileStorage.render_dict()), each call returns a
+        new copy
+        """
+        return storage.render_dict(self)
+
+    def _render_dict(self):
+        """
+        Return the dictionary returned by to_dict(), built from the
+        attributes of the instance
         """
-        obj_dict = self.__dict__.copy()
+        obj_dict = self._attributes().copy()
         obj_dict['__class__'] = self.__class__.__name__
         obj_dict['created_at'] = self.created_at.isoformat()
         obj_dict['updated_at'] = self.updated_at.isoformat()
@@ -92,5 +207,53 @@ class BaseModel:
     def __str__(self):
         """
         Return and print the string representation of BaseModel object
+        (cached until the object changes, see FileStorage.render_str())
+        """
+        return storage.render_str(self)
+
+    def _render_str(self):
+        """
+        Return the string representation of the object, built from
+        its attributes
         """
-        return f"[{self.__class__.__name__}] ({self.id}) {self.__dict__}"
+        return (f"[{self.__class__.__name__}] ({self.id}) "
+                f"{self._attributes()}")
+
+
+def attributes_of(obj_dict):
+    """Return the attributes of the object of the dictionary 'obj_dict'
+    (as returned by to_dict()), in the order set by
+    BaseModel.__init__(**obj_dict): the id as a str and created_at and
+    updated_at as datetime objects (see BaseModel.from_dict())
+
+    Parameters
+    ----------
+    obj_dict : dict
+        dictionary of an object (as returned by to_dict())
+
+    Returns
+    -------
+    dict
+        attributes by name, without '__class__'
+    """
+    attrs = {"id": None, "created_at": None, "updated_at": None}
+    attrs.update(obj_dict)
+    attrs.pop("__class__", None)
+    if "id" in obj_dict:
+        attrs["id"] = str(attrs["id"])
+    else:
+        attrs["id"] = str(uuid.uuid4())
+    for key in ("created_at", "updated_at"):
+        if key in obj_dict:
+            attrs[key] = _to_datetime(attrs[key])
+        else:
+            attrs[key] = datetime.now()
+    return attrs
+
+
+def _to_datetime(value):
+    """Return the datetime object of 'value', a datetime in ISO format
+    (as returned by datetime.isoformat()) or a datetime object"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
@@ -0,0 +1,127 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the compact (__slots__ based) representation
+of the models, used when HBNB_COMPACT_MODELS=1.
+
+compact_class(User) returns a subclass of User, also named User, that
+stores id, created_at, updated_at and the attributes declared in User
+(email, password, ...) in __slots__ instead of a __dict__ per object.
+Other attributes (e.g added with the update command) are stored in the
+instance __dict__, only created when the first one is set.
+"""
+
+
+class CompactModel:
+    """
+    Impliment the behaviour shared by the compact model classes
+
+    Attributes
+    ----------
+    _defaults : dict (class attribute)
+        class level default value of the declared attributes
+        (ex: User.email is "")
+    _order : tuple
+        names of the attributes set on the instance, in the order they
+        were first set (the order of __dict__ for a regular object).
+        Instances with the same attributes share the same tuple.
+    __orders : dict (private class attribute)
+        every attribute order in use, to share the tuples
+
+    Methods
+    -------
+    __getattr__(name)
+        Return the class level default of a declared attribute
+        not set on the instance
+    __setattr__(name, value)
+        Set the attribute 'name' and record its position
+    __delattr__(name)
+        Delete the attribute 'name'
+    _attributes()
+        Return a dictionary of the attributes like __dict__ of a
+        regular object
+    _load_attributes(attrs)
+        Set all attributes of the instance from the dictionary 'attrs'
+    """
+    __slots__ = ()
+    _defaults = {"_order": ()}
+    __orders = {}
+
+    def __getattr__(self, name):
+        """Return the class level default of the declared attribute
+        'name' when it is not set on the instance"""
+        try:
+            return self._defaults[name]
+        except KeyError:
+            raise AttributeError(f"'{self.__class__.__name__}' object "
+                                 f"has no attribute '{name}'") from None
+
+    def __setattr__(self, name, value):
+        """Set the attribute 'name' to 'value' and record its position
+        the first time it is set"""
+        order = self._order
+        if name not in order:
+            order = order + (name,)
+            object.__setattr__(self, "_order",
+                               self.__orders.setdefault(order, order))
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        """Delete the attribute 'name' and forget its position"""
+        super().__delattr__(name)
+        order = tuple(attr for attr in self._order if attr != name)
+        object.__setattr__(self, "_order",
+                           self.__orders.setdefault(order, order))
+
+    def _attributes(self):
+        """Return a dictionary of the attributes of the instance,
+        in the order they were set (like __dict__ of a regular object)
+        """
+        get = object.__getattribute__
+        return {name: get(self, name) for name in self._order}
+
+    def _load_attributes(self, attrs):
+        """Set all attributes of the instance from 'attrs' without
+        marking the object as changed
+
+        Parameters
+        ----------
+        attrs : dict
+            attributes by name, in order
+        """
+        set_attr = object.__setattr__
+        for name, value in attrs.items():
+            set_attr(self, name, value)
+        order = tuple(attrs)
+        set_attr(self, "_order", self.__orders.setdefault(order, order))
+
+
+def compact_class(cls):
+    """Return the compact version of the model class 'cls'
+
+    Parameters
+    ----------
+    cls : class
+        BaseModel or one of its subclasses
+
+    Returns
+    -------
+    class
+        subclass of 'cls' with the same name, storing the attributes
+        declared in 'cls' in __slots__
+    """
+    defaults = dict(CompactModel._defaults)
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if not name.startswith("_") and not callable(value) and\
+                    not isinstance(value, (classmethod, staticmethod,
+                                           property)):
+                defaults[name] = value
+    slots = ("id", "created_at", "updated_at") +\
+        tuple(name for name in defaults if name != "_order") + ("_order",)
+    namespace = {"__slots__": slots,
+                 "__module__": cls.__module__,
+                 "__qualname__": cls.__qualname__,
+                 "__doc__": cls.__doc__,
+                 "_defaults": defaults}
+    return type(cls.__name__, (CompactModel, cls), namespace)
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+
+"""
+In this module defines atomic_open(), used to replace a file so that
+it holds either its previous content or its new content, never a
+partially written one (e.g if the process is killed while writing).
+
+The new content is written to '<path>.tmp', flushed to the disk and the
+temporary file is then renamed to 'path' (os.replace() is atomic).
+"""
+
+from contextlib import contextmanager
+import os
+
+
+def _sync_directory(path):
+    """Flush to the disk the directory entry of the file 'path' (so a
+    rename is not lost on power failure)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)),
+                 os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_open(path, mode='w', fsync=True):
+    """Open a temporary file to write the new content of 'path'. The
+    temporary file replaces 'path' when the 'with' block ends without
+    error, and is removed otherwise.
+
+    Parameters
+    ----------
+    path : str
+        file to replace
+    mode : str (optional)
+        'w' (text) or 'wb' (binary)
+    fsync : bool (optional)
+        if True, the new content is on the disk when the 'with' block
+        ends (False for files that can be rebuilt, e.g indexes)
+
+    Yields
+    ------
+    file object
+        the temporary file
+    """
+    tmp_path = path + ".tmp"
+    f = open(tmp_path, mode)
+    try:
+        yield f
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+        f.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        f.close()
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        _sync_directory(path)
@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+
+"""
+In this module defines ColumnStore class, a columnar copy of the
+numeric attributes of the objects of one class (e.g the price_by_night,
+max_guest, ... of every Place) used to filter objects without going
+through every object.
+
+Columns are array.array('d') (one float per object). Filters are
+evaluated on whole columns at once with NumPy if it is installed, or
+with map() over the arrays otherwise.
+"""
+
+from array import array
+from itertools import compress, repeat
+import operator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt,
+             ">=": operator.ge, "==": operator.eq, "!=": operator.ne}
+
+
+def numeric_attrs(cls):
+    """Return the names of the numeric attributes declared in 'cls'
+    (class attributes with an int or float default value)
+
+    Parameters
+    ----------
+    cls : class
+        model class (ex: Place)
+
+    Returns
+    -------
+    tuple
+        attribute names (ex: ("number_rooms", ...))
+    """
+    attrs = []
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if not name.startswith("_") and type(value) in (int, float) and\
+                    name not in attrs:
+                attrs.append(name)
+    return tuple(attrs)
+
+
+def to_float(value):
+    """Return 'value' as a float, or NaN if it is not a number. NaN
+    only matches the != conditions, like a value that is not a number
+    compared with a number (ex: None != 3)"""
+    if type(value) in (int, float):
+        return float(value)
+    return float("nan")
+
+
+class ColumnStore:
+    """
+    Impliment a columnar copy of the numeric attributes of the
+    objects of one class
+
+    Attributes
+    ----------
+    attrs : tuple
+        names of the attributes stored in columns
+    columns : dict
+        array.array('d') by attribute name, one value per row
+    keys : list
+        key (<class name>.id) of the object of each row (None for
+        the rows of deleted objects)
+    rows : dict
+        row of each object by key
+    live : bytearray
+        1 for the rows in use, 0 for the rows of deleted objects
+    free : list
+        rows of deleted objects that can be reused
+
+    Methods
+    -------
+    put(key, obj)
+        Set the values of the object 'obj' in the columns
+    update(key, obj, attr)
+        Set the value of the attribute 'attr' of 'obj'
+    remove(key)
+        Remove the object with key 'key' from the columns
+    where(conditions)
+        Return the keys of the objects matching every condition
+    """
+
+    def __init__(self, attrs):
+        """
+        Parameters
+        ----------
+        attrs : tuple
+            names of the attributes stored in columns
+        """
+        self.attrs = attrs
+        self.columns = {attr: array('d') for attr in attrs}
+        self.keys = []
+        self.rows = {}
+        self.live = bytearray()
+        self.free = []
+
+    def put(self, key, obj):
+        """Set the values of the attributes of 'obj' in the columns
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        obj : any object in models.base_model module (e.g Place)
+        """
+        row = self.rows.get(key)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+                self.keys[row] = key
+                self.live[row] = 1
+            else:
+                row = len(self.keys)
+                self.keys.append(key)
+                self.live.append(1)
+                for column in self.columns.values():
+                    column.append(0.0)
+            self.rows[key] = row
+        for attr, column in self.columns.items():
+            column[row] = to_float(getattr(obj, attr, None))
+
+    def update(self, key, obj, attr):
+        """Set the value of the attribute 'attr' of 'obj' in its column
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        obj : any object in models.base_model module (e.g Place)
+        attr : str
+            attribute name
+        """
+        row = self.rows.get(key)
+        if row is not None:
+            self.columns[attr][row] = to_float(getattr(obj, attr, None))
+
+    def remove(self, key):
+        """Remove the object with key 'key' from the columns
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        """
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self.keys[row] = None
+            self.live[row] = 0
+            self.free.append(row)
+
+    def where(self, conditions):
+        """Return the keys of the objects matching every condition
+
+        Parameters
+        ----------
+        conditions : list
+            (attribute name, operator, number) tuples where the operator
+            is one of <, <=, >, >=, ==, != (ex: ("max_guest", ">=", 4))
+
+        Returns
+        -------
+        list
+            keys of the matching objects
+        """
+        if numpy is not None:
+            mask = numpy.frombuffer(self.live, dtype=numpy.uint8) != 0
+            for attr, op, value in conditions:
+                column = numpy.frombuffer(self.columns[attr],
+                                          dtype=numpy.float64)
+                mask &= OPERATORS[op](column, value)
+            return [self.keys[row] for row in numpy.flatnonzero(mask)]
+        # Without NumPy, each condition is only evaluated on the rows
+        # matching the previous ones
+        rows = list(compress(range(len(self.keys)), self.live))
+        for attr, op, value in conditions:
+            column = self.columns[attr]
+            if len(rows) == len(column):
+                values = iter(column)
+            else:
+                values = map(column.__getitem__, rows)
+            rows = list(compress(rows, map(OPERATORS[op], values,
+                                           repeat(value))))
+        return list(map(self.keys.__getitem__, rows))
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the conversion of a storage file from one
+format to the other (see models.engine.serializers).
+
+Usage: python3 -m models.engine.convert <source> <destination>
+    The format of the source is read from the file, the format of the
+    destination is chosen from its extension (.json or .bin)
+    (ex: python3 -m models.engine.convert file.json file.bin)
+"""
+
+import sys
+from models import storage
+from models.engine.atomic_file import atomic_open
+from models.engine.serializers import detect_format, format_of
+
+
+def convert(source, destination):
+    """Convert the storage file 'source' to 'destination', the format
+    of 'destination' is chosen from its extension (.json or .bin)
+
+    Parameters
+    ----------
+    source : str
+        path of the file to convert
+    destination : str
+        path of the converted file
+
+    Returns
+    -------
+    int
+        number of objects converted
+    """
+    classes = storage.classes()
+    with open(source, 'rb') as f:
+        obj_dicts = detect_format(source).load(f)
+    objects = {key: classes[obj_dict["__class__"]].from_dict(obj_dict)
+               for key, obj_dict in obj_dicts.items()}
+    with atomic_open(destination, 'wb') as f:
+        format_of(destination).dump(f, objects)
+    return len(objects)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python3 -m models.engine.convert "
+              "<source> <destination>")
+        sys.exit(1)
+    print(f"{convert(sys.argv[1], sys.argv[2])} objects converted")
@@ -0,0 +1,287 @@
+#!/usr/bin/python3
+
+"""
+In this module defines DBStorage class and the functions reading and
+writing objects in its SQLite database:
+    connect(path, classes) : open the database and create the tables
+    write_rows(connection, classes, obj_dicts) : insert or replace
+        objects
+    delete_rows(connection, keys) : delete objects
+    read_rows(connection, classes) : read every object
+
+Each model class has its own table, named after the class, with one
+column per attribute declared in the class (ex: Place.number_rooms):
+    id TEXT PRIMARY KEY, created_at TEXT, updated_at TEXT,
+    <declared attributes>, extra TEXT
+List attributes are stored as JSON. Attributes that are not declared,
+or whose value doesn't have the type of the declared default (ex: a
+str set to number_rooms), are stored in the 'extra' column as a JSON
+object, so every object is read back as it was saved.
+"""
+
+import json
+import sqlite3
+from models.engine.file_storage import FileStorage
+
+COLUMN_TYPES = {str: "TEXT", int: "INTEGER", float: "REAL", list: "TEXT"}
+# Integers SQLite can store (64 bits)
+MIN_INT = -2 ** 63
+MAX_INT = 2 ** 63 - 1
+
+
+def declared_attrs(cls):
+    """Return the attributes declared in 'cls' (class attributes with
+    a str, int, float or list default value) and their type
+
+    Parameters
+    ----------
+    cls : class
+        model class (ex: Place)
+
+    Returns
+    -------
+    dict
+        type of the default value by attribute name
+        (ex: {"city_id": str, ..., "number_rooms": int, ...})
+    """
+    attrs = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if not name.startswith("_") and type(value) in COLUMN_TYPES:
+                attrs.setdefault(name, type(value))
+    return attrs
+
+
+def connect(path, classes):
+    """Open the database 'path' (created if it doesn't exist) in WAL
+    mode, with a table for each class in 'classes'
+
+    Parameters
+    ----------
+    path : str
+        database file
+    classes : dict
+        model classes by name (see FileStorage.classes())
+
+    Returns
+    -------
+    sqlite3.Connection
+        connection that can be used by several threads (one at a time)
+    """
+    connection = sqlite3.connect(path, check_same_thread=False)
+    # Readers don't wait for writers (and the other way around)
+    connection.execute("PRAGMA journal_mode=WAL")
+    with connection:
+        for class_name, cls in classes.items():
+            attrs = declared_attrs(cls)
+            columns = ", ".join(f'"{name}" {COLUMN_TYPES[attr_type]}'
+                                for name, attr_type in attrs.items())
+            connection.execute(
+                f'CREATE TABLE IF NOT EXISTS "{class_name}" '
+                f'(id TEXT PRIMARY KEY, created_at TEXT, updated_at TEXT, '
+                f'{columns + ", " if columns else ""}extra TEXT)')
+            # Attributes declared since the table was created
+            existing = {row[1] for row in connection.execute(
+                f'PRAGMA table_info("{class_name}")')}
+            for name, attr_type in attrs.items():
+                if name not in existing:
+                    connection.execute(
+                        f'ALTER TABLE "{class_name}" ADD COLUMN '
+                        f'"{name}" {COLUMN_TYPES[attr_type]}')
+                if name.endswith("_id"):
+                    connection.execute(
+                        f'CREATE INDEX IF NOT EXISTS "{class_name}_{name}" '
+                        f'ON "{class_name}" ("{name}")')
+    return connection
+
+
+def _column_value(value, attr_type):
+    """Return 'value' as stored in the column of an attribute of type
+    'attr_type', or None if it must be stored in the 'extra' column"""
+    if type(value) is not attr_type:
+        return None
+    if attr_type is list:
+        return json.dumps(value)
+    if attr_type is int and not MIN_INT <= value <= MAX_INT:
+        return None
+    if attr_type is float and value != value:
+        # NaN is stored as NULL by SQLite
+        return None
+    return value
+
+
+def write_rows(connection, classes, obj_dicts):
+    """Insert (or replace) objects in their table, in the current
+    transaction of 'connection'
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        connection returned by connect()
+    classes : dict
+        model classes by name (see FileStorage.classes())
+    obj_dicts : iterable
+        dictionaries of the objects (as returned by to_dict())
+    """
+    rows = {}
+    attrs = {}
+    for obj_dict in obj_dicts:
+        obj_dict = dict(obj_dict)
+        class_name = obj_dict.pop("__class__")
+        table = rows.get(class_name)
+        if table is None:
+            table = rows[class_name] = []
+            attrs[class_name] = declared_attrs(classes[class_name])
+        row = [obj_dict.pop("id"), obj_dict.pop("created_at", None),
+               obj_dict.pop("updated_at", None)]
+        for name, attr_type in attrs[class_name].items():
+            value = _column_value(obj_dict.get(name), attr_type)
+            if value is not None:
+                del obj_dict[name]
+            row.append(value)
+        row.append(json.dumps(obj_dict) if obj_dict else None)
+        table.append(row)
+    for class_name, table in rows.items():
+        names = ["id", "created_at", "updated_at",
+                 *attrs[class_name], "extra"]
+        connection.executemany(
+            f'INSERT OR REPLACE INTO "{class_name}" ('
+            + ", ".join(f'"{name}"' for name in names) + ") VALUES ("
+            + ", ".join("?" * len(names)) + ")", table)
+
+
+def delete_rows(connection, keys):
+    """Delete objects from their table, in the current transaction of
+    'connection'
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        connection returned by connect()
+    keys : iterable
+        keys (<class name>.id) of the objects to delete
+    """
+    for key in keys:
+        class_name, obj_id = key.split(".", 1)
+        connection.execute(f'DELETE FROM "{class_name}" WHERE id = ?',
+                           (obj_id,))
+
+
+def read_rows(connection, classes):
+    """Return the dictionaries of every object in the database
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+        connection returned by connect()
+    classes : dict
+        model classes by name (see FileStorage.classes())
+
+    Returns
+    -------
+    dict
+        dictionaries of the objects (as returned by to_dict()) by key
+    """
+    obj_dicts = {}
+    for class_name, cls in classes.items():
+        attrs = declared_attrs(cls)
+        names = ["id", "created_at", "updated_at", *attrs]
+        lists = {name for name, attr_type in attrs.items()
+                 if attr_type is list}
+        cursor = connection.execute(
+            "SELECT " + ", ".join(f'"{name}"' for name in names) +
+            f', extra FROM "{class_name}"')
+        for row in cursor:
+            obj_dict = {"__class__": class_name}
+            for name, value in zip(names, row):
+                if value is not None:
+                    obj_dict[name] = json.loads(value) if name in lists\
+                        else value
+            if row[-1] is not None:
+                obj_dict.update(json.loads(row[-1]))
+            obj_dicts[f"{class_name}.{obj_dict['id']}"] = obj_dict
+    return obj_dicts
+
+
+class DBStorage(FileStorage):
+    """
+    Impliment the storage of objects (users' data) in a SQLite database
+    (see the module docstring for the tables)
+
+    Objects are loaded in memory by reload() and queried like in
+    FileStorage, but save() only writes the objects changed since the
+    last save (and deletes the ones deleted), in a transaction,
+    instead of the whole file.
+
+    Attributes
+    ----------
+    __file_path : str (private class attribute)
+        SQLite database file
+    __connection : sqlite3.Connection
+        connection to the database, opened on first use
+    SAVE_TEXT_INDEX : bool
+        False: the version of the database (see _file_id()) can't tell
+        another process whether a saved text index matches it, so text
+        indexes are built by the first search of each process
+
+    Methods
+    -------
+    _commit()
+        Write every object changed or deleted since the last save
+        (called by save(), see FileStorage for group commit and
+        batches)
+    reload()
+        Load the objects of the database to '__objects'
+    """
+    __file_path = "file.db"
+    __connection = None
+    SAVE_TEXT_INDEX = False
+
+    def __connect(self):
+        """Return the connection to the database (opened and the
+        tables created on first use)"""
+        if DBStorage.__connection is None:
+            DBStorage.__connection = connect(self.__file_path,
+                                             self.classes())
+        return DBStorage.__connection
+
+    def _data_path(self):
+        """Return the path of the database"""
+        return self.__file_path
+
+    def _file_id(self):
+        """Return the version of the database, which changes when
+        another process (connection) writes to it"""
+        return self.__connect().execute("PRAGMA data_version").fetchone()[0]
+
+    def _commit(self):
+        """Write every object changed or deleted since the last save"""
+        with self.lock.write, self._file_lock():
+            if self._file_id() != self._file_state:
+                # Changes saved by other processes are kept
+                self._read_changes()
+            objects = self.all()
+            obj_dicts = [objects[key].to_dict() for key in self._take_dirty()
+                         if key in objects]
+            connection = self.__connect()
+            with connection:
+                delete_rows(connection, self._take_deleted())
+                write_rows(connection, self.classes(), obj_dicts)
+
+    def reload(self):
+        """Load the objects of the database to '__objects'"""
+        file_lock = self._file_lock()
+        with self.lock.write:
+            file_lock.acquire(shared=True)
+            try:
+                FileStorage._file_state = self._file_id()
+                self._load_dicts(read_rows(self.__connect(), self.classes()))
+            finally:
+                file_lock.release()
+
+    def _read_changes(self):
+        """Merge the objects of the database (written by another
+        process), called while holding 'lock.write' and the file lock"""
+        FileStorage._file_state = self._file_id()
+        self._merge(read_rows(self.__connect(), self.classes()),
+                    complete=True)
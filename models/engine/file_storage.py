@@ -2,7 +2,28 @@
 
 """In this module defines FileStorage class"""
 
+from array import array
+import atexit
+import gc
+from datetime import datetime
+import importlib
+from itertools import accumulate
 import json
+import operator
+import os
+import pickle
+import pkgutil
+import threading
+import time
+import warnings
+from models.engine import offset_index, parallel_load
+from models.engine.atomic_file import atomic_open
+from models.engine.locks import FileLock, RWLock
+from models.engine.serializers import FORMATS, JSONSerializer
+from models.engine.columns import ColumnStore, OPERATORS, numeric_attrs
+from models.engine.geo_index import GeoIndex
+from models.engine import text_index
+from models.engine.text_index import TextIndex
 
 
 class FileStorage:
@@ -12,33 +33,235 @@ class FileStorage:
     Attributes
     ----------
     __file_path : str (private class attribute)
-        JSON file where objects (users' data) is stored
+        JSON file where objects (users' data) is stored (with the
+        extension of FORMAT for other formats)
     __objects : dict (initialized empty)
         store all objects by <class name>.id (ex: to store a BaseModel
         object with id=12121212, the key will be BaseModel.12121212)
+    __dirty : set (initialized empty)
+        keys of objects changed since the last save
+    __snapshots : dict (initialized empty)
+        (names, pickled values) of the attributes holding lists or
+        dictionaries of the stored objects holding some, by key, as
+        they were when the object was last loaded, saved or assigned
+        one: these values can change in place, without marking the
+        object as changed or updating its indexes (see
+        __find_changed())
+    __fragments : dict (initialized empty)
+        JSON entry ('"<key>": <dict>') of each object by <class name>.id,
+        reused by save() for objects that did not change
+    __by_class : dict (initialized empty)
+        index of '__objects' by class name: {<class name>: {key: obj}}
+    RENDER_CACHE : bool
+        if True (default), the string representation and the
+        dictionary of each stored object are cached until the object
+        changes (see render_str() and render_dict()), unless an
+        attribute of the object holds a list or a dictionary
+    __strs : dict (initialized empty)
+        cached string representation of the objects by key
+    __dicts : dict (initialized empty)
+        cached dictionary (as returned by to_dict()) of the objects
+        by key
+    __render_stats : dict
+        hits and misses of the render cache since the start
+    __changes : int
+        number of times cached renderings were dropped
+    RELATIONS : dict
+        relations between classes through their *_id (and *_ids)
+        attributes: {(<class name>, <relation name>):
+        (<related class name>, <attribute of the related class>)}
+        (ex: the reviews of a Place are the Review objects whose
+        place_id is the id of the Place)
+    __related : dict (initialized empty)
+        reverse index of the attributes in RELATIONS:
+        {(<class name>, <attribute>): {<value>: {key: obj}}}
+    __related_values : dict (initialized empty)
+        values indexed in '__related' for each object by key
+    __columns : dict (initialized empty)
+        columnar copy of the numeric attributes by class name
+        (see models.engine.columns), created by the first where()
+        on the class
+    GEO_ATTRS : dict
+        latitude and longitude attributes of the classes of located
+        objects: {<class name>: (<latitude attr>, <longitude attr>)}
+    __geo : dict (initialized empty)
+        spatial index of the objects by class name (see
+        models.engine.geo_index), created by the first spatial query
+        on the class
+    TEXT_ATTRS : dict
+        text attributes of the classes whose objects can be searched
+        by words: {<class name>: (<attribute name>, ...)}
+    __text : dict (initialized empty)
+        inverted index of the words of the text attributes by class
+        name (see models.engine.text_index), loaded from the file
+        saved next to the storage file or created by the first search
+        on the class
+    SAVE_TEXT_INDEX : bool
+        if True, the text indexes are saved next to the storage file
+        (<file>.text, see models.engine.text_index) when they match it,
+        so the next process loads them instead of building them
+    __text_loaded : bool
+        True once the saved text indexes were loaded (or could not be)
+    __text_changed : bool
+        True if '__text' changed since it was saved
+    FORMAT : str
+        format of the file objects are saved in: "json" (default) or
+        "binary" (see models.engine.serializers). The file has the
+        extension of the format (file.json or file.bin).
+    COMPACT_MODELS : bool
+        if True, objects are built from the compact (__slots__ based)
+        version of the classes (see models.compact)
+    LAZY_RELOAD : bool
+        if True, reload() only indexes the position of each object in
+        the file and objects are built when they are first accessed
+        (JSON format only)
+    GROUP_COMMIT_WINDOW : float
+        if more than 0, save() only writes the file once per
+        GROUP_COMMIT_WINDOW seconds (group commit): the saves done
+        in the meantime are written together by a single write
+    GROUP_COMMIT_SIZE : int
+        if more than 1, the file is written at the latest every
+        GROUP_COMMIT_SIZE saves (group commit)
+    RELOAD_WORKERS : int
+        if more than 1, reload() parses the JSON file with this number
+        of processes (see models.engine.parallel_load)
+    lock : models.engine.locks.RWLock
+        reader/writer lock of the objects in memory, held by the
+        methods of FileStorage (code iterating over the dictionaries
+        returned by all() while other threads change objects should
+        hold 'lock.read')
+    _file_state : tuple
+        (inode, size, modification time) of the file when it was
+        last read or written by this process. When it changes, the
+        file was written by another process and its changes are merged
+        on the next access (see _sync()).
+    __deleted : set (initialized empty)
+        keys of objects deleted since the last save
+    __batch : int
+        number of batches started by begin() and not committed yet.
+        During a batch, save() doesn't write the file.
+    __pending : dict (initialized empty)
+        objects in the file not built yet (lazy reload):
+        {<class name>: {key: position in '__offsets'}}
+    __offsets : array.array
+        offsets of the objects of '__pending' in the file
+        (see models.engine.offset_index)
 
     Methods
     -------
-    __classes()
+    classes()
         Import classes from modules in models package and return a
-        dictionary of classes
-    all()
-        Return the dictionary '__objects'
+        dictionary of classes (compact classes if COMPACT_MODELS)
+    _load_dicts(obj_dicts)
+        Build objects from their dictionaries and set them in
+        '__objects'
+    all(cls=None)
+        Return the dictionary '__objects' or only objects of class 'cls'
+    count(cls=None)
+        Return the number of objects (of class 'cls')
+    get(cls, obj_id)
+        Return the object of class 'cls' with id 'obj_id' or None
+    find_by(cls, attr, value)
+        Return the objects of class 'cls' whose attribute 'attr'
+        is (or contains) 'value'
+    related(cls, name, obj_id)
+        Return the objects in relation 'name' with the object of
+        class 'cls' and id 'obj_id' (ex: the reviews of a Place)
+    where(cls, conditions)
+        Return the objects of class 'cls' matching every condition
+    within(cls, min_lat, min_lon, max_lat, max_lon)
+        Return the objects of class 'cls' located in a box
+    near(cls, latitude, longitude, km)
+        Return the objects of class 'cls' within 'km' kilometers
+        of a point
+    nearest(cls, latitude, longitude, k)
+        Return the 'k' objects of class 'cls' nearest to a point
+    search(cls, query, limit=None)
+        Return the objects of class 'cls' whose text attributes match
+        the words of 'query', best first
     new(obj)
         Set in '__objects' the 'obj' with key <obj class name>.id
+    mark_dirty(obj, name=None)
+        Mark 'obj' as changed so it is serialized on the next save
+    render_str(obj)
+        Return the string representation of 'obj', cached until it
+        changes
+    render_dict(obj)
+        Return the dictionary of 'obj', cached until it changes
+    render_stats()
+        Return the hits and misses of the render cache
+    update(key, **attrs)
+        Set attributes of the object with key 'key' in place and save
     save()
-        Serialize '__objects' to the JSON file (path: __file_path)
+        Serialize changed objects in '__objects' to the file
+        (path: __file_path with the extension of FORMAT), or wait
+        for the group commit
+    flush()
+        Write the saves waiting for the group commit
+    begin()
+        Start a batch: save() doesn't write the file until commit()
+    commit()
+        End the batch and write the changes made during it
+    _sync()
+        Merge the changes made to the file by other processes
     delete(obj_id)
         Delete object with id equals 'obj_id' and update
         the file __file_path.
     reload()
-        Deserialize the JSON file to '__objects'
-        (only if __file_path exists)
+        Deserialize the file to '__objects' (only if it exists)
     """
     __file_path = "file.json"
     __objects = {}
+    __dirty = set()
+    __snapshots = {}
+    __fragments = {}
+    __by_class = {}
+    RENDER_CACHE = True
+    __strs = {}
+    __dicts = {}
+    __render_stats = {"str_hits": 0, "str_misses": 0,
+                      "dict_hits": 0, "dict_misses": 0}
+    __changes = 0
+    RELATIONS = {("State", "cities"): ("City", "state_id"),
+                 ("City", "places"): ("Place", "city_id"),
+                 ("User", "places"): ("Place", "user_id"),
+                 ("User", "reviews"): ("Review", "user_id"),
+                 ("Place", "reviews"): ("Review", "place_id"),
+                 ("Amenity", "places"): ("Place", "amenity_ids")}
+    __related = {}
+    __related_values = {}
+    __related_attrs = None
+    __columns = {}
+    GEO_ATTRS = {"Place": ("latitude", "longitude")}
+    __geo = {}
+    TEXT_ATTRS = {"State": ("name",), "City": ("name",),
+                  "Amenity": ("name",), "User": ("first_name", "last_name"),
+                  "Place": ("name", "description"), "Review": ("text",)}
+    __text = {}
+    SAVE_TEXT_INDEX = True
+    __text_loaded = False
+    __text_changed = False
+    __text_at_exit = False
+    __class_registry = None
+    FORMAT = "json"
+    COMPACT_MODELS = False
+    LAZY_RELOAD = False
+    GROUP_COMMIT_WINDOW = 0
+    GROUP_COMMIT_SIZE = 0
+    RELOAD_WORKERS = 1
+    lock = RWLock()
+    _file_state = None
+    __deleted = set()
+    __batch = 0
+    __file_locks = {}
+    __waiting = 0
+    __group_start = 0.0
+    __timer = None
+    __flush_at_exit = False
+    __pending = {}
+    __offsets = array('q')
 
-    def __classes(self):
+    def classes(self):
         """Import classes from modules in models package and
         return a dictionary of classes
 
@@ -48,30 +271,664 @@ class FileStorage:
             A dictionary of classes (as keys) defined in each modules
             in models package
         """
+        if FileStorage.__class_registry is not None:
+            return FileStorage.__class_registry
         # Importing in this method is done to avoid
         # circular imports error
+        import models
         from models.base_model import BaseModel
-        from models.user import User
-        from models.state import State
-        from models.city import City
-        from models.amenity import Amenity
-        from models.place import Place
-        from models.review import Review
-        classes = {"BaseModel": BaseModel,
-                   "User": User,
-                   "State": State,
-                   "City": City,
-                   "Amenity": Amenity,
-                   "Place": Place,
-                   "Review": Review}
+        # Model classes register themselves when their module is
+        # imported (see BaseModel.__init_subclass__), so a new module
+        # in models package needs no change here
+        for module in pkgutil.iter_modules(models.__path__):
+            if not module.ispkg:
+                importlib.import_module(f"models.{module.name}")
+        classes = {"BaseModel": BaseModel, **BaseModel._registry}
+        if self.COMPACT_MODELS:
+            from models.compact import compact_class
+            classes = {name: compact_class(cls)
+                       for name, cls in classes.items()}
+        FileStorage.__class_registry = classes
         return classes
 
-    def all(self):
-        """Return the dictionary '__objects' """
-        return self.__objects
+    def _load_dicts(self, obj_dicts):
+        """Build objects from their dictionaries and set them in
+        '__objects' (without marking them as changed)
+
+        Parameters
+        ----------
+        obj_dicts : dict
+            dictionaries of objects (as returned by to_dict()) by key
+
+        Raises
+        ------
+        KeyError
+            if a dictionary has an unknown '__class__' (no object is
+            set then)
+        """
+        classes = self.classes()
+        # Every object is built before any is set, so none is kept if
+        # one of them can't be built
+        objects = [(key, classes[obj_dict["__class__"]].from_dict(obj_dict))
+                   for key, obj_dict in obj_dicts.items()]
+        add = self._add
+        for key, obj in objects:
+            add(key, obj)
+
+    def all(self, cls=None):
+        """Return the dictionary '__objects' or, if 'cls' is passed,
+        a dictionary of the objects of that class only
+
+        Parameters
+        ----------
+        cls : class or str (optional)
+            class (or class name) of the objects to return
+
+        Returns
+        -------
+        dict
+            objects by <class name>.id. The dictionary returned for
+            'cls' must not be modified.
+        """
+        if cls is not None and not isinstance(cls, str):
+            cls = cls.__name__
+        self._sync()
+        if self.__pending:
+            with self.lock.write:
+                self.__load_pending(cls)
+        if cls is None:
+            return self.__objects
+        return self.__by_class.get(cls, {})
+
+    def count(self, cls=None):
+        """Return the number of objects stored, or of objects of
+        class 'cls' if it is passed
+
+        Parameters
+        ----------
+        cls : class or str (optional)
+            class (or class name) of the objects to count
+        """
+        if cls is not None and not isinstance(cls, str):
+            cls = cls.__name__
+        self._sync()
+        with self.lock.read:
+            if cls is None:
+                return len(self.__objects) +\
+                    sum(map(len, self.__pending.values()))
+            return len(self.__by_class.get(cls, {})) +\
+                len(self.__pending.get(cls, {}))
+
+    def get(self, cls, obj_id):
+        """Return the object of class 'cls' with id 'obj_id'
+
+        Parameters
+        ----------
+        cls : class or str
+            class (or class name) of the object
+        obj_id : str
+            id of the object
+
+        Returns
+        -------
+        The object or None if it doesn't exist
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = f"{cls}.{obj_id}"
+        self._sync()
+        obj = self.__objects.get(key)
+        if obj is None and key in self.__pending.get(cls, {}):
+            with self.lock.write:
+                if key in self.__pending.get(cls, {}):
+                    self.__load_pending(cls, [key])
+                obj = self.__objects.get(key)
+        return obj
+
+    def find_by(self, cls, attr, value):
+        """Return the objects of class 'cls' whose attribute 'attr' is
+        'value' (or, for a list attribute, contains 'value')
+
+        Parameters
+        ----------
+        cls : class or str
+            class (or class name) of the objects to return
+        attr : str
+            attribute name (ex: place_id)
+        value : any type
+            value searched
+
+        Returns
+        -------
+        dict
+            objects by <class name>.id
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        objects = self.all(cls)
+        with self.lock.read:
+            if attr in self.__indexed_attrs(cls):
+                return dict(self.__related.get((cls, attr), {})
+                            .get(value, {}))
+            # Attributes without index are searched in the objects
+            # of the class only
+            found = {}
+            for key, obj in objects.items():
+                obj_value = getattr(obj, attr, None)
+                if obj_value == value or\
+                        (type(obj_value) is list and value in obj_value):
+                    found[key] = obj
+            return found
+
+    def related(self, cls, name, obj_id):
+        """Return the objects in relation 'name' (see RELATIONS) with
+        the object of class 'cls' and id 'obj_id'
+
+        Parameters
+        ----------
+        cls : class or str
+            class (or class name) of the object (ex: Place)
+        name : str
+            name of the relation (ex: reviews)
+        obj_id : str
+            id of the object
+
+        Returns
+        -------
+        dict
+            related objects by <class name>.id
+
+        Raises
+        ------
+        KeyError
+            if relation 'name' doesn't exist for class 'cls'
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        related_cls, attr = self.RELATIONS[(cls, name)]
+        return self.find_by(related_cls, attr, obj_id)
+
+    def where(self, cls, conditions):
+        """Return the objects of class 'cls' matching every condition.
+        Conditions on numeric attributes declared in the class (ex:
+        Place.price_by_night) are evaluated on a columnar copy of the
+        attributes, the other ones on the matching objects.
+
+        Parameters
+        ----------
+        cls : class or str
+            class (or class name) of the objects
+        conditions : list
+            (attribute name, operator, value) tuples where the operator
+            is one of <, <=, >, >=, ==, != (ex: ("max_guest", ">=", 4))
+
+        Returns
+        -------
+        dict
+            matching objects by <class name>.id
+
+        Raises
+        ------
+        ValueError
+            if an operator is not supported
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        for attr, op, value in conditions:
+            if op not in OPERATORS:
+                raise ValueError(f"unsupported operator: {op}")
+        objects = self.all(cls)
+        if cls not in self.__columns and cls in self.classes():
+            with self.lock.write:
+                if cls not in self.__columns:
+                    store = ColumnStore(numeric_attrs(self.classes()[cls]))
+                    for key, obj in objects.items():
+                        store.put(key, obj)
+                    self.__columns[cls] = store
+        with self.lock.read:
+            store = self.__columns.get(cls)
+            if store is None:
+                keys, others = objects, conditions
+            else:
+                keys = store.where([condition for condition in conditions
+                                    if condition[0] in store.columns and
+                                    type(condition[2]) in (int, float)])
+                others = [condition for condition in conditions
+                          if condition[0] not in store.columns or
+                          type(condition[2]) not in (int, float)]
+            if not others:
+                return {key: objects[key] for key in keys}
+            found = {}
+            for key in keys:
+                obj = objects[key]
+                for attr, op, value in others:
+                    try:
+                        if not OPERATORS[op](getattr(obj, attr, None),
+                                             value):
+                            break
+                    except TypeError:
+                        # Values that can't be compared (ex: "a" < 1)
+                        # don't match
+                        break
+                else:
+                    found[key] = obj
+            return found
+
+    def __geo_index(self, cls):
+        """Return the spatial index of the objects of class 'cls',
+        built from the objects the first time
+
+        Parameters
+        ----------
+        cls : str
+            class name (a key of GEO_ATTRS)
+
+        Raises
+        ------
+        KeyError
+            if the objects of class 'cls' are not located
+        """
+        if cls not in self.GEO_ATTRS:
+            raise KeyError(cls)
+        objects = self.all(cls)
+        with self.lock.write:
+            index = self.__geo.get(cls)
+            if index is None:
+                index = GeoIndex()
+                self.__geo[cls] = index
+                for key, obj in objects.items():
+                    self.__locate(key, obj)
+            return index
+
+    def __locate(self, key, obj):
+        """Set the position of 'obj' in the spatial index of its class
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        obj : any object of a class in GEO_ATTRS (e.g Place)
+        """
+        class_name = obj.__class__.__name__
+        latitude, longitude = self.GEO_ATTRS[class_name]
+        self.__geo[class_name].put(key, getattr(obj, latitude, None),
+                                   getattr(obj, longitude, None))
+
+    def within(self, cls, min_lat, min_lon, max_lat, max_lon):
+        """Return the objects of class 'cls' located in a box
+
+        Parameters
+        ----------
+        cls : class or str
+            class (or class name) of the objects (a key of GEO_ATTRS)
+        min_lat, min_lon : float
+            south-west corner of the box (degrees)
+        max_lat, max_lon : float
+            north-east corner of the box (max_lon < min_lon for a box
+            crossing the 180th meridian)
+
+        Returns
+        -------
+        dict
+            located objects by <class name>.id
+
+        Raises
+        ------
+        KeyError
+            if the objects of class 'cls' are not located
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        index = self.__geo_index(cls)
+        with self.lock.read:
+            objects = self.__by_class.get(cls, {})
+            return {key: objects[key] for key in
+                    index.within(min_lat, min_lon, max_lat, max_lon)}
+
+    def near(self, cls, latitude, longitude, km):
+        """Return the objects of class 'cls' within 'km' kilometers
+        of a point, nearest first
+
+        Parameters
+        ----------
+        cls : class or str
+            class (or class name) of the objects (a key of GEO_ATTRS)
+        latitude, longitude : float
+            position of the point (degrees)
+        km : float
+            distance in kilometers
+
+        Returns
+        -------
+        dict
+            located objects by <class name>.id
+
+        Raises
+        ------
+        KeyError
+            if the objects of class 'cls' are not located
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        index = self.__geo_index(cls)
+        with self.lock.read:
+            objects = self.__by_class.get(cls, {})
+            return {key: objects[key]
+                    for _, key in index.near(latitude, longitude, km)}
+
+    def nearest(self, cls, latitude, longitude, k):
+        """Return the 'k' objects of class 'cls' nearest to a point,
+        nearest first
+
+        Parameters
+        ----------
+        cls : class or str
+            class (or class name) of the objects (a key of GEO_ATTRS)
+        latitude, longitude : float
+            position of the point (degrees)
+        k : int
+            number of objects
+
+        Returns
+        -------
+        dict
+            located objects by <class name>.id
+
+        Raises
+        ------
+        KeyError
+            if the objects of class 'cls' are not located
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        index = self.__geo_index(cls)
+        with self.lock.read:
+            objects = self.__by_class.get(cls, {})
+            return {key: objects[key]
+                    for _, key in index.nearest(latitude, longitude, k)}
+
+    def __put_text(self, key, obj):
+        """Set the words of the text attributes of 'obj' in the text
+        index of its class
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        obj : any object of a class in TEXT_ATTRS (e.g Review)
+        """
+        class_name = obj.__class__.__name__
+        if self.__text[class_name].put(
+                key, [getattr(obj, attr, None)
+                      for attr in self.TEXT_ATTRS[class_name]]):
+            FileStorage.__text_changed = True
+
+    def __load_text(self):
+        """Load the text indexes saved next to the storage file if they
+        match it, updated with the objects changed since the last save
+        (called once, while holding 'lock.write')"""
+        FileStorage.__text_loaded = True
+        if not self.SAVE_TEXT_INDEX:
+            return
+        indexes = text_index.load(self._data_path(), self._file_state)
+        if indexes is None:
+            return
+        for class_name, index in indexes.items():
+            if class_name in self.TEXT_ATTRS:
+                self.__text.setdefault(class_name, index)
+        for key in self.__dirty | self.__deleted:
+            class_name = key.partition(".")[0]
+            if class_name not in self.__text:
+                continue
+            obj = self.__objects.get(key)
+            if obj is None:
+                self.__text[class_name].remove(key)
+            else:
+                self.__put_text(key, obj)
+
+    def __save_text(self):
+        """Save the text indexes next to the storage file, if they
+        changed and match it (every change is saved), so they are not
+        built again by the next process"""
+        with self.lock.write:
+            if not self.SAVE_TEXT_INDEX or not self.__text_changed or\
+                    self.__dirty or self.__deleted or self.__batch or\
+                    self.__waiting:
+                return
+            state = self._file_id()
+            if state is None or state != self._file_state:
+                return
+            text_index.dump(self._data_path(), state, self.__text)
+            FileStorage.__text_changed = False
+
+    def __save_text_at_exit(self):
+        """Write the saves waiting for the group commit, then save the
+        text indexes (registered with atexit)"""
+        self.flush()
+        self.__save_text()
+
+    def __text_index(self, cls):
+        """Return the text index of the objects of class 'cls', loaded
+        from the saved indexes or built from the objects the first time
+
+        Parameters
+        ----------
+        cls : str
+            class name (a key of TEXT_ATTRS)
+
+        Raises
+        ------
+        KeyError
+            if the objects of class 'cls' are not searched by words
+        """
+        if cls not in self.TEXT_ATTRS:
+            raise KeyError(cls)
+        self._sync()
+        with self.lock.write:
+            if not self.__text_loaded:
+                self.__load_text()
+            if not self.__text_at_exit:
+                atexit.register(self.__save_text_at_exit)
+                FileStorage.__text_at_exit = True
+            index = self.__text.get(cls)
+            if index is not None:
+                return index
+            index = TextIndex()
+            self.__text[cls] = index
+            for key, obj in self.all(cls).items():
+                self.__put_text(key, obj)
+        self.__save_text()
+        return index
+
+    def search(self, cls, query, limit=None):
+        """Return the objects of class 'cls' whose text attributes (see
+        TEXT_ATTRS) match the words of 'query', best first
+
+        Parameters
+        ----------
+        cls : class or str
+            class (or class name) of the objects (a key of TEXT_ATTRS)
+        query : str
+            words, with AND and OR, and prefixes ending with '*' (see
+            models.engine.text_index)
+        limit : int (optional)
+            maximum number of objects returned
+
+        Returns
+        -------
+        dict
+            matching objects by <class name>.id, by decreasing score
+
+        Raises
+        ------
+        KeyError
+            if the objects of class 'cls' are not searched by words
+        """
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        index = self.__text_index(cls)
+        with self.lock.read:
+            keys = [key for key, _ in index.search(query, limit)]
+        pending = self.__pending.get(cls, {})
+        if any(key in pending for key in keys):
+            with self.lock.write:
+                self.__load_pending(
+                    cls, [key for key in keys
+                          if key in self.__pending.get(cls, {})])
+        with self.lock.read:
+            return {key: self.__objects[key] for key in keys
+                    if key in self.__objects}
+
+    def __indexed_attrs(self, class_name):
+        """Return the attributes of class 'class_name' that are
+        indexed in '__related'
+
+        Parameters
+        ----------
+        class_name : str
+            class name (ex: Place)
+
+        Returns
+        -------
+        tuple
+            attribute names (ex: ("city_id", "user_id"))
+        """
+        if FileStorage.__related_attrs is None:
+            related_attrs = {}
+            for related_cls, attr in self.RELATIONS.values():
+                attrs = related_attrs.setdefault(related_cls, ())
+                if attr not in attrs:
+                    related_attrs[related_cls] = attrs + (attr,)
+            FileStorage.__related_attrs = related_attrs
+        return self.__related_attrs.get(class_name, ())
+
+    def __index_related(self, key, obj):
+        """Add 'obj' to the reverse index of the attributes
+        in RELATIONS
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        obj : any object in models.base_model module (e.g BaseModel)
+        """
+        class_name = obj.__class__.__name__
+        values = []
+        for attr in self.__indexed_attrs(class_name):
+            value = getattr(obj, attr, None)
+            for item in (value if type(value) is list else [value]):
+                if item is None or item == "":
+                    continue
+                try:
+                    index = self.__related.setdefault((class_name, attr), {})
+                    index.setdefault(item, {})[key] = obj
+                except TypeError:
+                    # Unhashable values (ex: a dictionary) can't be
+                    # indexed
+                    continue
+                values.append((attr, item))
+        if values:
+            self.__related_values[key] = (class_name, values)
+
+    def __unindex_related(self, key):
+        """Remove the object with key 'key' from the reverse index
+        of the attributes in RELATIONS
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        """
+        class_name, values = self.__related_values.pop(key, (None, ()))
+        for attr, item in values:
+            index = self.__related[(class_name, attr)]
+            index[item].pop(key, None)
+            if not index[item]:
+                del index[item]
+
+    def _add(self, key, obj):
+        """Set in '__objects' the 'obj' with key 'key' and update the
+        indexes, without marking it as changed
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        obj : any object in models.base_model module (e.g BaseModel)
+        """
+        if key in self.__objects:
+            self.__unindex_related(key)
+        self.__forget(key)
+        self.__objects[key] = obj
+        self.__index_related(key, obj)
+        class_name = obj.__class__.__name__
+        if class_name in self.__columns:
+            self.__columns[class_name].put(key, obj)
+        if class_name in self.__geo:
+            self.__locate(key, obj)
+        if class_name in self.__text:
+            self.__put_text(key, obj)
+        if class_name in self.__pending:
+            self.__pending[class_name].pop(key, None)
+        if class_name not in self.__by_class:
+            self.__by_class[class_name] = {}
+        self.__by_class[class_name][key] = obj
+        self.__snapshot(key, obj)
+
+    def _remove(self, key):
+        """Remove the object with key 'key' from '__objects' and the
+        indexes (if it exists)
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+
+        Returns
+        -------
+        The removed object or None
+        """
+        class_name = key.split(".")[0]
+        if key in self.__pending.get(class_name, {}):
+            del self.__pending[class_name][key]
+        if class_name in self.__columns:
+            self.__columns[class_name].remove(key)
+        if class_name in self.__geo:
+            self.__geo[class_name].remove(key)
+        index = self.__text.get(class_name)
+        if index is not None and key in index.documents:
+            index.remove(key)
+            FileStorage.__text_changed = True
+        self.__forget(key)
+        self.__snapshots.pop(key, None)
+        obj = self.__objects.pop(key, None)
+        if obj is not None:
+            self.__unindex_related(key)
+            self.__by_class[obj.__class__.__name__].pop(key, None)
+        return obj
+
+    def _reset(self):
+        """Forget every stored object without touching the file"""
+        with self.lock.write:
+            self.__objects.clear()
+            self.__snapshots.clear()
+            self.__fragments.clear()
+            self.__strs.clear()
+            self.__dicts.clear()
+            self.__by_class.clear()
+            self.__related.clear()
+            self.__related_values.clear()
+            self.__pending.clear()
+            self.__columns.clear()
+            self.__geo.clear()
+            self.__text.clear()
+            FileStorage.__text_loaded = False
+            self._take_deleted()
+            self._take_dirty()
 
     def new(self, obj):
         """Set in '__objects' the 'obj' with key <obj class name>.id
+        and mark it as changed
 
             Paramters
             ---------
@@ -79,30 +936,340 @@ class FileStorage:
         """
         if obj is not None:
             key = f"{obj.__class__.__name__}.{obj.id}"
-            self.__objects[key] = obj
+            with self.lock.write:
+                self._add(key, obj)
+                self.__dirty.add(key)
+                self.__deleted.discard(key)
+
+    def mark_dirty(self, obj, name=None):
+        """Mark 'obj' as changed so it is serialized on the next save.
+        Objects that are not stored in '__objects' are ignored.
+
+            Paramters
+            ---------
+            obj : any object in models.base_model module (e.g BaseModel)
+            name : str (optional)
+                name of the attribute that changed
+        """
+        class_name = obj.__class__.__name__
+        key = f"{class_name}.{getattr(obj, 'id', None)}"
+        if key not in self.__objects:
+            return
+        with self.lock.write:
+            self.__dirty.add(key)
+            self.__forget(key)
+            if self.__objects.get(key) is not obj:
+                return
+            self.__reindex(key, obj, (name,))
+            if isinstance(getattr(obj, name, None), (list, dict)):
+                # The new list or dictionary may change in place once
+                # indexed
+                self.__check_changed(key, obj)
+                self.__snapshot(key, obj)
+
+    def __reindex(self, key, obj, names):
+        """Update the indexes of the attributes 'names' of the stored
+        object 'obj' with key 'key' after they changed
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        obj : any object in models.base_model module (e.g BaseModel)
+        names : tuple
+            names of the attributes that changed
+        """
+        class_name = obj.__class__.__name__
+        if any(name in self.__indexed_attrs(class_name) for name in names):
+            self.__unindex_related(key)
+            self.__index_related(key, obj)
+        store = self.__columns.get(class_name)
+        if store is not None:
+            for name in names:
+                if name in store.columns:
+                    store.update(key, obj, name)
+        if class_name in self.__geo and\
+                any(name in self.GEO_ATTRS[class_name] for name in names):
+            self.__locate(key, obj)
+        if class_name in self.__text and\
+                any(name in self.TEXT_ATTRS[class_name] for name in names):
+            self.__put_text(key, obj)
+
+    def __forget(self, key):
+        """Drop the cached renderings of the object with key 'key'"""
+        FileStorage.__changes += 1
+        self.__strs.pop(key, None)
+        self.__dicts.pop(key, None)
+
+    def __render(self, obj, cache, render, kind):
+        """Return the rendering of 'obj' (its string or dictionary) from
+        'cache', or rendered by 'render' and cached if 'obj' is stored
+
+        Parameters
+        ----------
+        obj : any object in models.base_model module (e.g BaseModel)
+        cache : dict
+            '__strs' or '__dicts'
+        render : function
+            uncached rendering of 'obj'
+        kind : str
+            "str" or "dict", prefix of the counters in '__render_stats'
+        """
+        stats = self.__render_stats
+        if not self.RENDER_CACHE:
+            return render()
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        value = cache.get(key)
+        # The cache only holds the rendering of the stored objects
+        if value is not None and self.__objects.get(key) is obj:
+            stats[kind + "_hits"] += 1
+            return value
+        stats[kind + "_misses"] += 1
+        changes = self.__changes
+        value = render()
+        # Lists and dictionaries change in place, without going through
+        # __setattr__: objects holding them are rendered every time
+        if self.__objects.get(key) is obj and not self.__containers(obj):
+            cache[key] = value
+            if self.__changes != changes:
+                # An object changed while 'obj' was rendered, the
+                # rendering may be outdated
+                cache.pop(key, None)
+        return value
+
+    def render_str(self, obj):
+        """Return the string representation of 'obj' (see
+        BaseModel.__str__), cached until 'obj' changes
+
+            Paramters
+            ---------
+            obj : any object in models.base_model module (e.g BaseModel)
+        """
+        return self.__render(obj, self.__strs, obj._render_str, "str")
+
+    def render_dict(self, obj):
+        """Return a copy of the dictionary of 'obj' (see
+        BaseModel.to_dict), cached until 'obj' changes
+
+            Paramters
+            ---------
+            obj : any object in models.base_model module (e.g BaseModel)
+        """
+        return dict(self.__render(obj, self.__dicts, obj._render_dict,
+                                  "dict"))
+
+    def render_stats(self):
+        """Return the hits and misses of the render cache since the
+        start
+
+        Returns
+        -------
+        dict
+            {"str_hits": int, "str_misses": int, "dict_hits": int,
+            "dict_misses": int}
+        """
+        return dict(self.__render_stats)
+
+    def update(self, key, **attrs):
+        """Set the attributes 'attrs' of the object with key 'key' in
+        place, update its 'updated_at' and save it (once for all the
+        attributes)
+
+        Parameters
+        ----------
+        key : str
+            <obj class name>.id
+        attrs : any type
+            new values by attribute name
+
+        Returns
+        -------
+        The object or None if it doesn't exist
+
+        Raises
+        ------
+        ValueError
+            if 'attrs' changes the id, created_at or updated_at
+        """
+        forbidden = {"id", "created_at", "updated_at"}.intersection(attrs)
+        if forbidden:
+            raise ValueError(f"{', '.join(sorted(forbidden))} "
+                             f"can't be updated")
+        class_name, _, obj_id = key.partition(".")
+        obj = self.get(class_name, obj_id)
+        if obj is None:
+            return None
+        with self.lock.write:
+            for name, value in attrs.items():
+                setattr(obj, name, value)
+            obj.updated_at = datetime.now()
+        self.save()
+        return obj
+
+    def __snapshot(self, key, obj):
+        """Record the lists and dictionaries held by the object 'obj'
+        with key 'key' as they are now (see '__snapshots')"""
+        attrs = obj._attributes()
+        names = tuple(name for name, value in attrs.items()
+                      if isinstance(value, (list, dict)))
+        if names:
+            self.__snapshots[key] = (names, pickle.dumps(
+                [attrs[name] for name in names], pickle.HIGHEST_PROTOCOL))
+        else:
+            self.__snapshots.pop(key, None)
+
+    def __find_changed(self):
+        """Mark as changed the objects whose lists or dictionaries
+        changed in place since they were loaded or saved (ex:
+        place.amenity_ids.append(amenity_id)) and update their indexes
+        (ex: related("Amenity", "places", amenity_id))"""
+        objects = self.__objects
+        # Other attributes can only hold new lists or dictionaries
+        # through __setattr__, which marks the object as changed.
+        # Changed objects are checked too, their lists may have changed
+        # in place after they were indexed.
+        for key in self.__snapshots:
+            self.__check_changed(key, objects[key])
+
+    def __check_changed(self, key, obj):
+        """Mark as changed the stored object 'obj' with key 'key' and
+        update its indexes if its lists or dictionaries changed in place
+        since they were recorded in '__snapshots'"""
+        snapshot = self.__snapshots.get(key)
+        if snapshot is None:
+            return
+        names, values = snapshot
+        attrs = obj._attributes()
+        if pickle.dumps([attrs.get(name) for name in names],
+                        pickle.HIGHEST_PROTOCOL) != values:
+            self.__dirty.add(key)
+            self.__forget(key)
+            self.__reindex(key, obj, names)
+
+    def _take_dirty(self):
+        """Return the keys of objects changed since the last call
+        (including the objects changed in place, see __find_changed())
+        and start tracking changes again
+
+        Returns
+        -------
+        set
+            keys (<class name>.id) of changed objects
+        """
+        with self.lock.write:
+            self.__find_changed()
+            dirty = FileStorage.__dirty
+            FileStorage.__dirty = set()
+            # The objects are saved as they are now
+            objects = self.__objects
+            for key in dirty:
+                obj = objects.get(key)
+                if obj is not None:
+                    self.__snapshot(key, obj)
+        return dirty
+
+    def _take_deleted(self):
+        """Return the keys of objects deleted since the last call
+        and start tracking deletions again
+
+        Returns
+        -------
+        set
+            keys (<class name>.id) of deleted objects
+        """
+        deleted = FileStorage.__deleted
+        FileStorage.__deleted = set()
+        return deleted
 
     def save(self):
-        """Serialize '__objects' to the JSON file (path: __file_path)"""
-        # Holds new objects (data) to be serialised
-        new_objs = {}
-        for key, obj_name in self.__objects.items():
-            new_objs[key] = obj_name.to_dict()
-        try:
-            #  If file exist, load its content to a variable
-            with open(self.__file_path, 'r') as jf:
-                json_to_py = json.load(jf)
-            if type(json_to_py) is dict:
-                #  Modify the loaded file content with new objects
-                for key, obj_dict in new_objs.items():
-                    if key not in json_to_py:
-                        json_to_py[key] = obj_dict
-            new_objs = json_to_py
-        except Exception as e:
-            pass
-        finally:
-            #  Modify the file with new objects (data)
-            with open(self.__file_path, 'w') as jf:
-                json.dump(new_objs, jf)
+        """Serialize '__objects' to the file (path: __file_path with
+        the extension of FORMAT). With group commit (see
+        GROUP_COMMIT_WINDOW and GROUP_COMMIT_SIZE), the file is only
+        written once the window or the number of saves is reached.
+        During a batch (see begin()), nothing is written."""
+        if self.__batch:
+            return
+        if self.GROUP_COMMIT_WINDOW > 0 or self.GROUP_COMMIT_SIZE > 1:
+            self.__group_commit()
+        else:
+            self._commit()
+
+    def _commit(self):
+        """Write the changes to the file (path: __file_path with the
+        extension of FORMAT)"""
+        with self.lock.write, self._file_lock():
+            if self._file_id() != self._file_state:
+                # Changes saved by other processes are kept
+                self._read_changes()
+            dirty = self._take_dirty()
+            if self.FORMAT == "json":
+                # Only changed objects are serialized again, the JSON
+                # fragments of the other ones are reused
+                fragments = self.__fragments
+                for key in dirty:
+                    obj = self.__objects.get(key)
+                    if obj is not None:
+                        fragments[key] = self.__fragment(key, obj)
+            self.__write()
+            FileStorage._file_state = self._file_id()
+            self._take_deleted()
+
+    def __group_commit(self):
+        """Count a save waiting for the group commit and commit if the
+        window or the number of saves is reached"""
+        with self.lock.write:
+            FileStorage.__waiting += 1
+            if self.__waiting == 1:
+                FileStorage.__group_start = time.monotonic()
+                if not self.__flush_at_exit:
+                    # Saves still waiting are written on exit
+                    atexit.register(self.flush)
+                    FileStorage.__flush_at_exit = True
+                if self.GROUP_COMMIT_WINDOW > 0:
+                    timer = threading.Timer(self.GROUP_COMMIT_WINDOW,
+                                            self.flush)
+                    timer.daemon = True
+                    timer.start()
+                    FileStorage.__timer = timer
+            if 1 < self.GROUP_COMMIT_SIZE <= self.__waiting or\
+                    0 < self.GROUP_COMMIT_WINDOW <=\
+                    time.monotonic() - self.__group_start:
+                self.flush()
+
+    def begin(self):
+        """Start a batch: the changes saved until commit() are kept
+        in memory and written together by commit() (batches can be
+        nested, the changes are written when the outer one ends)"""
+        with self.lock.write:
+            FileStorage.__batch += 1
+
+    def commit(self):
+        """End the batch started by begin() and write the changes
+        made during it (if it is the outer batch)"""
+        with self.lock.write:
+            if self.__batch:
+                FileStorage.__batch -= 1
+            if self.__batch:
+                return
+            # Saves waiting for the group commit are written too
+            FileStorage.__waiting = 0
+            self._commit()
+
+    def flush(self):
+        """Write the saves waiting for the group commit (if any)"""
+        with self.lock.write:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                FileStorage.__timer = None
+            if self.__waiting:
+                FileStorage.__waiting = 0
+                self._commit()
+
+    def __path(self):
+        """Return the path of the file of the format FORMAT
+        (__file_path with the extension of the format)"""
+        return os.path.splitext(self.__file_path)[0] +\
+            FORMATS[self.FORMAT].extension
 
     def delete(self, obj_id):
         """Delete object with id equals 'obj_id' and update
@@ -114,23 +1281,316 @@ class FileStorage:
             id of an object to be deleted. This id is the
             concantenation of class name, '.' and object id.
         """
-        if obj_id in self.__objects:
-            del self.__objects[obj_id]
-        new_objs = {}
-        for id_, obj in self.__objects.items():
-            new_objs[id_] = obj.to_dict()
-        py_to_json = json.dumps(new_objs)
-        with open(self.__file_path, 'w') as f:
-            f.write(py_to_json)
+        with self.lock.write:
+            self._remove(obj_id)
+            self.__fragments.pop(obj_id, None)
+            self.__dirty.discard(obj_id)
+            # Not merged back from the file until the next save
+            self.__deleted.add(obj_id)
+        self.save()
+
+    def _data_path(self):
+        """Return the path of the file objects are saved in"""
+        return self.__path()
+
+    def _file_id(self):
+        """Return the (inode, size, modification time) of the file
+        objects are saved in, or None if it doesn't exist"""
+        try:
+            stat = os.stat(self._data_path())
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _file_lock(self):
+        """Return the lock (models.engine.locks.FileLock) shared
+        with the other processes using the file objects are saved in.
+        It is only acquired while holding 'lock.write'."""
+        path = self._data_path() + ".lock"
+        file_lock = self.__file_locks.get(path)
+        if file_lock is None:
+            file_lock = FileLock(path)
+            self.__file_locks[path] = file_lock
+        return file_lock
+
+    def _sync(self):
+        """Merge the changes made to the file by other processes since
+        it was last read or written by this process (if any)"""
+        if self._file_id() == self._file_state:
+            return
+        with self.lock.write:
+            file_lock = self._file_lock()
+            file_lock.acquire(shared=True)
+            try:
+                if self._file_id() != self._file_state:
+                    self._read_changes()
+            finally:
+                file_lock.release()
+
+    def _read_changes(self):
+        """Merge the objects of the file (written by another process)
+        into '__objects', called while holding 'lock.write' and the
+        file lock"""
+        state = self._file_id()
+        try:
+            with open(self._data_path(), 'rb') as f:
+                obj_dicts = FORMATS[self.FORMAT].load(f)
+        except FileNotFoundError:
+            obj_dicts = {}
+        except ValueError as e:
+            # Not merged again until the file changes
+            FileStorage._file_state = state
+            warnings.warn(f"{self._data_path()} could not be merged "
+                          f"({e!r})")
+            return
+        self._merge(obj_dicts, complete=True)
+        FileStorage._file_state = state
+
+    def _merge(self, obj_dicts, removed=(), complete=False):
+        """Set in '__objects' the objects saved by another process.
+        Objects changed or deleted by this process since the last save
+        are kept as they are (the last process saving an object wins).
+
+        Parameters
+        ----------
+        obj_dicts : dict
+            dictionaries of the saved objects by key
+        removed : iterable (optional)
+            keys of the objects deleted by the other process
+        complete : bool (optional)
+            if True, 'obj_dicts' holds every object of the file and
+            the objects missing from it were deleted
+        """
+        # Objects changed in place are kept like the other changes
+        self.__find_changed()
+        dirty = self.__dirty
+        deleted = self.__deleted
+        objects = self.__objects
+        fragments = self.__fragments
+        if complete:
+            # The positions of the objects not built yet changed
+            self.__pending.clear()
+            removed = [key for key in objects if key not in obj_dicts]
+        for key in removed:
+            if key not in dirty:
+                self._remove(key)
+                fragments.pop(key, None)
+        classes = self.classes()
+        for key, obj_dict in obj_dicts.items():
+            if key in dirty or key in deleted:
+                continue
+            new = classes[obj_dict["__class__"]].from_dict(obj_dict)
+            obj = objects.get(key)
+            if obj is None:
+                self._add(key, new)
+            elif obj._attributes() != new._attributes():
+                # Updated in place, for the code holding the object
+                obj._load_attributes(new._attributes())
+                self._add(key, obj)
+            else:
+                continue
+            fragments.pop(key, None)
+
+    def __write(self):
+        """Write '__objects' to the file (path: __file_path with the
+        extension of FORMAT), from the cached JSON fragments of each
+        object for the JSON format"""
+        # The file is replaced only once completely written, so it is
+        # never left partially written
+        objects = self.__objects.copy()
+        if self.FORMAT != "json":
+            with atomic_open(self.__path(), 'wb') as f:
+                FORMATS[self.FORMAT].dump(f, objects)
+            return
+        if self.LAZY_RELOAD or self.__pending:
+            self.__write_indexed()
+            return
+        fragments = self.__fragments
+        try:
+            content = ", ".join(map(fragments.__getitem__, objects))
+        except KeyError:
+            for key, obj in objects.items():
+                if key not in fragments:
+                    # Object is not serialized yet (e.g it was loaded
+                    # by reload() and never changed)
+                    fragments[key] = self.__fragment(key, obj)
+            content = ", ".join(map(fragments.__getitem__, objects))
+        with atomic_open(self.__file_path) as f:
+            f.write("{" + content + "}")
+
+    def __write_indexed(self):
+        """Write '__objects' and the objects not built yet to the JSON
+        file (path: __file_path), grouped by class, and save the
+        position of each of them for the next lazy reload"""
+        fragments = self.__fragments
+        # Objects not built yet are copied from the file as they are
+        for class_name, positions in self.__pending.items():
+            missing = {key: i for key, i in positions.items()
+                       if key not in fragments}
+            if missing:
+                fragments.update(offset_index.read(
+                    self.__file_path, self.__offsets, missing))
+        for key, obj in self.__objects.copy().items():
+            if key not in fragments:
+                fragments[key] = self.__fragment(key, obj)
+        keys = {}
+        for class_name in {**self.__by_class, **self.__pending}:
+            keys[class_name] = list(self.__by_class.get(class_name, ())) +\
+                list(self.__pending.get(class_name, ()))
+        parts = []
+        for class_keys in keys.values():
+            parts.extend(map(fragments.__getitem__, class_keys))
+        with atomic_open(self.__file_path) as f:
+            f.write("{" + ", ".join(parts) + "}")
+        # json.dumps escapes non-ASCII characters so the length of
+        # an entry is its size in bytes
+        lengths = array('q', map(len, parts))
+        starts = array('q', accumulate(map((2).__add__, lengths),
+                                       initial=1))[:-1]
+        offsets = array('q', bytes(16 * len(parts)))
+        offsets[0::2] = starts
+        offsets[1::2] = array('q', map(operator.add, starts, lengths))
+        offset_index.dump(self.__file_path, keys, offsets)
+
+    def __load_pending(self, cls=None, keys=None):
+        """Build the objects of class 'cls' (of every class if 'cls'
+        is None) that are in the file but not built yet
+
+        Parameters
+        ----------
+        cls : str (optional)
+            class name of the objects to build
+        keys : list (optional)
+            keys of the objects to build (all objects of class 'cls'
+            if not passed)
+        """
+        names = list(self.__pending) if cls is None else [cls]
+        fragments = self.__fragments
+        for class_name in names:
+            positions = self.__pending.get(class_name)
+            if not positions:
+                self.__pending.pop(class_name, None)
+                continue
+            if keys is not None:
+                positions = {key: positions[key] for key in keys}
+            missing = {key: i for key, i in positions.items()
+                       if key not in fragments}
+            if missing:
+                # Entries read are kept as fragments for save()
+                fragments.update(offset_index.read(
+                    self.__file_path, self.__offsets, missing))
+            # _load_dicts() removes the keys from '__pending'
+            self._load_dicts(json.loads(
+                "{" + ", ".join(map(fragments.__getitem__, positions)) + "}"))
+            if not self.__pending[class_name]:
+                del self.__pending[class_name]
+
+    @staticmethod
+    def __containers(obj):
+        """Return the attributes of 'obj' holding a list or a dictionary
+        by name (values that can change in place)"""
+        return {name: value for name, value in obj._attributes().items()
+                if isinstance(value, (list, dict))}
+
+    @staticmethod
+    def __fragment(key, obj):
+        """Return the JSON fragment '"<key>": <obj dictionary>' of 'obj'
+        (see JSONSerializer.fragment)"""
+        return JSONSerializer.fragment(key, obj)
 
     def reload(self):
-        """Deserialize the JSON file to '__objects'
-        (only if __file_path exists)"""
+        """Deserialize the file (path: __file_path with the extension
+        of FORMAT) to '__objects' (only if it exists)"""
+        file_lock = self._file_lock()
+        with self.lock.write:
+            file_lock.acquire(shared=True)
+            try:
+                self.__reload()
+                FileStorage._file_state = self._file_id()
+            finally:
+                file_lock.release()
+
+    def __reload(self):
+        """Deserialize the file to '__objects' (see reload())"""
+        if self.LAZY_RELOAD and self.FORMAT == "json":
+            try:
+                self.__reload_lazy()
+                return
+            except ValueError:
+                # The file was not written by FileStorage (e.g it was
+                # edited by hand), it is loaded as a whole
+                pass
+        path = self.__path()
+        if self.RELOAD_WORKERS > 1 and self.FORMAT == "json":
+            try:
+                self.__reload_parallel(path)
+                return
+            except FileNotFoundError:
+                return
+            except ValueError:
+                # The file was not written by FileStorage (or it is
+                # damaged), it is loaded as a whole
+                pass
         try:
-            with open(self.__file_path, 'r') as f:
-                deserialized_objs = json.load(f)
-            for id_, obj_dict in deserialized_objs.items():
-                obj_name = obj_dict["__class__"]
-                self.__objects[id_] = self.__classes()[obj_name](**obj_dict)
-        except Exception as e:
-            pass
+            with open(path, 'rb') as f:
+                deserialized_objs = FORMATS[self.FORMAT].load(f)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            # The file can't be decoded: it is kept aside instead of
+            # being overwritten by the next save. Other errors (e.g an
+            # unknown class) are raised, the file is not damaged.
+            damaged = f"{path}.damaged-{int(time.time())}"
+            os.replace(path, damaged)
+            warnings.warn(f"{path} could not be loaded ({e!r}), "
+                          f"it was moved to {damaged}")
+            return
+        self._load_dicts(deserialized_objs)
+        for id_ in deserialized_objs:
+            self.__fragments.pop(id_, None)
+
+    def __reload_parallel(self, path):
+        """Deserialize the JSON file 'path' to '__objects' with
+        RELOAD_WORKERS processes (see models.engine.parallel_load)"""
+        classes = self.classes()
+        # The garbage collector is paused while the objects are built:
+        # none of them can be garbage, but each collection would walk
+        # all of them
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            entries = parallel_load.load(path, self.RELOAD_WORKERS)
+            # Every object is built before any is set (see
+            # _load_dicts())
+            objects = [(key, classes[class_name].from_attributes(attrs))
+                       for key, class_name, attrs in entries]
+            add = self._add
+            fragments = self.__fragments
+            for key, obj in objects:
+                fragments.pop(key, None)
+                add(key, obj)
+        finally:
+            if enabled:
+                gc.enable()
+
+    def __reload_lazy(self):
+        """Index the position of each object in the JSON file without
+        building them (only if __file_path exists)"""
+        index = offset_index.load(self.__file_path)
+        if index is None:
+            try:
+                index = offset_index.scan(self.__file_path)
+            except OSError:
+                return
+            # Saved so the next reload doesn't need to scan the file
+            offset_index.dump(self.__file_path, *index)
+        positions, FileStorage.__offsets = index
+        self.__pending.clear()
+        for class_name, class_positions in positions.items():
+            if self.__objects:
+                # Objects in the file replace the ones in memory
+                for key in list(self.__by_class.get(class_name, ())):
+                    if key in class_positions:
+                        self._remove(key)
+                        self.__fragments.pop(key, None)
+            self.__pending[class_name] = class_positions
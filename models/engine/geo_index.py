@@ -0,0 +1,276 @@
+#!/usr/bin/python3
+
+"""
+In this module defines GeoIndex class, a spatial index of points
+(latitude, longitude) used to find the objects located in a box, within
+a distance of a point or nearest to a point without going through every
+object.
+
+Points are grouped in the cells of a grid of CELL_SIZE x CELL_SIZE
+degrees. A query only reads the cells overlapping the area searched.
+Distances are great-circle distances in kilometers.
+"""
+
+import math
+
+CELL_SIZE = 0.1
+EARTH_RADIUS = 6371.0088
+
+
+def distance(lat1, lon1, lat2, lon2):
+    """Return the great-circle distance (km) between two points
+
+    Parameters
+    ----------
+    lat1, lon1 : float
+        latitude and longitude (degrees) of the first point
+    lat2, lon2 : float
+        latitude and longitude (degrees) of the second point
+
+    Returns
+    -------
+    float
+        distance in kilometers
+    """
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * \
+        math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(h)))
+
+
+def is_coordinate(value, limit):
+    """Return True if 'value' is a number between -limit and limit"""
+    return type(value) in (int, float) and -limit <= value <= limit
+
+
+class GeoIndex:
+    """
+    Impliment a grid index of points (latitude, longitude)
+
+    Attributes
+    ----------
+    cell_size : float
+        size (degrees) of the cells of the grid
+    cells : dict
+        points of each non-empty cell:
+        {<cell number>: {key: (latitude, longitude)}}, where the cell
+        at (row, column) is number row * <number of columns> + column
+    points : dict
+        cell of each point by key
+
+    Methods
+    -------
+    put(key, latitude, longitude)
+        Set the position of the point with key 'key'
+    remove(key)
+        Remove the point with key 'key'
+    within(min_lat, min_lon, max_lat, max_lon)
+        Return the keys of the points in a box
+    near(latitude, longitude, km)
+        Return the points within 'km' kilometers of a point
+    nearest(latitude, longitude, k)
+        Return the 'k' points nearest to a point
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        """
+        Parameters
+        ----------
+        cell_size : float (optional)
+            size (degrees) of the cells of the grid
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        self.points = {}
+        self.__rows = math.ceil(180 / cell_size)
+        self.__columns = math.ceil(360 / cell_size)
+
+    def __row(self, latitude):
+        """Return the row of the cells of 'latitude'"""
+        return min(int((latitude + 90) // self.cell_size), self.__rows - 1)
+
+    def __column(self, longitude):
+        """Return the column of the cells of 'longitude'"""
+        return int(((longitude + 180) % 360) // self.cell_size) %\
+            self.__columns
+
+    def __cell(self, row, column):
+        """Return the number of the cell at 'row' and 'column'"""
+        return row * self.__columns + column
+
+    def put(self, key, latitude, longitude):
+        """Set the position of the point with key 'key'. Points whose
+        latitude or longitude is not a valid number are not indexed.
+
+        Parameters
+        ----------
+        key : str
+            <class name>.id of the object located at this point
+        latitude : float
+            latitude in degrees (-90 to 90)
+        longitude : float
+            longitude in degrees (-180 to 180)
+        """
+        if key in self.points:
+            self.remove(key)
+        if not is_coordinate(latitude, 90) or\
+                not is_coordinate(longitude, 180):
+            return
+        cell = self.__cell(self.__row(latitude), self.__column(longitude))
+        points = self.cells.get(cell)
+        if points is None:
+            self.cells[cell] = points = {}
+        points[key] = (latitude, longitude)
+        self.points[key] = cell
+
+    def remove(self, key):
+        """Remove the point with key 'key' (if it is indexed)
+
+        Parameters
+        ----------
+        key : str
+            <class name>.id
+        """
+        cell = self.points.pop(key, None)
+        if cell is not None:
+            points = self.cells[cell]
+            del points[key]
+            if not points:
+                del self.cells[cell]
+
+    def __candidates(self, min_lat, max_lat, west, east):
+        """Return the points of the cells overlapping a box
+
+        Parameters
+        ----------
+        min_lat, max_lat : float
+            latitudes of the box
+        west, east : float
+            longitudes of the box, west > east if the box crosses the
+            180th meridian (None for every longitude)
+
+        Returns
+        -------
+        iterator
+            (key, (latitude, longitude)) of the points
+        """
+        rows = range(self.__row(min_lat), self.__row(max_lat) + 1)
+        if west is None:
+            columns = range(self.__columns)
+        else:
+            first, last = self.__column(west), self.__column(east)
+            if first <= last and west <= east:
+                columns = range(first, last + 1)
+            else:
+                columns = [*range(first, self.__columns),
+                           *range(0, last + 1)]
+        if len(rows) * len(columns) > len(self.cells):
+            # The box has more cells than there are non-empty cells
+            columns = set(columns)
+            return (point for cell, points in self.cells.items()
+                    if cell // self.__columns in rows and
+                    cell % self.__columns in columns
+                    for point in points.items())
+        cells = self.cells
+        return (point for cell in (self.__cell(row, column) for row in rows
+                                   for column in columns)
+                if cell in cells for point in cells[cell].items())
+
+    def within(self, min_lat, min_lon, max_lat, max_lon):
+        """Return the keys of the points in a box
+
+        Parameters
+        ----------
+        min_lat, min_lon : float
+            south-west corner of the box
+        max_lat, max_lon : float
+            north-east corner of the box (max_lon < min_lon for a box
+            crossing the 180th meridian)
+
+        Returns
+        -------
+        list
+            keys of the points
+        """
+        if min_lat > max_lat:
+            return []
+        min_lat, max_lat = max(min_lat, -90), min(max_lat, 90)
+        if max_lon - min_lon >= 360:
+            west = east = None
+        else:
+            west = (min_lon + 180) % 360 - 180
+            east = (max_lon + 180) % 360 - 180
+        keys = []
+        for key, (latitude, longitude) in self.__candidates(
+                min_lat, max_lat, west, east):
+            if not min_lat <= latitude <= max_lat:
+                continue
+            if west is None or\
+                    (west <= longitude <= east if west <= east else
+                     longitude >= west or longitude <= east):
+                keys.append(key)
+        return keys
+
+    def near(self, latitude, longitude, km):
+        """Return the points within 'km' kilometers of a point,
+        nearest first
+
+        Parameters
+        ----------
+        latitude, longitude : float
+            position of the point
+        km : float
+            distance in kilometers
+
+        Returns
+        -------
+        list
+            (distance, key) of the points
+        """
+        if km < 0:
+            return []
+        # Box around the circle of radius 'km'
+        angle = km / EARTH_RADIUS
+        delta = math.degrees(angle)
+        min_lat, max_lat = latitude - delta, latitude + delta
+        west = east = None
+        if min_lat > -90 and max_lat < 90:
+            ratio = math.sin(angle) / math.cos(math.radians(latitude))
+            if ratio < 1 and angle < math.pi / 2:
+                delta = math.degrees(math.asin(ratio))
+                west = (longitude - delta + 180) % 360 - 180
+                east = (longitude + delta + 180) % 360 - 180
+        found = []
+        for key, point in self.__candidates(max(min_lat, -90),
+                                            min(max_lat, 90), west, east):
+            point_distance = distance(latitude, longitude, *point)
+            if point_distance <= km:
+                found.append((point_distance, key))
+        found.sort()
+        return found
+
+    def nearest(self, latitude, longitude, k):
+        """Return the 'k' points nearest to a point, nearest first
+
+        Parameters
+        ----------
+        latitude, longitude : float
+            position of the point
+        k : int
+            number of points
+
+        Returns
+        -------
+        list
+            (distance, key) of the points
+        """
+        if k <= 0 or not self.points:
+            return []
+        # Search within a radius doubled until it holds 'k' points
+        # (or the whole Earth)
+        km = self.cell_size * math.pi * EARTH_RADIUS / 180
+        while True:
+            found = self.near(latitude, longitude, km)
+            if len(found) >= k or km >= math.pi * EARTH_RADIUS:
+                return found[:k]
+            km *= 2
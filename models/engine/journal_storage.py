@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+
+"""In this module defines JournalStorage class"""
+
+import json
+import os
+import threading
+from models.engine.atomic_file import atomic_open
+from models.engine.file_storage import FileStorage
+
+
+class JournalStorage(FileStorage):
+    """
+    Impliment an append-only storage of objects (users' data) in a file.
+
+    Instead of rewriting the whole file on every save, one JSON record
+    is appended per change (one per line). The file is replayed on
+    reload and compacted (rewritten with only live objects) on demand
+    or, in a background thread, once it has grown too large compared to
+    the number of objects (the save that crosses the limit does not
+    wait for it).
+
+    Record format
+    -------------
+    {"op": "put", "key": <class name>.id, "obj": <obj.to_dict()>}
+    {"op": "del", "key": <class name>.id}
+
+    Attributes
+    ----------
+    __file_path : str (private class attribute)
+        Log file where changes to objects are appended
+    __log_records : int
+        number of records currently in the log file
+    __offset : int
+        size of the log file when it was last read or written by this
+        process (the records appended after it by other processes are
+        replayed by _read_changes())
+    __compactor : threading.Thread
+        thread compacting the log in the background (None if it was
+        never compacted automatically). It is not a daemon thread so
+        the process waits for it on exit
+    COMPACT_MIN_RECORDS : int
+        the log is never compacted automatically below this size
+    COMPACT_RATIO : int
+        compact automatically once the log holds more than
+        COMPACT_RATIO records per live object
+
+    Methods
+    -------
+    _commit()
+        Append a record for every object changed or deleted since the
+        last save (called by save(), see FileStorage for group commit
+        and batches)
+    reload()
+        Replay the log file to '__objects'
+        (only if __file_path exists)
+    _read_changes()
+        Replay the records appended by other processes
+    compact()
+        Rewrite the log file with one record per live object
+    """
+    __file_path = "file.jsonl"
+    __log_records = 0
+    __offset = 0
+    __compactor = None
+    COMPACT_MIN_RECORDS = 1000
+    COMPACT_RATIO = 2
+
+    def _data_path(self):
+        """Return the path of the log file"""
+        return self.__file_path
+
+    def _commit(self):
+        """Append a record for every object changed or deleted since
+        the last save"""
+        with self.lock.write, self._file_lock():
+            if self._file_id() != self._file_state:
+                # Records appended by other processes are replayed
+                # first so their objects are not overwritten
+                self._read_changes()
+            objects = self.all()
+            records = [{"op": "del", "key": key}
+                       for key in self._take_deleted()]
+            for key in self._take_dirty():
+                if key in objects:
+                    records.append({"op": "put", "key": key,
+                                    "obj": objects[key].to_dict()})
+            self.__append(records)
+
+    def reload(self):
+        """Replay the log file to '__objects'
+        (only if __file_path exists)"""
+        file_lock = self._file_lock()
+        with self.lock.write:
+            file_lock.acquire(shared=True)
+            try:
+                state = self._file_id()
+                if state is None:
+                    return
+                with open(self.__file_path, 'rb') as f:
+                    live, _, records, damaged = self.__replay(f)
+                    JournalStorage.__offset = f.tell()
+                JournalStorage.__log_records = records
+                FileStorage._file_state = state
+                self._load_dicts(live)
+            finally:
+                file_lock.release()
+        if damaged:
+            # Drop the damaged records so new ones are not appended
+            # to a partial line
+            self.compact()
+
+    def _read_changes(self):
+        """Replay the records appended by other processes since the log
+        file was last read or written by this process (the whole log
+        if it was compacted in the meantime), called while holding
+        'lock.write' and the file lock"""
+        state = self._file_id()
+        if state is None:
+            self._merge({}, complete=True)
+            JournalStorage.__log_records = JournalStorage.__offset = 0
+            FileStorage._file_state = None
+            return
+        previous = self._file_state
+        # A compacted log is a new file (see atomic_open)
+        appended = previous is not None and previous[0] == state[0] and\
+            state[1] >= self.__offset
+        with open(self.__file_path, 'rb') as f:
+            if appended:
+                f.seek(self.__offset)
+            live, removed, records, _ = self.__replay(f)
+            JournalStorage.__offset = f.tell()
+        if appended:
+            self._merge(live, removed)
+            JournalStorage.__log_records += records
+        else:
+            self._merge(live, complete=True)
+            JournalStorage.__log_records = records
+        FileStorage._file_state = state
+
+    @staticmethod
+    def __replay(f):
+        """Replay the records of the log file 'f' from its position
+
+        Parameters
+        ----------
+        f : file object
+            log file opened in binary mode
+
+        Returns
+        -------
+        tuple
+            (dictionaries of the objects put by key, keys of the
+            objects deleted, number of records, True if a damaged
+            record was skipped)
+        """
+        # Only the last record of a key matters, so objects are
+        # built once the whole log has been replayed
+        live = {}
+        removed = set()
+        records = 0
+        damaged = False
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A partially written record (e.g the process was
+                # killed while appending) is skipped
+                damaged = True
+                continue
+            records += 1
+            if record["op"] == "put":
+                live[record["key"]] = record["obj"]
+                removed.discard(record["key"])
+            elif record["op"] == "del":
+                live.pop(record["key"], None)
+                removed.add(record["key"])
+        return live, removed, records, damaged
+
+    def compact(self):
+        """Rewrite the log file with one record per live object,
+        dropping overwritten and deleted records"""
+        with self.lock.write, self._file_lock():
+            if self._file_id() != self._file_state:
+                self._read_changes()
+            objects = self.all()
+            # Taken before the objects are written: an object changed
+            # in place while the log is rewritten is saved again by the
+            # next save
+            self._take_dirty()
+            with atomic_open(self.__file_path) as f:
+                for key, obj in objects.copy().items():
+                    record = {"op": "put", "key": key,
+                              "obj": obj.to_dict()}
+                    f.write(json.dumps(record) + "\n")
+            JournalStorage.__log_records = len(objects)
+            self.__written()
+
+    def __written(self):
+        """Record the log file as read up to its end by this process
+        (after it was written)"""
+        state = self._file_id()
+        JournalStorage.__offset = state[1]
+        FileStorage._file_state = state
+
+    def __append(self, records):
+        """Append 'records' to the log file and start compacting it in
+        the background if it has grown too large
+
+        Parameters
+        ----------
+        records : list
+            records (dictionaries) to append, one per line
+        """
+        if not records:
+            return
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        with open(self.__file_path, 'a') as f:
+            f.write(lines)
+            # The records are on the disk before save() returns
+            f.flush()
+            os.fsync(f.fileno())
+        self.__written()
+        JournalStorage.__log_records += len(records)
+        if self.__log_records > self.COMPACT_MIN_RECORDS and\
+                self.__log_records > self.COMPACT_RATIO * len(self.all())\
+                and not (self.__compactor and self.__compactor.is_alive()):
+            # compact() waits for the lock held by this save, so it
+            # runs once the save is done
+            compactor = threading.Thread(target=self.compact,
+                                         name="journal-compact")
+            compactor.start()
+            JournalStorage.__compactor = compactor
@@ -0,0 +1,209 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the locks used by the storage engines:
+    RWLock : reader/writer lock protecting the objects in memory from
+        the threads of a process
+    FileLock : advisory lock (fcntl.flock) on a lock file protecting the
+        storage file from the other processes (not available on
+        platforms without fcntl, where it does nothing)
+"""
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class _Side:
+    """
+    Impliment one side (read or write) of a RWLock as a context manager
+
+    Attributes
+    ----------
+    acquire : function
+        acquires this side of the lock
+    release : function
+        releases this side of the lock
+    """
+    __slots__ = ("acquire", "release")
+
+    def __init__(self, acquire, release):
+        self.acquire = acquire
+        self.release = release
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class RWLock:
+    """
+    Impliment a reader/writer lock: many threads can hold the read
+    lock at the same time, the write lock is held by one thread only
+    while no thread holds the read lock.
+
+    Both locks can be acquired again by the thread holding them, and
+    the thread holding the write lock can also acquire the read lock
+    (not the opposite). Waiting writers have priority over new readers.
+
+    Usage:
+        with lock.read:
+            ...
+        with lock.write:
+            ...
+
+    Attributes
+    ----------
+    read : context manager
+        the read lock
+    write : context manager
+        the write lock
+    """
+
+    def __init__(self):
+        # Held by the writer for as long as it holds the write lock,
+        # and briefly by new readers, so they wait for the writer
+        self.__mutex = threading.RLock()
+        self.__condition = threading.Condition(threading.Lock())
+        # Number of times each reading thread acquired the read lock
+        self.__readers = {}
+        self.__writes = 0
+        self.read = _Side(self.__acquire_read, self.__release_read)
+        self.write = _Side(self.__acquire_write, self.__release_write)
+
+    def __acquire_read(self):
+        """Acquire the read lock"""
+        me = threading.get_ident()
+        if self.__readers.get(me):
+            # Only this thread changes its own count
+            self.__readers[me] += 1
+            return
+        with self.__mutex, self.__condition:
+            self.__readers[me] = 1
+
+    def __release_read(self):
+        """Release the read lock"""
+        me = threading.get_ident()
+        with self.__condition:
+            if self.__readers[me] > 1:
+                self.__readers[me] -= 1
+                return
+            del self.__readers[me]
+            if not self.__readers:
+                self.__condition.notify_all()
+
+    def __acquire_write(self):
+        """Acquire the write lock
+
+        Raises
+        ------
+        RuntimeError
+            if the thread holds the read lock but not the write lock
+        """
+        self.__mutex.acquire()
+        if self.__writes:
+            # Acquired again by the writer
+            self.__writes += 1
+            return
+        if self.__readers:
+            with self.__condition:
+                if threading.get_ident() in self.__readers:
+                    self.__mutex.release()
+                    raise RuntimeError("the read lock can't be upgraded "
+                                       "to the write lock")
+                while self.__readers:
+                    self.__condition.wait()
+        self.__writes = 1
+
+    def __release_write(self):
+        """Release the write lock"""
+        self.__writes -= 1
+        self.__mutex.release()
+
+
+class FileLock:
+    """
+    Impliment an advisory lock on a lock file shared by the processes
+    using the same storage file. The lock is not shared by the threads
+    of a process: it must be held by one thread at a time (e.g while
+    holding the write lock of a RWLock), which can acquire it again.
+
+    Attributes
+    ----------
+    path : str
+        lock file (created if it doesn't exist)
+    __fd : int
+        file descriptor of the lock file while the lock is held
+    __depth : int
+        number of times the lock was acquired and not released
+
+    Methods
+    -------
+    acquire(shared=False)
+        Acquire the lock, shared (for reading) or exclusive
+    release()
+        Release the lock
+
+    Usage (exclusive lock):
+        with file_lock:
+            ...
+    """
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            lock file
+        """
+        self.path = path
+        self.__fd = None
+        self.__depth = 0
+
+    def acquire(self, shared=False):
+        """Acquire the lock, waiting until no other process holds it
+        (or holds it exclusively if 'shared' is True)
+
+        Parameters
+        ----------
+        shared : bool (optional)
+            if True, other processes can hold the shared lock too
+        """
+        self.__depth += 1
+        if self.__depth > 1 or fcntl is None:
+            # A shared lock acquired again stays shared
+            return
+        self.__fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self.__fd, fcntl.LOCK_SH if shared
+                        else fcntl.LOCK_EX)
+        except BaseException:
+            os.close(self.__fd)
+            self.__fd = None
+            self.__depth -= 1
+            raise
+
+    def release(self):
+        """Release the lock"""
+        self.__depth -= 1
+        if self.__depth or self.__fd is None:
+            return
+        try:
+            fcntl.flock(self.__fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self.__fd)
+            self.__fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
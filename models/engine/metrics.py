@@ -0,0 +1,351 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the Metrics class, counting the calls of the
+storage methods and console commands and recording their latencies,
+and its instance 'metrics' (models.metrics, used by the console
+commands stats and profile).
+
+While metrics are off, nothing is recorded and the methods are not
+changed: enable() replaces the methods of TARGETS and of the storage
+class (STORAGE_METHODS) by timed versions, and disable() puts the
+original methods back. Other methods timed in their own way (ex: the
+console commands, see console.py) are registered with register() and
+replaced the same way.
+
+Latencies are kept in histograms of powers of 2 microseconds: the
+percentiles reported are the upper bounds of their buckets.
+"""
+
+import cProfile
+import functools
+import importlib
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+
+# Methods timed by enable(): (module, class name, method names)
+TARGETS = (("models.base_model", "BaseModel",
+            ("__init__", "__str__", "to_dict", "save")),
+           ("models.engine.serializers", "JSONSerializer",
+            ("dump", "load")),
+           ("models.engine.serializers", "BinarySerializer",
+            ("dump", "load")))
+# Methods of the storage class timed by enable()
+STORAGE_METHODS = ("new", "save", "_commit", "reload", "all", "get",
+                   "count", "delete", "update", "where", "related",
+                   "find_by", "within", "near", "nearest", "begin",
+                   "commit")
+# Functions listed by the report of the profile mode
+PROFILE_LINES = 20
+# Lines of code allocating the most memory listed by the report
+MEMORY_LINES = 10
+
+
+class Metrics:
+    """
+    Impliment the counters and latency histograms of the operations
+    (storage methods and console commands) and the profile mode
+
+    Attributes
+    ----------
+    enabled : bool
+        True while operations are recorded
+    profiling : bool
+        True while the profile mode is on
+    __operations : dict
+        [count, total (s), max (s), histogram] by operation name, the
+        histogram being the number of calls by bucket (bucket n: less
+        than 2 ** n µs)
+    __lock : threading.Lock
+        protects '__operations' from the threads recording at once
+    __originals : list
+        (class, method name, method or None if it was inherited) of the
+        methods replaced by enable()
+    __registered : list
+        (class, method name, function returning the timed version of
+        the method) of the methods registered with register()
+    __profile : cProfile.Profile
+        profiler of the profile mode (the last one is kept once it is
+        stopped, to be written by dump_profile())
+
+    Methods
+    -------
+    register(cls, method_name, timed)
+        Replace a method by its timed version while metrics are on
+    enable(storage)
+        Start recording the storage methods (and TARGETS)
+    disable()
+        Stop recording and put the original methods back
+    record(name, seconds)
+        Record a call of the operation 'name'
+    stats()
+        Return the statistics of every operation
+    reset()
+        Forget every recorded call
+    dump(path)
+        Write the statistics to a JSON file
+    report()
+        Return the statistics as a table
+    start_profile()
+        Start the profile mode (cProfile and tracemalloc)
+    stop_profile(path)
+        Stop the profile mode and return its report
+    dump_profile(path)
+        Write the last profile to a file
+    """
+
+    def __init__(self):
+        """Initialize the metrics (off)"""
+        self.enabled = False
+        self.profiling = False
+        self.__operations = {}
+        self.__lock = threading.Lock()
+        self.__originals = []
+        self.__registered = []
+        self.__profile = None
+
+    def __timed(self, name, function):
+        """Return 'function' recording its calls as the operation
+        'name'"""
+        record = self.record
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+        return timed
+
+    def __replace(self, cls, method_name, timed):
+        """Replace the method 'method_name' of 'cls' by the version
+        returned by 'timed' (called with the method)"""
+        function = getattr(cls, method_name, None)
+        if function is None:
+            return
+        self.__originals.append(
+            (cls, method_name, cls.__dict__.get(method_name)))
+        setattr(cls, method_name, timed(function))
+
+    def __wrap(self, cls, method_names, prefix):
+        """Replace the methods 'method_names' of 'cls' by timed
+        versions named <prefix>.<method name>"""
+        for method_name in method_names:
+            self.__replace(cls, method_name, functools.partial(
+                self.__timed, f"{prefix}.{method_name}"))
+
+    def register(self, cls, method_name, timed):
+        """Replace the method 'method_name' of 'cls' by its timed
+        version while metrics are on (now if they are on)
+
+        Parameters
+        ----------
+        cls : class
+            class of the method (ex: HBNBCommand)
+        method_name : str
+            name of the method (ex: onecmd)
+        timed : function
+            returns the timed version of the method (called with the
+            method, it records its calls with record())
+        """
+        self.__registered.append((cls, method_name, timed))
+        if self.enabled:
+            self.__replace(cls, method_name, timed)
+
+    def enable(self, storage):
+        """Start recording the methods of the storage class of
+        'storage' (STORAGE_METHODS) and of TARGETS
+
+        Parameters
+        ----------
+        storage : FileStorage (or another engine)
+            storage of the models (models.storage)
+        """
+        if self.enabled:
+            return
+        storage_class = type(storage)
+        self.__wrap(storage_class, STORAGE_METHODS, "storage")
+        for module, class_name, method_names in TARGETS:
+            cls = getattr(importlib.import_module(module), class_name)
+            self.__wrap(cls, method_names, class_name)
+        for cls, method_name, timed in self.__registered:
+            self.__replace(cls, method_name, timed)
+        self.enabled = True
+
+    def disable(self):
+        """Stop recording and put the original methods back (the
+        statistics are kept)"""
+        while self.__originals:
+            cls, method_name, original = self.__originals.pop()
+            if original is None:
+                # The method was inherited
+                delattr(cls, method_name)
+            else:
+                setattr(cls, method_name, original)
+        self.enabled = False
+
+    def record(self, name, seconds):
+        """Record a call of the operation 'name'
+
+        Parameters
+        ----------
+        name : str
+            operation (ex: storage.save, console.show)
+        seconds : float
+            duration of the call
+        """
+        bucket = int(seconds * 1e6).bit_length()
+        with self.__lock:
+            operation = self.__operations.get(name)
+            if operation is None:
+                operation = self.__operations[name] = [0, 0.0, 0.0, []]
+            operation[0] += 1
+            operation[1] += seconds
+            if seconds > operation[2]:
+                operation[2] = seconds
+            histogram = operation[3]
+            if bucket >= len(histogram):
+                histogram.extend([0] * (bucket + 1 - len(histogram)))
+            histogram[bucket] += 1
+
+    @staticmethod
+    def __percentile(histogram, count, fraction):
+        """Return the upper bound (µs) of the bucket holding the
+        'fraction' percentile of 'histogram'"""
+        rank = fraction * count
+        seen = 0
+        for bucket, calls in enumerate(histogram):
+            seen += calls
+            if seen >= rank:
+                return 2 ** bucket
+        return 2 ** len(histogram)
+
+    def stats(self):
+        """Return the statistics of every operation
+
+        Returns
+        -------
+        dict
+            {"count", "total_s", "mean_us", "p50_us", "p99_us",
+            "max_us", "histogram"} by operation name
+        """
+        with self.__lock:
+            operations = {name: (count, total, longest, list(histogram))
+                          for name, (count, total, longest, histogram)
+                          in self.__operations.items()}
+        stats = {}
+        for name, (count, total, longest, histogram) in operations.items():
+            stats[name] = {
+                "count": count,
+                "total_s": total,
+                "mean_us": total / count * 1e6,
+                "p50_us": self.__percentile(histogram, count, 0.5),
+                "p99_us": self.__percentile(histogram, count, 0.99),
+                "max_us": longest * 1e6,
+                "histogram": histogram}
+        return stats
+
+    def reset(self):
+        """Forget every recorded call"""
+        with self.__lock:
+            self.__operations.clear()
+
+    def dump(self, path):
+        """Write the statistics (see stats()) to the JSON file 'path'
+
+        Raises
+        ------
+        OSError
+            if 'path' can't be written
+        """
+        text = json.dumps(self.stats(), indent=2)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def report(self):
+        """Return the statistics as a table, the operations taking the
+        most time first"""
+        stats = self.stats()
+        lines = [f"{'operation':<32} {'count':>9} {'total (s)':>10} "
+                 f"{'mean (µs)':>10} {'p50 (µs)':>9} {'p99 (µs)':>9} "
+                 f"{'max (µs)':>10}"]
+        for name, stat in sorted(stats.items(),
+                                 key=lambda item: -item[1]["total_s"]):
+            lines.append(f"{name:<32} {stat['count']:>9} "
+                         f"{stat['total_s']:>10.3f} "
+                         f"{stat['mean_us']:>10.1f} "
+                         f"{stat['p50_us']:>9} {stat['p99_us']:>9} "
+                         f"{stat['max_us']:>10.1f}")
+        return "\n".join(lines)
+
+    def start_profile(self):
+        """Start the profile mode: every function call is profiled
+        (cProfile) and memory allocations are traced (tracemalloc)"""
+        if self.profiling:
+            return
+        self.__profile = cProfile.Profile()
+        tracemalloc.start()
+        self.__profile.enable()
+        self.profiling = True
+
+    def stop_profile(self, path=None):
+        """Stop the profile mode and return its report: the functions
+        taking the most time (cumulative) and the lines of code
+        allocating the most memory still allocated
+
+        Parameters
+        ----------
+        path : str (optional)
+            file the profile is written to (see dump_profile())
+
+        Returns
+        -------
+        str
+            the report (empty if the profile mode was off)
+
+        Raises
+        ------
+        OSError
+            if 'path' can't be written (the profile mode is stopped
+            and the profile can still be written by dump_profile())
+        """
+        if not self.profiling:
+            return ""
+        self.__profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        self.profiling = False
+        output = io.StringIO()
+        profile_stats = pstats.Stats(self.__profile, stream=output)
+        profile_stats.sort_stats("cumulative").print_stats(PROFILE_LINES)
+        output.write("Memory allocated by line:\n")
+        for stat in snapshot.statistics("lineno")[:MEMORY_LINES]:
+            output.write(f"{stat}\n")
+        if path:
+            self.dump_profile(path)
+        return output.getvalue().strip("\n")
+
+    def dump_profile(self, path):
+        """Write the last profile to the file 'path' (see pstats), to
+        be explored later (ex: python3 -m pstats <path>)
+
+        Raises
+        ------
+        ValueError
+            if there is no profile to write (the profile mode was never
+            started or is still on)
+        OSError
+            if 'path' can't be written
+        """
+        if self.__profile is None or self.profiling:
+            raise ValueError("no profile to write")
+        self.__profile.dump_stats(path)
+
+
+metrics = Metrics()
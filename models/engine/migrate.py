@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the import of a storage file of FileStorage
+(file.json or file.bin) into the SQLite database of DBStorage.
+
+Usage: python3 -m models.engine.migrate [<source> [<database>]]
+    (default: file.json file.db)
+    Objects already in the database are replaced by the ones of the
+    source with the same key, so the import can be run again.
+"""
+
+import sys
+from models import storage
+from models.engine.db_storage import connect, write_rows
+from models.engine.serializers import detect_format
+
+
+def migrate(source="file.json", database="file.db"):
+    """Import the objects of the storage file 'source' into the
+    database 'database' (created if it doesn't exist)
+
+    Parameters
+    ----------
+    source : str (optional)
+        path of the file to import (JSON or binary format)
+    database : str (optional)
+        path of the SQLite database
+
+    Returns
+    -------
+    int
+        number of objects imported
+    """
+    classes = storage.classes()
+    with open(source, 'rb') as f:
+        obj_dicts = detect_format(source).load(f)
+    connection = connect(database, classes)
+    try:
+        with connection:
+            write_rows(connection, classes, obj_dicts.values())
+    finally:
+        connection.close()
+    return len(obj_dicts)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 3:
+        print("Usage: python3 -m models.engine.migrate "
+              "[<source> [<database>]]")
+        sys.exit(1)
+    print(f"{migrate(*sys.argv[1:])} objects imported")
@@ -0,0 +1,260 @@
+#!/usr/bin/python3
+
+"""
+In this module defines functions to index the entries of a JSON file
+written by FileStorage ('{"<key>": {...}, "<key>": {...}}') by their
+position in the file, so objects can be loaded one by one when needed.
+
+An index is a tuple (positions, offsets):
+    positions : dict
+        {<class name>: {<key>: i}}, with the entries of each class
+        numbered one after the other
+    offsets : array.array
+        offsets[2 * i] and offsets[2 * i + 1] are the offsets (in
+        bytes) of the start and end of the entry '"<key>": {...}'
+It is saved next to the JSON file (<file path>.idx) as two JSON lines
+(a header and the keys) followed by the offsets in binary form.
+"""
+
+from array import array
+import json
+import os
+from models.engine.atomic_file import atomic_open
+
+CHUNK_SIZE = 1 << 20
+# Version of the saved indexes (indexes of other versions are rebuilt)
+VERSION = 2
+
+_decoder = json.JSONDecoder()
+
+
+def index_path(path):
+    """Return the path of the index of the JSON file 'path'"""
+    return path + ".idx"
+
+
+def scan(path):
+    """Index the entries of the JSON file 'path' in a single pass
+    reading CHUNK_SIZE bytes at a time
+
+    Parameters
+    ----------
+    path : str
+        JSON file written by FileStorage
+
+    Returns
+    -------
+    tuple
+        (positions, offsets) index of the file
+
+    Raises
+    ------
+    ValueError
+        if the file is not an object of objects written by FileStorage
+    """
+    # Keys and offsets of the entries of each class
+    classes = {}
+    with open(path, 'rb') as f:
+        if f.read(1) != b'{':
+            raise ValueError(f"{path} is not a JSON object")
+        # Offset of the first byte of 'rest' in the file
+        base = 1
+        rest = b''
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if chunk:
+                buf = rest + chunk
+            else:
+                buf = rest.rstrip()
+                if not buf.endswith(b'}'):
+                    raise ValueError(f"{path} is truncated")
+                # Drop the '}' closing the file
+                buf = buf[:-1]
+            # Only complete entries are indexed, the last one is
+            # completed by the next chunk
+            used = _index_block(buf, base, classes, not chunk)
+            base += used
+            rest = buf[used:]
+            if not chunk:
+                break
+    positions = {}
+    offsets = array('q')
+    for class_name, (keys, class_offsets) in classes.items():
+        first = len(offsets) // 2
+        positions[class_name] = dict(zip(keys, range(first,
+                                                     first + len(keys))))
+        offsets.extend(class_offsets)
+    return positions, offsets
+
+
+def _index_block(block, base, classes, last):
+    """Add to 'classes' the complete entries '"<key>": {...}' at the
+    start of 'block'
+
+    An entry ends at the first '}, "' after it (a '"' is escaped in
+    strings, so '}, "' can't be in a string), unless the entry holds
+    other '{': the '}, "' found may then end a dictionary in the
+    entry, and the end of the entry is found by parsing it.
+
+    Parameters
+    ----------
+    block : bytes
+        entries separated by ', '
+    base : int
+        offset of 'block' in the file
+    classes : dict
+        keys and offsets of the entries by class name
+    last : bool
+        True if 'block' ends the file (its last entry is complete)
+
+    Returns
+    -------
+    int
+        number of bytes of 'block' indexed (the rest starts with an
+        incomplete entry)
+
+    Raises
+    ------
+    ValueError
+        if an entry of the file can't be parsed
+    """
+    size = len(block)
+    # 'block' decoded for the JSON decoder only when needed (latin-1
+    # keeps the offsets of the bytes)
+    text = None
+    start = 0
+    while True:
+        while start < size and block[start] in b', ':
+            start += 1
+        if start == size:
+            return start
+        separator = block.find(b'}, "', start)
+        if separator < 0:
+            if not last:
+                return start
+            end = size
+        else:
+            end = separator + 1
+        key_end = block.find(b'": ', start, end)
+        if block[start] != ord('"') or key_end < 0:
+            raise ValueError(f"invalid entry at offset {base + start}")
+        if block.count(b'{', key_end, end) != 1:
+            if text is None:
+                text = block.decode('latin-1')
+            try:
+                end = _decoder.raw_decode(text, key_end + 3)[1]
+            except ValueError:
+                if not last:
+                    # Completed by the next chunk
+                    return start
+                raise ValueError(
+                    f"invalid entry at offset {base + start}") from None
+        key = block[start + 1:key_end]
+        if b'\\' in key:
+            # The key has escaped characters
+            key = json.loads(b'"' + key + b'"')
+        else:
+            key = key.decode()
+        class_name = key[:key.find(".")]
+        if class_name not in classes:
+            classes[class_name] = ([], array('q'))
+        keys, offsets = classes[class_name]
+        keys.append(key)
+        offsets.append(base + start)
+        offsets.append(base + end)
+        start = end
+
+
+def load(path):
+    """Return the index saved for the JSON file 'path', or None if
+    there is none or it doesn't match the file anymore
+
+    Parameters
+    ----------
+    path : str
+        JSON file written by FileStorage
+
+    Returns
+    -------
+    tuple
+        (positions, offsets) index of the file
+    """
+    try:
+        stat = os.stat(path)
+        with open(index_path(path), 'rb') as f:
+            header = json.loads(f.readline())
+            if header.get("version") != VERSION or\
+                    header["size"] != stat.st_size or\
+                    header["mtime_ns"] != stat.st_mtime_ns:
+                return None
+            keys = json.loads(f.readline())
+            offsets = array('q')
+            offsets.frombytes(f.read())
+    except (OSError, ValueError, KeyError):
+        return None
+    if len(offsets) != 2 * len(keys):
+        return None
+    positions = {}
+    first = 0
+    for class_name, count in header["classes"]:
+        last = first + count
+        positions[class_name] = dict(zip(keys[first:last],
+                                         range(first, last)))
+        first = last
+    return positions, offsets
+
+
+def dump(path, positions, offsets):
+    """Save the index (positions, offsets) of the JSON file 'path'
+    next to it
+
+    Parameters
+    ----------
+    path : str
+        JSON file written by FileStorage
+    positions : dict
+        position of the entries by key, by class name
+    offsets : array.array
+        start and end offsets of the entries
+    """
+    stat = os.stat(path)
+    header = {"version": VERSION, "size": stat.st_size,
+              "mtime_ns": stat.st_mtime_ns,
+              "classes": [[name, len(keys)]
+                          for name, keys in positions.items()]}
+    keys = []
+    for class_keys in positions.values():
+        keys.extend(class_keys)
+    # The index can be rebuilt from the file, it is not synced to disk
+    with atomic_open(index_path(path), 'wb', fsync=False) as f:
+        f.write(json.dumps(header).encode() + b"\n")
+        f.write(json.dumps(keys).encode() + b"\n")
+        f.write(offsets.tobytes())
+
+
+def read(path, offsets, positions):
+    """Return the entries of the JSON file 'path' at 'positions'
+
+    Parameters
+    ----------
+    path : str
+        JSON file written by FileStorage
+    offsets : array.array
+        start and end offsets of the entries
+    positions : dict
+        position of the entries to read by key
+
+    Returns
+    -------
+    dict
+        entry ('"<key>": {...}') by key
+    """
+    entries = {}
+    with open(path, 'rb') as f:
+        # Reading in file order avoids seeking back and forth
+        for key, i in sorted(positions.items(),
+                             key=lambda item: offsets[2 * item[1]]):
+            f.seek(offsets[2 * i])
+            entries[key] = f.read(offsets[2 * i + 1] -
+                                  offsets[2 * i]).decode()
+    return entries
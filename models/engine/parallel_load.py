@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the parallel load of a JSON file written by
+FileStorage ('{"<key>": {...}, "<key>": {...}}'):
+    split(offsets, parts) : byte ranges of whole entries of a file
+    load_range(path, start, end, parse) : parse the entries of a byte
+        range of the file
+    load(path, workers) : parse the whole file with several processes
+
+The entries of the file are found by models.engine.offset_index (the
+index saved next to the file, or a scan of the file), and the file is
+split in byte ranges of whole entries. Each process parses the entries
+of its range with the datetimes of the objects and returns their
+attributes, which only need to be set on new objects (see
+BaseModel.from_attributes()). Attributes are returned instead of
+objects, as the compact classes (see models.compact) can't be sent
+from a process to another (pickled).
+"""
+
+from bisect import bisect_left
+import gc
+import json
+import os
+import pickle
+from models.engine import offset_index
+
+# Files smaller than this are parsed by the calling process
+MIN_SIZE = 1 << 20
+
+
+def split(offsets, parts):
+    """Return at most 'parts' byte ranges (start, end) of about the
+    same size holding whole entries
+
+    Parameters
+    ----------
+    offsets : array.array
+        start and end offsets of the entries (see models.engine.
+        offset_index)
+    parts : int
+        number of ranges
+
+    Returns
+    -------
+    list
+        (start, end) of the ranges, in the order of the file
+    """
+    starts = sorted(offsets[0::2])
+    ends = sorted(offsets[1::2])
+    if not starts:
+        return []
+    first, last = starts[0], ends[-1]
+    step = -(-(last - first) // parts)
+    ranges = []
+    i = 0
+    while i < len(starts):
+        # Entries starting before the end of the part belong to it
+        j = max(i + 1, bisect_left(starts, first + step * (len(ranges) + 1),
+                                   i))
+        ranges.append((starts[i], ends[j - 1]))
+        i = j
+    return ranges
+
+
+def _entries(obj_dicts, parse):
+    """Return the (key, class name, attributes) of the dictionaries of
+    the objects 'obj_dicts'"""
+    return [(key, obj_dict["__class__"], parse(obj_dict))
+            for key, obj_dict in obj_dicts.items()]
+
+
+def load_range(path, start, end, parse):
+    """Parse the entries of the JSON file 'path' in the byte range
+    [start, end)
+
+    Parameters
+    ----------
+    path : str
+        JSON file written by FileStorage
+    start : int
+        offset of the first byte of the first entry
+    end : int
+        offset of the byte after the last entry
+    parse : function
+        returns the attributes of an object from its dictionary
+        (models.base_model.attributes_of())
+
+    Returns
+    -------
+    list
+        (key, class name, attributes) of the entries, in the order of
+        the file
+
+    Raises
+    ------
+    ValueError
+        if the entries can't be parsed (e.g the file changed)
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _entries(json.loads(b"{" + data + b"}"), parse)
+
+
+def load(path, workers):
+    """Parse the JSON file 'path' with 'workers' processes (forked,
+    each one sending its entries back through a pipe), or in the
+    calling process for small files or where processes can't be forked
+
+    Parameters
+    ----------
+    path : str
+        JSON file written by FileStorage
+    workers : int
+        number of processes
+
+    Returns
+    -------
+    list
+        (key, class name, attributes) of every entry of the file, in
+        order (see load_range())
+
+    Raises
+    ------
+    ValueError
+        if the file can't be parsed
+    """
+    # Imported here as models.base_model imports the storage (the
+    # models are imported before reload(), see FileStorage.classes())
+    from models.base_model import attributes_of
+    size = os.path.getsize(path)
+    if workers <= 1 or size < MIN_SIZE or not hasattr(os, "fork"):
+        with open(path, 'rb') as f:
+            return _entries(json.load(f), attributes_of)
+    index = offset_index.load(path)
+    if index is None:
+        index = offset_index.scan(path)
+        # Saved so the next reload doesn't need to scan the file
+        offset_index.dump(path, *index)
+    children = []
+    for start, end in split(index[1], workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            # Child process: it must not return (or run the exit
+            # handlers of the storage)
+            os.close(read_fd)
+            # Nothing parsed is garbage (see FileStorage)
+            gc.disable()
+            try:
+                result = (True, load_range(path, start, end,
+                                           attributes_of))
+            except Exception as e:
+                result = (False, repr(e))
+            with os.fdopen(write_fd, 'wb') as f:
+                pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+            os._exit(0)
+        os.close(write_fd)
+        children.append((pid, os.fdopen(read_fd, 'rb')))
+    entries = []
+    error = None
+    for pid, f in children:
+        try:
+            with f:
+                parsed, result = pickle.load(f)
+        except (EOFError, pickle.UnpicklingError) as e:
+            parsed, result = False, repr(e)
+        os.waitpid(pid, 0)
+        if parsed:
+            entries.extend(result)
+        elif error is None:
+            error = result
+    if error is not None:
+        raise ValueError(error)
+    return entries
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the restore of the objects of WALStorage as
+they were at a given time (point-in-time recovery).
+
+Usage: HBNB_TYPE_STORAGE=wal python3 -m models.engine.restore <time>
+    <time> in ISO format (ex: 2026-10-18T12:00:00). The restore is
+    saved as new changes, so it can be undone by restoring the objects
+    as they were before it.
+"""
+
+import sys
+from models import storage
+from models.engine.wal_storage import WALStorage
+
+
+def restore(at):
+    """Restore the objects of the storage as they were at 'at'
+
+    Parameters
+    ----------
+    at : datetime.datetime or str
+        time (ISO format if str)
+
+    Returns
+    -------
+    int
+        number of objects changed, created or deleted
+
+    Raises
+    ------
+    TypeError
+        if the storage engine is not WALStorage
+    ValueError
+        if 'at' is not a time or the snapshots and logs needed were
+        removed (see WALStorage.KEEP_SNAPSHOTS)
+    """
+    if not isinstance(storage, WALStorage):
+        raise TypeError("the storage engine is not WALStorage "
+                        "(HBNB_TYPE_STORAGE=wal)")
+    return storage.restore(at)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: HBNB_TYPE_STORAGE=wal python3 -m "
+              "models.engine.restore <time>")
+        sys.exit(1)
+    try:
+        print(f"{restore(sys.argv[1])} objects restored")
+    except (TypeError, ValueError) as e:
+        print(f"** {e} **")
+        sys.exit(1)
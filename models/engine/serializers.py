@@ -0,0 +1,344 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the formats FileStorage can save objects in:
+    json (default): JSONSerializer, '{"<key>": <obj.to_dict()>, ...}'
+    binary: BinarySerializer, a compact column oriented format
+
+Binary format
+-------------
+The file starts with MAGIC, followed by one section per group of
+objects of the same class with the same attributes (in the same order).
+Class and attribute names are written once per section instead of once
+per object:
+    <header size (uint32)> <header: JSON [class name, [attribute
+    names], number of objects]>
+then one column per attribute, the values of the attribute for every
+object of the section:
+    <type (1 byte)> <size (uint64)> <values>
+Column types:
+    t : datetimes (without time zone) as int64 microseconds since
+        1970-01-01
+    i : int64
+    f : float64
+    s : strings (UTF-8) separated by a NUL character
+    j : JSON list (any other values, e.g lists or None)
+Numbers are little-endian.
+
+Files are converted from one format to the other with
+models/engine/convert.py.
+"""
+
+from array import array
+from datetime import datetime, timedelta
+from itertools import repeat
+import json
+from operator import attrgetter
+import os
+import struct
+import sys
+
+MAGIC = b"HBNB\x01"
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+_HEADER = struct.Struct("<I")
+_COLUMN = struct.Struct("<cQ")
+
+
+def _to_bytes(values):
+    """Return the bytes of the array 'values' in little-endian order"""
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode, data):
+    """Return the array of type 'typecode' read from the little-endian
+    bytes 'data'"""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _encode_column(values):
+    """Return the type and the bytes of a column
+
+    Parameters
+    ----------
+    values : tuple
+        values of an attribute for every object of a section
+
+    Returns
+    -------
+    tuple
+        (type, bytes)
+    """
+    types = set(map(type, values))
+    if types == {str}:
+        text = "\0".join(values)
+        # Strings holding a NUL character are written as JSON
+        if text.count("\0") == len(values) - 1:
+            return b"s", text.encode("utf-8", "surrogatepass")
+    elif types == {datetime}:
+        if set(map(attrgetter("tzinfo"), values)) == {None}:
+            return b"t", _to_bytes(array('q', map(
+                MICROSECOND.__rfloordiv__, map(EPOCH.__rsub__, values))))
+    elif types == {int}:
+        try:
+            return b"i", _to_bytes(array('q', values))
+        except OverflowError:
+            pass
+    elif types == {float}:
+        return b"f", _to_bytes(array('d', values))
+    return b"j", json.dumps(values, default=datetime.isoformat).encode()
+
+
+def _decode_column(column_type, data):
+    """Return the values of a column
+
+    Parameters
+    ----------
+    column_type : bytes
+        type of the column (see _encode_column)
+    data : bytes
+        bytes of the column
+
+    Returns
+    -------
+    sequence
+        values of the column
+    """
+    if column_type == b"s":
+        return str(data, "utf-8", "surrogatepass").split("\0")
+    if column_type == b"t":
+        return list(map(EPOCH.__add__, map(timedelta, repeat(0), repeat(0),
+                                           _from_bytes('q', data))))
+    if column_type == b"i":
+        return _from_bytes('q', data).tolist()
+    if column_type == b"f":
+        return _from_bytes('d', data).tolist()
+    if column_type == b"j":
+        return json.loads(bytes(data))
+    raise ValueError(f"unknown column type: {column_type}")
+
+
+class JSONSerializer:
+    """
+    Impliment the JSON format of FileStorage
+
+    Attributes
+    ----------
+    name : str
+        name of the format
+    extension : str
+        extension of the files in this format
+
+    Methods
+    -------
+    fragment(key, obj) (static method)
+        Return the JSON entry '"<key>": <obj.to_dict()>' of 'obj'
+    dump(f, objects)
+        Write 'objects' to the file 'f'
+    load(f)
+        Return the dictionaries of the objects in the file 'f'
+    """
+    name = "json"
+    extension = ".json"
+
+    @staticmethod
+    def fragment(key, obj):
+        """Return the JSON entry '"<key>": <obj dictionary>' of 'obj'
+
+        Parameters
+        ----------
+        key : str
+            key of 'obj' in storage (<class name>.id)
+        obj : any object in models.base_model module (e.g BaseModel)
+        """
+        return f"{json.dumps(key)}: {json.dumps(obj.to_dict())}"
+
+    def dump(self, f, objects):
+        """Write 'objects' to the file 'f'
+
+        Parameters
+        ----------
+        f : file object
+            file opened for writing in binary mode
+        objects : dict
+            objects by <class name>.id
+        """
+        content = ", ".join(self.fragment(key, obj)
+                            for key, obj in objects.items())
+        f.write(("{" + content + "}").encode())
+
+    def load(self, f):
+        """Return the dictionaries of the objects in the file 'f'
+
+        Parameters
+        ----------
+        f : file object
+            file opened for reading in binary mode
+
+        Returns
+        -------
+        dict
+            dictionaries of the objects (as returned by to_dict()) by
+            <class name>.id
+
+        Raises
+        ------
+        ValueError
+            if the file is not valid JSON (e.g it is truncated)
+        """
+        return json.load(f)
+
+
+class BinarySerializer:
+    """
+    Impliment the binary format of FileStorage (see the module
+    documentation)
+
+    Attributes
+    ----------
+    name : str
+        name of the format
+    extension : str
+        extension of the files in this format
+
+    Methods
+    -------
+    dump(f, objects)
+        Write 'objects' to the file 'f'
+    load(f)
+        Return the dictionaries of the objects in the file 'f'
+    """
+    name = "binary"
+    extension = ".bin"
+
+    def dump(self, f, objects):
+        """Write 'objects' to the file 'f'
+
+        Parameters
+        ----------
+        f : file object
+            file opened for writing in binary mode
+        objects : dict
+            objects by <class name>.id
+        """
+        # Values of the objects by (class name, *attribute names)
+        sections = {}
+        for obj in objects.values():
+            attrs = obj._attributes()
+            shape = (obj.__class__.__name__, *attrs)
+            rows = sections.get(shape)
+            if rows is None:
+                sections[shape] = rows = []
+            rows.append(tuple(attrs.values()))
+        f.write(MAGIC)
+        for (class_name, *names), rows in sections.items():
+            header = json.dumps([class_name, names, len(rows)]).encode()
+            f.write(_HEADER.pack(len(header)) + header)
+            for values in zip(*rows):
+                column_type, data = _encode_column(values)
+                f.write(_COLUMN.pack(column_type, len(data)))
+                f.write(data)
+
+    def load(self, f):
+        """Return the dictionaries of the objects in the file 'f'
+
+        Parameters
+        ----------
+        f : file object
+            file opened for reading in binary mode
+
+        Returns
+        -------
+        dict
+            dictionaries of the objects by <class name>.id, with
+            datetimes as datetime objects
+
+        Raises
+        ------
+        ValueError
+            if the file is not in the binary format or is truncated
+        """
+        data = memoryview(f.read())
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a binary storage file")
+        obj_dicts = {}
+        position = len(MAGIC)
+        while position < len(data):
+            if position + _HEADER.size > len(data):
+                raise ValueError("truncated file")
+            size, = _HEADER.unpack_from(data, position)
+            position += _HEADER.size
+            if position + size > len(data):
+                raise ValueError("truncated file")
+            class_name, names, count = json.loads(
+                bytes(data[position:position + size]))
+            position += size
+            columns = []
+            for name in names:
+                if position + _COLUMN.size > len(data):
+                    raise ValueError("truncated file")
+                column_type, size = _COLUMN.unpack_from(data, position)
+                position += _COLUMN.size
+                if position + size > len(data):
+                    raise ValueError("truncated file")
+                values = _decode_column(column_type,
+                                        data[position:position + size])
+                if len(values) != count:
+                    raise ValueError(f"invalid column {name} of "
+                                     f"{class_name}")
+                columns.append(values)
+                position += size
+            keys = [f"{class_name}.{obj_id}"
+                    for obj_id in columns[names.index("id")]]
+            names.append("__class__")
+            columns.append(repeat(class_name, count))
+            obj_dicts.update(zip(keys, map(dict, map(zip, repeat(names),
+                                                     zip(*columns)))))
+        return obj_dicts
+
+
+FORMATS = {"json": JSONSerializer(), "binary": BinarySerializer()}
+
+
+def format_of(path):
+    """Return the serializer of the files with the extension of 'path'
+    (JSONSerializer for unknown extensions)
+
+    Parameters
+    ----------
+    path : str
+        path of a storage file
+
+    Returns
+    -------
+    JSONSerializer or BinarySerializer
+    """
+    extension = os.path.splitext(path)[1]
+    for serializer in FORMATS.values():
+        if serializer.extension == extension:
+            return serializer
+    return FORMATS["json"]
+
+
+def detect_format(path):
+    """Return the serializer of the existing file 'path' from its
+    first bytes
+
+    Parameters
+    ----------
+    path : str
+        path of a storage file
+
+    Returns
+    -------
+    JSONSerializer or BinarySerializer
+    """
+    with open(path, 'rb') as f:
+        start = f.read(len(MAGIC))
+    return FORMATS["binary" if start == MAGIC else "json"]
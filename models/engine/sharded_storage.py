@@ -0,0 +1,303 @@
+#!/usr/bin/python3
+
+"""
+In this module defines ShardedStorage class and the function loading
+one of its files (load_shard()).
+
+Files (for the storage root file.shards and the JSON format):
+    file.shards/<class name>/<shard>.json : objects of the class whose
+        id falls in the shard <shard> (0 to SHARDS - 1, see shard_of()),
+        in the format of FileStorage.FORMAT ('.bin' for binary)
+    file.shards/meta.json : {"shards": <number of shards by class>},
+        rewritten after every save so other processes know the files
+        changed
+"""
+
+import json
+import multiprocessing
+import os
+import time
+import warnings
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from models.engine.atomic_file import atomic_open
+from models.engine.file_storage import FileStorage
+from models.engine.serializers import FORMATS
+
+
+def shard_of(key, shards):
+    """Return the shard of the object with key 'key'
+
+    Parameters
+    ----------
+    key : str
+        <class name>.id
+    shards : int
+        number of shards by class
+
+    Returns
+    -------
+    tuple
+        (class name, shard number), the same in every process (unlike
+        hash() of a str)
+    """
+    class_name, _, obj_id = key.partition(".")
+    return class_name, zlib.crc32(obj_id.encode()) % shards
+
+
+def load_shard(path, format_name):
+    """Return the dictionaries of the objects in the shard file 'path'
+    (called by the threads or processes of reload())
+
+    Parameters
+    ----------
+    path : str
+        shard file
+    format_name : str
+        format of the file (see FileStorage.FORMAT)
+
+    Returns
+    -------
+    dict
+        dictionaries of the objects (as returned by to_dict()) by key,
+        empty if the file doesn't exist
+
+    Raises
+    ------
+    ValueError
+        if the file is damaged
+    """
+    try:
+        with open(path, 'rb') as f:
+            return FORMATS[format_name].load(f)
+    except FileNotFoundError:
+        return {}
+
+
+class ShardedStorage(FileStorage):
+    """
+    Impliment the storage of objects (users' data) in a directory with
+    a file per class and shard (see the module docstring for the files)
+
+    save() only rewrites the files of the shards holding objects
+    changed or deleted since the last save, and reload() loads the
+    files with a pool of RELOAD_WORKERS threads (or processes). Each
+    file is replaced atomically (see atomic_open), but a save changing
+    several shards is not atomic as a whole.
+
+    Attributes
+    ----------
+    ROOT : str
+        directory of the files (HBNB_STORAGE_ROOT)
+    SHARDS : int
+        number of shards by class of a new directory (an existing
+        directory keeps the number of shards it was created with)
+    RELOAD_WORKERS : int
+        number of threads (or processes) loading the files on reload
+    RELOAD_POOL : str
+        "threads" (default) or "processes" (on platforms where
+        processes can be forked, threads otherwise)
+    __shards : dict (initialized empty)
+        objects by shard: {(<class name>, <shard>): {key: obj}}
+    __states : dict (initialized empty)
+        (inode, size, modification time) of each shard file when it
+        was last read or written by this process
+    __count : int
+        number of shards by class of the directory
+
+    Methods
+    -------
+    _file_lock()
+        Return the lock shared with the other processes
+    _commit()
+        Rewrite the shards holding objects changed or deleted since
+        the last save (called by save(), see FileStorage for group
+        commit and batches)
+    reload()
+        Load every shard file to '__objects'
+    _read_changes()
+        Merge the shard files changed by other processes
+    """
+    ROOT = "file.shards"
+    SHARDS = 8
+    RELOAD_WORKERS = min(8, os.cpu_count() or 1)
+    RELOAD_POOL = "threads"
+    __shards = {}
+    __states = {}
+    __count = None
+
+    def _data_path(self):
+        """Return the path of the file rewritten after every save"""
+        return os.path.join(self.ROOT, "meta.json")
+
+    def _file_lock(self):
+        """Return the lock shared with the other processes using the
+        directory (see FileStorage._file_lock()), created in it"""
+        os.makedirs(self.ROOT, exist_ok=True)
+        return super()._file_lock()
+
+    def __shard_count(self):
+        """Return the number of shards by class of the directory
+        (SHARDS for a new directory)"""
+        if ShardedStorage.__count is None:
+            try:
+                with open(self._data_path()) as f:
+                    ShardedStorage.__count = json.load(f)["shards"]
+            except FileNotFoundError:
+                ShardedStorage.__count = self.SHARDS
+        return self.__count
+
+    def __shard_path(self, shard):
+        """Return the file of the shard 'shard' ((class name, number))
+        """
+        class_name, number = shard
+        return os.path.join(self.ROOT, class_name,
+                            f"{number}{FORMATS[self.FORMAT].extension}")
+
+    def __shard_files(self):
+        """Return the shard files of the directory by shard"""
+        files = {}
+        extension = FORMATS[self.FORMAT].extension
+        try:
+            entries = list(os.scandir(self.ROOT))
+        except FileNotFoundError:
+            return files
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            for file in os.scandir(entry.path):
+                number, ext = os.path.splitext(file.name)
+                if ext == extension and number.isdigit():
+                    files[(entry.name, int(number))] = file.path
+        return files
+
+    @staticmethod
+    def __stat(path):
+        """Return the (inode, size, modification time) of 'path' or
+        None if it doesn't exist"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def _add(self, key, obj):
+        """Set 'obj' in '__objects' (see FileStorage._add()) and in its
+        shard"""
+        super()._add(key, obj)
+        shard = shard_of(key, self.__shard_count())
+        if shard not in self.__shards:
+            self.__shards[shard] = {}
+        self.__shards[shard][key] = obj
+
+    def _remove(self, key):
+        """Remove the object with key 'key' from '__objects' (see
+        FileStorage._remove()) and from its shard"""
+        self.__shards.get(shard_of(key, self.__shard_count()),
+                          {}).pop(key, None)
+        return super()._remove(key)
+
+    def _reset(self):
+        """Forget every stored object without touching the files"""
+        with self.lock.write:
+            super()._reset()
+            self.__shards.clear()
+            self.__states.clear()
+            ShardedStorage.__count = None
+
+    def _commit(self):
+        """Rewrite the shards holding objects changed or deleted since
+        the last save"""
+        with self.lock.write, self._file_lock():
+            if self._file_id() != self._file_state:
+                # Changes saved by other processes are kept
+                self._read_changes()
+            count = self.__shard_count()
+            changed = {shard_of(key, count) for key in
+                       self._take_dirty() | self._take_deleted()}
+            if not changed:
+                return
+            serializer = FORMATS[self.FORMAT]
+            for shard in changed:
+                path = self.__shard_path(shard)
+                objects = self.__shards.get(shard)
+                if objects:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with atomic_open(path, 'wb') as f:
+                        serializer.dump(f, objects.copy())
+                elif os.path.exists(path):
+                    os.remove(path)
+                self.__states[shard] = self.__stat(path)
+            # Only tells other processes that files changed, so it is
+            # not synced to the disk
+            with atomic_open(self._data_path(), fsync=False) as f:
+                json.dump({"shards": count}, f)
+            FileStorage._file_state = self._file_id()
+
+    def __load(self, files):
+        """Return the dictionaries of the objects of the shard files
+        'files' ({shard: path}) by shard, loaded by a pool of
+        RELOAD_WORKERS threads (or processes). Files that can't be decoded
+        are moved aside with a warning."""
+        if self.RELOAD_POOL == "processes" and\
+                "fork" in multiprocessing.get_all_start_methods():
+            pool = ProcessPoolExecutor(
+                self.RELOAD_WORKERS,
+                mp_context=multiprocessing.get_context("fork"))
+        else:
+            pool = ThreadPoolExecutor(self.RELOAD_WORKERS)
+        with pool:
+            futures = {shard: pool.submit(load_shard, path, self.FORMAT)
+                       for shard, path in files.items()}
+        loaded = {}
+        for shard, future in futures.items():
+            try:
+                loaded[shard] = future.result()
+            except ValueError as e:
+                # The file can't be decoded: it is kept aside instead
+                # of being overwritten by the next save
+                path = files[shard]
+                damaged = f"{path}.damaged-{int(time.time())}"
+                os.replace(path, damaged)
+                warnings.warn(f"{path} could not be loaded ({e!r}), "
+                              f"it was moved to {damaged}")
+                loaded[shard] = {}
+        return loaded
+
+    def reload(self):
+        """Load every shard file to '__objects'"""
+        file_lock = self._file_lock()
+        with self.lock.write:
+            if not os.path.isdir(self.ROOT):
+                return
+            file_lock.acquire(shared=True)
+            try:
+                FileStorage._file_state = self._file_id()
+                files = self.__shard_files()
+                loaded = self.__load(files)
+                # Loaded at once, so no object is kept if one of them
+                # can't be built (see _load_dicts())
+                self._load_dicts({key: obj_dict
+                                  for obj_dicts in loaded.values()
+                                  for key, obj_dict in obj_dicts.items()})
+                for shard in loaded:
+                    self.__states[shard] = self.__stat(files[shard])
+            finally:
+                file_lock.release()
+
+    def _read_changes(self):
+        """Merge the shard files changed by other processes since they
+        were last read or written by this process, called while
+        holding 'lock.write' and the file lock"""
+        state = self._file_id()
+        files = self.__shard_files()
+        for shard in self.__states:
+            files.setdefault(shard, self.__shard_path(shard))
+        changed = {shard: path for shard, path in files.items()
+                   if self.__stat(path) != self.__states.get(shard)}
+        for shard, obj_dicts in self.__load(changed).items():
+            self.__states[shard] = self.__stat(changed[shard])
+            removed = [key for key in self.__shards.get(shard, {})
+                       if key not in obj_dicts]
+            self._merge(obj_dicts, removed)
+        FileStorage._file_state = state
@@ -0,0 +1,321 @@
+#!/usr/bin/python3
+
+"""
+In this module defines TextIndex class, an inverted index of the words
+of text attributes used to find the objects matching a query without
+going through every object, and the functions saving and loading the
+indexes of a storage (dump() and load()).
+
+Words (terms) are the sequences of letters, digits and '_' of a text,
+in lower case. A query is made of words:
+    wifi pool       objects holding both words (AND is optional:
+                    wifi AND pool)
+    wifi OR pool    objects holding either word (AND binds first:
+                    a b OR c is (a AND b) OR c)
+    swim*           objects holding a word starting with 'swim'
+Matching objects are ranked by BM25 score: words that are rare in the
+index and frequent in a short text weigh more.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+import heapq
+import json
+import math
+import re
+from models.engine.atomic_file import atomic_open
+
+TERM = re.compile(r"\w+")
+# BM25 parameters: saturation of the frequency of a term (K1) and
+# weight of the length of a text (B)
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    """Return the terms of 'text' (in lower case, in order)"""
+    return TERM.findall(text.lower())
+
+
+def _rank(item):
+    """Return the sort key of a (key, score) result: best score first,
+    then by key"""
+    return -item[1], item[0]
+
+
+class TextIndex:
+    """
+    Impliment an inverted index of the terms of texts by key
+
+    Attributes
+    ----------
+    postings : dict
+        {<term>: {key: number of times the term is in the text}}
+    documents : dict
+        terms of the text of each key, sorted and separated by spaces
+        (each term as many times as it is in the text), to tell
+        whether a text changed
+    __lengths : dict
+        number of terms of the text of each key
+    __length : int
+        number of terms of every text
+    __vocabulary : list
+        sorted terms (None when it must be sorted again), used by
+        prefix queries
+
+    Methods
+    -------
+    put(key, texts)
+        Index the texts of the object with key 'key'
+    remove(key)
+        Remove the object with key 'key'
+    search(query, limit=None)
+        Return the keys of the objects matching 'query', best first
+    to_json()
+        Return the index in the form saved by dump()
+    """
+
+    def __init__(self, saved=None):
+        """
+        Parameters
+        ----------
+        saved : dict (optional)
+            index returned by to_json() (of a saved index)
+        """
+        self.postings = {}
+        self.documents = {}
+        self.__lengths = {}
+        self.__length = 0
+        self.__vocabulary = None
+        if saved is None:
+            return
+        keys = saved["keys"]
+        self.documents = dict(zip(keys, saved["documents"]))
+        self.__lengths = {key: document.count(" ") + 1
+                          for key, document in self.documents.items()}
+        self.__length = sum(self.__lengths.values())
+        key_at = keys.__getitem__
+        self.postings = {term: dict(zip(map(key_at, entries[0::2]),
+                                        entries[1::2]))
+                         for term, entries in saved["postings"].items()}
+
+    def to_json(self):
+        """Return the index as a dictionary of lists and strings:
+        {"keys": [key, ...], "documents": [<document of each key>],
+        "postings": {<term>: [<key number>, <frequency>, ...]}}"""
+        keys = list(self.documents)
+        numbers = {key: number for number, key in enumerate(keys)}
+        postings = {}
+        for term, frequencies in self.postings.items():
+            entries = []
+            for key, frequency in frequencies.items():
+                entries += (numbers[key], frequency)
+            postings[term] = entries
+        return {"keys": keys, "documents": list(self.documents.values()),
+                "postings": postings}
+
+    def put(self, key, texts):
+        """Index the texts of the object with key 'key' (replacing the
+        texts indexed before for it)
+
+        Parameters
+        ----------
+        key : str
+            <class name>.id
+        texts : list
+            values of the text attributes of the object (values that
+            are not str are not indexed)
+
+        Returns
+        -------
+        bool
+            False if the same terms were already indexed for 'key'
+        """
+        terms = [term for text in texts if type(text) is str
+                 for term in tokenize(text)]
+        terms.sort()
+        document = " ".join(terms)
+        if self.documents.get(key, "") == document:
+            return False
+        self.remove(key)
+        if not terms:
+            return True
+        postings = self.postings
+        for term, frequency in Counter(terms).items():
+            keys = postings.get(term)
+            if keys is None:
+                postings[term] = keys = {}
+                self.__vocabulary = None
+            keys[key] = frequency
+        self.documents[key] = document
+        self.__lengths[key] = len(terms)
+        self.__length += len(terms)
+        return True
+
+    def remove(self, key):
+        """Remove the object with key 'key' (if it is indexed)
+
+        Parameters
+        ----------
+        key : str
+            <class name>.id
+        """
+        document = self.documents.pop(key, None)
+        if document is None:
+            return
+        postings = self.postings
+        for term in set(document.split(" ")):
+            keys = postings[term]
+            del keys[key]
+            if not keys:
+                del postings[term]
+                self.__vocabulary = None
+        self.__length -= self.__lengths.pop(key)
+
+    def __expand(self, prefix):
+        """Return the terms starting with 'prefix'"""
+        if self.__vocabulary is None:
+            self.__vocabulary = sorted(self.postings)
+        vocabulary = self.__vocabulary
+        terms = []
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            terms.append(vocabulary[i])
+            i += 1
+        return terms
+
+    def __match(self, word):
+        """Return the keys of the objects matching the query word
+        'word' and the terms it matched
+
+        Returns
+        -------
+        tuple
+            (set of keys, list of terms)
+        """
+        prefix = word.endswith("*")
+        terms = tokenize(word)
+        if not terms:
+            # Only punctuation: matches nothing
+            return set(), []
+        keys = None
+        matched = []
+        for i, term in enumerate(terms):
+            if prefix and i == len(terms) - 1:
+                expanded = self.__expand(term)
+            else:
+                expanded = [term] if term in self.postings else []
+            found = set()
+            for expanded_term in expanded:
+                found.update(self.postings[expanded_term])
+            keys = found if keys is None else keys & found
+            matched.extend(expanded)
+        return keys, matched
+
+    def search(self, query, limit=None):
+        """Return the keys of the objects matching 'query' (see the
+        module docstring), best first
+
+        Parameters
+        ----------
+        query : str
+            words, with AND and OR
+        limit : int (optional)
+            maximum number of keys returned
+
+        Returns
+        -------
+        list
+            (key, score) of the matching objects, by decreasing score
+            (then by key)
+        """
+        groups = [[]]
+        for word in query.split():
+            if word == "OR":
+                groups.append([])
+            elif word != "AND":
+                groups[-1].append(word)
+        found = set()
+        terms = set()
+        for words in groups:
+            if not words:
+                continue
+            keys = None
+            for word in words:
+                word_keys, matched = self.__match(word)
+                keys = word_keys if keys is None else keys & word_keys
+                terms.update(matched)
+            found |= keys
+        if not found:
+            return []
+        count = len(self.documents)
+        average = self.__length / count
+        lengths = self.__lengths
+        scores = dict.fromkeys(found, 0.0)
+        for term in terms:
+            keys = self.postings[term]
+            idf = math.log(1 + (count - len(keys) + 0.5) /
+                           (len(keys) + 0.5))
+            for key in (found.intersection(keys) if len(keys) > len(found)
+                        else [key for key in keys if key in found]):
+                frequency = keys[key]
+                scores[key] += idf * frequency * (K1 + 1) / (
+                    frequency + K1 * (1 - B + B * lengths[key] / average))
+        if limit is not None and limit < len(scores):
+            return heapq.nsmallest(limit, scores.items(), key=_rank)
+        return sorted(scores.items(), key=_rank)
+
+
+def index_path(path):
+    """Return the path of the text indexes of the storage file 'path'"""
+    return path + ".text"
+
+
+def dump(path, state, indexes):
+    """Save the text indexes of a storage next to its file
+
+    Parameters
+    ----------
+    path : str
+        file the objects are saved in
+    state : tuple
+        state of the file the indexes match (see
+        FileStorage._file_id(), ex: (inode, size, modification time))
+    indexes : dict
+        TextIndex by class name
+    """
+    # The indexes can be rebuilt from the objects, they are not synced
+    # to disk
+    with atomic_open(index_path(path), fsync=False) as f:
+        f.write(json.dumps({"state": list(state)}) + "\n")
+        json.dump({class_name: index.to_json()
+                   for class_name, index in indexes.items()}, f)
+
+
+def load(path, state):
+    """Return the text indexes saved for the storage file 'path', or
+    None if there are none or they don't match the file anymore
+
+    Parameters
+    ----------
+    path : str
+        file the objects are saved in
+    state : tuple
+        state of the file as read by the storage (see
+        FileStorage._file_state)
+
+    Returns
+    -------
+    dict
+        TextIndex by class name
+    """
+    try:
+        with open(index_path(path)) as f:
+            header = json.loads(f.readline())
+            if state is None or header["state"] != list(state):
+                return None
+            saved = json.load(f)
+        return {class_name: TextIndex(index)
+                for class_name, index in saved.items()}
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return None
@@ -0,0 +1,504 @@
+#!/usr/bin/python3
+
+"""
+In this module defines WALStorage class and the functions reading its
+files:
+    list_files(path) : snapshots and archived logs of a log file
+    read_snapshot(file) : read a snapshot
+    replay(f, live, removed, after=0, until=None) : apply the records
+        of a log file
+    state_at(path, at=None) : objects as they were at a given time
+
+Files (for the log file file.wal):
+    file.wal : write-ahead log, one JSON record per change (one per
+        line) saved since the latest snapshot
+        {"lsn": <n>, "at": <time>, "op": "put", "key": <class name>.id,
+         "obj": <obj.to_dict()>}
+        {"lsn": <n>, "at": <time>, "op": "del", "key": <class name>.id}
+        'lsn' (log sequence number) increases by 1 with each record
+        and 'at' is the time of the save in ISO format
+    file.snapshot.<lsn>.json : snapshot of every object as they were
+        after the record <lsn>
+        {"lsn": <lsn>, "at": <time>, "objects": {<key>: <dict>, ...}}
+    file.wal.<lsn> : log archived when the snapshot <lsn> was taken
+        (records up to <lsn>)
+
+The objects are restored as they were at a given time with
+WALStorage.restore() (see models.engine.restore).
+"""
+
+import json
+import os
+import re
+import warnings
+from datetime import datetime
+from models.engine.atomic_file import atomic_open
+from models.engine.file_storage import FileStorage
+from models.engine.serializers import JSONSerializer
+
+
+def _timestamp(at):
+    """Return the datetime (or ISO format str) 'at' in the format of
+    the 'at' field of records and snapshots (so they can be compared
+    as str)"""
+    if not isinstance(at, datetime):
+        at = datetime.fromisoformat(at)
+    return at.isoformat(timespec="microseconds")
+
+
+def snapshot_path(path, lsn):
+    """Return the path of the snapshot 'lsn' of the log file 'path'"""
+    return f"{os.path.splitext(path)[0]}.snapshot.{lsn:012d}.json"
+
+
+def segment_path(path, lsn):
+    """Return the path of the log file 'path' archived when the
+    snapshot 'lsn' was taken"""
+    return f"{path}.{lsn:012d}"
+
+
+def list_files(path):
+    """Return the snapshots and the archived logs of the log file 'path'
+
+    Parameters
+    ----------
+    path : str
+        log file (ex: file.wal)
+
+    Returns
+    -------
+    tuple
+        (snapshots, archived logs), lists of (lsn, file path) sorted
+        by lsn
+    """
+    directory = os.path.dirname(path)
+    name = os.path.basename(path)
+    patterns = (re.compile(re.escape(os.path.splitext(name)[0]) +
+                           r"\.snapshot\.(\d+)\.json$"),
+                re.compile(re.escape(name) + r"\.(\d+)$"))
+    files = ([], [])
+    for entry in os.listdir(directory or "."):
+        for pattern, found in zip(patterns, files):
+            match = pattern.match(entry)
+            if match:
+                found.append((int(match.group(1)),
+                              os.path.join(directory, entry)))
+    return sorted(files[0]), sorted(files[1])
+
+
+def read_snapshot(file):
+    """Return the snapshot 'file'
+
+    Returns
+    -------
+    dict
+        {"lsn": int, "at": str, "objects": {<key>: <dict>, ...}}
+
+    Raises
+    ------
+    ValueError
+        if the snapshot is damaged
+    """
+    with open(file, 'rb') as f:
+        snapshot = json.load(f)
+    if not isinstance(snapshot, dict) or\
+            not {"lsn", "at", "objects"}.issubset(snapshot):
+        raise ValueError(f"{file} is not a snapshot")
+    return snapshot
+
+
+def replay(f, live, removed, after=0, until=None):
+    """Apply the records of the log file 'f', from its position, to
+    'live' and 'removed'
+
+    Parameters
+    ----------
+    f : file object
+        log file opened in binary mode
+    live : dict
+        dictionaries of the objects by key, updated by the records
+    removed : set
+        keys of the objects deleted by the records
+    after : int (optional)
+        records up to the lsn 'after' are skipped (already applied)
+    until : str (optional)
+        time (see _timestamp()) after which records are skipped
+
+    Returns
+    -------
+    tuple
+        (lsn of the first record after 'after' or None, lsn of the last
+        one or None, number of records after 'after', True if a
+        damaged record was skipped)
+    """
+    first = last = None
+    records = 0
+    damaged = False
+    for line in f:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            # A partially written record (e.g the process was killed
+            # while appending) is skipped
+            damaged = True
+            continue
+        lsn = record["lsn"]
+        if lsn <= after:
+            continue
+        if first is None:
+            first = lsn
+        last = lsn
+        records += 1
+        if until is not None and record["at"] > until:
+            continue
+        key = record["key"]
+        if record["op"] == "put":
+            live[key] = record["obj"]
+            removed.discard(key)
+        elif record["op"] == "del":
+            live.pop(key, None)
+            removed.add(key)
+    return first, last, records, damaged
+
+
+def _latest_snapshot(path, until=None):
+    """Return the (lsn, dictionaries of the objects) of the latest
+    snapshot of the log file 'path' taken at or before 'until' (a time,
+    see _timestamp()), or (0, {}) if there is none. Damaged snapshots
+    are skipped with a warning."""
+    for lsn, file in reversed(list_files(path)[0]):
+        try:
+            snapshot = read_snapshot(file)
+        except (OSError, ValueError) as e:
+            warnings.warn(f"{file} could not be loaded ({e!r})")
+            continue
+        if until is None or snapshot["at"] <= until:
+            return snapshot["lsn"], snapshot["objects"]
+    return 0, {}
+
+
+def _log_files(path, after):
+    """Return the log files holding the records after the lsn 'after',
+    in order: the archived logs, then 'path'"""
+    return [file for lsn, file in list_files(path)[1]
+            if lsn > after] + [path]
+
+
+def state_at(path, at=None):
+    """Return the objects of the log file 'path' as they were at 'at':
+    the latest snapshot taken before, and the records saved between
+    the snapshot and 'at'
+
+    Parameters
+    ----------
+    path : str
+        log file (ex: file.wal)
+    at : datetime.datetime or str (optional)
+        time (ISO format if str), the latest objects if None
+
+    Returns
+    -------
+    dict
+        dictionaries of the objects (as returned by to_dict()) by key
+
+    Raises
+    ------
+    ValueError
+        if the snapshots and logs needed were removed (see
+        WALStorage.KEEP_SNAPSHOTS)
+    """
+    until = None if at is None else _timestamp(at)
+    lsn, live = _latest_snapshot(path, until)
+    removed = set()
+    first = None
+    for file in _log_files(path, lsn):
+        try:
+            with open(file, 'rb') as f:
+                found = replay(f, live, removed, lsn, until)[0]
+        except FileNotFoundError:
+            continue
+        if first is None:
+            first = found
+    if first is not None and first != lsn + 1:
+        raise ValueError(f"the changes saved before {at} are not kept "
+                         f"(records {lsn + 1} to {first - 1} missing)")
+    return live
+
+
+class WALStorage(FileStorage):
+    """
+    Impliment the storage of objects (users' data) in snapshots and a
+    write-ahead log (see the module docstring for the files).
+
+    Every save appends one record per change to the log. Once the log
+    holds SNAPSHOT_RECORDS records, a snapshot of every object is
+    written and a new log is started, so reload() only reads the
+    latest snapshot and the records saved after it, whatever the
+    number of changes saved before. The previous snapshots and logs
+    are kept (the KEEP_SNAPSHOTS latest snapshots), so the objects can
+    be restored as they were at any time since the oldest snapshot
+    kept (or since the first save while no snapshot was removed).
+
+    Attributes
+    ----------
+    __file_path : str (private class attribute)
+        log file where changes to objects are appended
+    __lsn : int
+        lsn of the last record written or read by this process
+    __snapshot_lsn : int
+        lsn of the latest snapshot
+    __records : int
+        number of records in the log file since the latest snapshot
+    __offset : int
+        size of the log file when it was last read or written by this
+        process (the records appended after it by other processes are
+        replayed by _read_changes())
+    SNAPSHOT_RECORDS : int
+        a snapshot is taken once the log holds this number of records
+    KEEP_SNAPSHOTS : int
+        number of snapshots kept (with the logs archived after the
+        oldest of them), all of them if 0
+
+    Methods
+    -------
+    _commit()
+        Append a record for every object changed or deleted since the
+        last save (called by save(), see FileStorage for group commit
+        and batches)
+    reload()
+        Load the latest snapshot and replay the log after it
+    _read_changes()
+        Replay the records appended by other processes
+    checkpoint()
+        Take a snapshot of every object and start a new log
+    restore(at)
+        Restore the objects as they were at 'at'
+    """
+    __file_path = "file.wal"
+    __lsn = 0
+    __snapshot_lsn = 0
+    __records = 0
+    __offset = 0
+    SNAPSHOT_RECORDS = 10000
+    KEEP_SNAPSHOTS = 10
+
+    def _data_path(self):
+        """Return the path of the log file"""
+        return self.__file_path
+
+    def _commit(self):
+        """Append a record for every object changed or deleted since
+        the last save, and take a snapshot once the log is long enough
+        """
+        with self.lock.write, self._file_lock():
+            if self._file_id() != self._file_state:
+                # Records appended by other processes are replayed
+                # first so their objects are not overwritten
+                self._read_changes()
+            self.__append_changes()
+            if self.__records >= self.SNAPSHOT_RECORDS:
+                self.checkpoint()
+
+    def __append_changes(self):
+        """Append a record for every object changed or deleted since
+        the last save to the log file (synced to the disk)"""
+        objects = self.all()
+        at = _timestamp(datetime.now())
+        records = [("del", key, None) for key in self._take_deleted()]
+        records.extend(("put", key, objects[key].to_dict())
+                       for key in self._take_dirty() if key in objects)
+        if not records:
+            return
+        lines = []
+        for op, key, obj_dict in records:
+            WALStorage.__lsn += 1
+            record = {"lsn": self.__lsn, "at": at, "op": op, "key": key}
+            if obj_dict is not None:
+                record["obj"] = obj_dict
+            lines.append(json.dumps(record) + "\n")
+        with open(self.__file_path, 'a') as f:
+            f.write("".join(lines))
+            # The records are on the disk before save() returns
+            f.flush()
+            os.fsync(f.fileno())
+        WALStorage.__records += len(records)
+        self.__written()
+
+    def __written(self):
+        """Record the log file as read up to its end by this process
+        (after it was written)"""
+        state = self._file_id()
+        WALStorage.__offset = state[1] if state else 0
+        FileStorage._file_state = state
+
+    def reload(self):
+        """Load the latest snapshot and replay the records of the log
+        saved after it"""
+        file_lock = self._file_lock()
+        with self.lock.write:
+            file_lock.acquire(shared=True)
+            try:
+                damaged = self.__recover(merge=False)
+            finally:
+                file_lock.release()
+        if damaged:
+            # Start a new log so new records are not appended to a
+            # partial line
+            self.checkpoint()
+
+    def __recover(self, merge):
+        """Read the latest snapshot and the records saved after it,
+        called while holding 'lock.write' and the file lock
+
+        Parameters
+        ----------
+        merge : bool
+            if True, the objects are merged into '__objects' (see
+            FileStorage._merge()), else they replace them
+
+        Returns
+        -------
+        bool
+            True if a damaged record was skipped in the log file
+        """
+        state = self._file_id()
+        path = self.__file_path
+        lsn, live = _latest_snapshot(path)
+        WALStorage.__snapshot_lsn = WALStorage.__lsn = lsn
+        WALStorage.__records = WALStorage.__offset = 0
+        damaged = False
+        for file in _log_files(path, lsn):
+            try:
+                with open(file, 'rb') as f:
+                    first, last, records, partial = replay(
+                        f, live, set(), lsn)
+                    offset = f.tell()
+            except FileNotFoundError:
+                continue
+            if first is not None and first != self.__lsn + 1:
+                warnings.warn(f"records {self.__lsn + 1} to {first - 1} "
+                              f"of {path} are missing")
+            if last is not None:
+                WALStorage.__lsn = last
+            WALStorage.__records += records
+            if file == path:
+                WALStorage.__offset = offset
+                damaged = partial
+        FileStorage._file_state = state
+        if merge:
+            self._merge(live, complete=True)
+        else:
+            self._load_dicts(live)
+        return damaged
+
+    def _read_changes(self):
+        """Replay the records appended by other processes since the log
+        file was last read or written by this process (the latest
+        snapshot and the new log if another process took a snapshot in
+        the meantime), called while holding 'lock.write' and the file
+        lock"""
+        state = self._file_id()
+        previous = self._file_state
+        # A new log is a new file
+        if state is None or previous is None or\
+                previous[0] != state[0] or state[1] < self.__offset:
+            self.__recover(merge=True)
+            return
+        live = {}
+        removed = set()
+        with open(self.__file_path, 'rb') as f:
+            f.seek(self.__offset)
+            _, last, records, _ = replay(f, live, removed, self.__lsn)
+            WALStorage.__offset = f.tell()
+        if last is not None:
+            WALStorage.__lsn = last
+        WALStorage.__records += records
+        FileStorage._file_state = state
+        self._merge(live, removed)
+
+    def checkpoint(self):
+        """Take a snapshot of every object (the changes not saved yet
+        are saved first) and start a new log, the previous one being
+        archived. The snapshots (and logs) older than the
+        KEEP_SNAPSHOTS latest ones are removed."""
+        with self.lock.write, self._file_lock():
+            if self._file_id() != self._file_state:
+                self._read_changes()
+            self.__append_changes()
+            path = self.__file_path
+            lsn = self.__lsn
+            if lsn != self.__snapshot_lsn:
+                objects = self.all()
+                with atomic_open(snapshot_path(path, lsn)) as f:
+                    f.write(f'{{"lsn": {lsn}, "at": '
+                            f'"{_timestamp(datetime.now())}", '
+                            f'"objects": {{')
+                    f.write(", ".join(JSONSerializer.fragment(key, obj)
+                                      for key, obj in objects.items()))
+                    f.write("}}")
+                # The records up to 'lsn' are in the snapshot, a crash
+                # before the log is archived only leaves them replayed
+                # for nothing
+                if os.path.exists(path):
+                    os.replace(path, segment_path(path, lsn))
+                WALStorage.__snapshot_lsn = lsn
+            open(path, 'a').close()
+            WALStorage.__records = 0
+            self.__written()
+            self.__prune()
+
+    def __prune(self):
+        """Remove the snapshots older than the KEEP_SNAPSHOTS latest
+        ones, and the logs archived before the oldest one kept"""
+        snapshots, segments = list_files(self.__file_path)
+        if not self.KEEP_SNAPSHOTS or len(snapshots) <= self.KEEP_SNAPSHOTS:
+            return
+        oldest = snapshots[-self.KEEP_SNAPSHOTS][0]
+        for _, file in snapshots[:-self.KEEP_SNAPSHOTS]:
+            os.remove(file)
+        for lsn, file in segments:
+            if lsn <= oldest:
+                os.remove(file)
+
+    def restore(self, at):
+        """Restore the objects as they were at 'at'. The restore is
+        saved as new changes, so it can be undone by restoring the
+        objects as they were before it.
+
+        Parameters
+        ----------
+        at : datetime.datetime or str
+            time (ISO format if str)
+
+        Returns
+        -------
+        int
+            number of objects changed, created or deleted
+
+        Raises
+        ------
+        ValueError
+            if the snapshots and logs needed were removed (see
+            KEEP_SNAPSHOTS)
+        """
+        classes = self.classes()
+        with self.lock.write, self._file_lock():
+            if self._file_id() != self._file_state:
+                self._read_changes()
+            obj_dicts = state_at(self.__file_path, at)
+            objects = self.all()
+            changes = 0
+            self.begin()
+            try:
+                for key in [key for key in objects if key not in obj_dicts]:
+                    self.delete(key)
+                    changes += 1
+                for key, obj_dict in obj_dicts.items():
+                    obj = objects.get(key)
+                    if obj is None or obj.to_dict() != obj_dict:
+                        cls = classes[obj_dict["__class__"]]
+                        self.new(cls.from_dict(obj_dict))
+                        changes += 1
+            finally:
+                self.commit()
+        return changes
@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the HBNBServer class: the commands of the
+console (see console.HBNBCommand) run for many clients connected over
+TCP or a Unix socket, on the storage of the server shared by all of
+them.
+
+Usage: ./server.py [<host>:<port> | <path of a Unix socket>]
+    (default: 127.0.0.1:5000)
+
+Protocol: a client sends commands, one per line, as typed in the
+console ('create User', 'User.all()', ...). It can send several
+commands without waiting for their responses (pipelining). Each command
+gets a response, in the order of the commands: a line with the size in
+bytes of the output of the command, then the output (empty for a
+command printing nothing). 'quit' (or the end of the input) closes the
+connection, as does a line longer than MAX_LINE bytes.
+
+'begin' and 'commit' batch the changes of the commands of one client
+(see storage.begin()) only while they run: the batch is committed once
+the commands received together have run, before the commands of other
+clients, and opened again for the next commands of the client.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+import io
+import os
+import re
+import signal
+import sys
+from console import HBNBCommand
+import models
+
+DEFAULT_ADDRESS = "127.0.0.1:5000"
+# <host>:<port> (anything else is the path of a Unix socket)
+TCP_ADDRESS = re.compile(r"^(.*):(\d+)$")
+
+
+class HBNBServer:
+    """
+    Impliment a server running the console commands of its clients
+
+    The connections are served by an asyncio event loop, and the
+    commands of every client run one at a time on a single thread, so
+    the storage has a single writer and each command sees the changes
+    of the previous ones (like in the console). Commands already
+    received from a client (pipelined) are run together, and their
+    responses are sent at once.
+
+    Attributes
+    ----------
+    address : str
+        <host>:<port> or path of a Unix socket
+    READ_SIZE : int
+        maximum number of bytes read from a client at once
+    MAX_LINE : int
+        maximum size in bytes of a command (the client is disconnected
+        past it)
+    __commands : ThreadPoolExecutor
+        the thread running the commands
+    __server : asyncio.Server
+        the listening server (None until start() is called)
+
+    Methods
+    -------
+    start()
+        Start listening on 'address'
+    serve_forever()
+        Start listening and serve the clients until cancelled
+    close()
+        Stop listening and remove the Unix socket
+    handle(reader, writer)
+        Serve one client until it quits or disconnects
+    run(console, lines, batches)
+        Run commands on the console of a client and return their
+        outputs
+    """
+    READ_SIZE = 1 << 16
+    MAX_LINE = 1 << 20
+
+    def __init__(self, address=DEFAULT_ADDRESS):
+        """Initialize the server (it listens once started)
+
+        Parameters
+        ----------
+        address : str (optional)
+            <host>:<port> or path of a Unix socket
+        """
+        self.address = address
+        self.__commands = ThreadPoolExecutor(
+            1, thread_name_prefix="hbnb-commands")
+        self.__server = None
+
+    def __unix_path(self):
+        """Return the path of the Unix socket, or None for TCP"""
+        return None if TCP_ADDRESS.match(self.address) else self.address
+
+    async def start(self):
+        """Start listening on 'address'"""
+        path = self.__unix_path()
+        if path is None:
+            host, port = TCP_ADDRESS.match(self.address).groups()
+            self.__server = await asyncio.start_server(
+                self.handle, host or None, int(port))
+        else:
+            if os.path.exists(path):
+                # Left by a server that did not stop cleanly
+                os.remove(path)
+            self.__server = await asyncio.start_unix_server(
+                self.handle, path)
+
+    async def serve_forever(self):
+        """Start listening and serve the clients until cancelled"""
+        await self.start()
+        try:
+            async with self.__server:
+                await self.__server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop listening and remove the Unix socket"""
+        if self.__server is not None:
+            self.__server.close()
+        path = self.__unix_path()
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+    async def handle(self, reader, writer):
+        """Serve one client until it quits or disconnects
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            commands of the client
+        writer : asyncio.StreamWriter
+            responses to the client
+        """
+        loop = asyncio.get_running_loop()
+        console = HBNBCommand()
+        # Batches started by the client (begin) and not ended (commit)
+        batches = [0]
+        pending = b""
+        stop = False
+        try:
+            while not stop:
+                data = await reader.read(self.READ_SIZE)
+                if not data:
+                    break
+                *lines, pending = (pending + data).split(b"\n")
+                if len(pending) > self.MAX_LINE:
+                    break
+                if not lines:
+                    continue
+                lines = [line.decode(errors="replace").rstrip("\r")
+                         for line in lines]
+                outputs, stop = await loop.run_in_executor(
+                    self.__commands, self.run, console, lines, batches)
+                for output in outputs:
+                    output = output.encode()
+                    writer.write(b"%d\n%s" % (len(output), output))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def run(self, console, lines, batches=None):
+        """Run commands on the console of a client and return their
+        outputs (called by the command thread)
+
+        Parameters
+        ----------
+        console : HBNBCommand
+            console of the client
+        lines : list
+            commands, one per line
+        batches : list (optional)
+            [number of batches started by the client], updated by the
+            begin and commit commands. The batches are opened again
+            before the commands and committed after them: they are
+            shared by every client (see storage.begin()), so they must
+            not defer the changes of the other clients.
+
+        Returns
+        -------
+        tuple
+            (outputs of the commands run, True if a command ended the
+            connection)
+        """
+        outputs = []
+        for _ in range(batches[0] if batches else 0):
+            models.storage.begin()
+        try:
+            for line in lines:
+                output = io.StringIO()
+                # help writes to the stdout of the console
+                console.stdout = output
+                with redirect_stdout(output):
+                    command = console.parseline(line)[0]
+                    try:
+                        stop = console.onecmd(console.precmd(line))
+                    except Exception as e:
+                        # An error ends the console, not the server
+                        print(f"** {e!r} **")
+                        stop = False
+                if batches is not None:
+                    if command == "begin":
+                        batches[0] += 1
+                    elif command == "commit" and batches[0]:
+                        batches[0] -= 1
+                outputs.append(output.getvalue())
+                if stop:
+                    return outputs, True
+            return outputs, False
+        finally:
+            for _ in range(batches[0] if batches else 0):
+                models.storage.commit()
+
+
+if __name__ == "__main__":
+    server = HBNBServer(sys.argv[1] if len(sys.argv) > 1
+                        else DEFAULT_ADDRESS)
+    print(f"Serving HBNB on {server.address}", file=sys.stderr)
+    # Stopped (kill) like with Ctrl+c, so the Unix socket is removed
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+
+"""
+In this module defines unittest cases for the
+<class name>.update(...), stats and profile commands of console
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+CONSOLE = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "console.py")
+
+
+def console(directory, *lines):
+    """Run the console in the directory 'directory' with the commands
+    'lines' and return its output (without the intro and prompts)"""
+    result = subprocess.run(
+        [sys.executable, CONSOLE], cwd=directory,
+        input="\n".join(lines) + "\n", capture_output=True,
+        text=True, check=True)
+    return result.stdout.replace("(hbnb) ", "").split("\n", 1)[1]
+
+
+class TestDotUpdate(unittest.TestCase):
+    """Impliment unittest cases for <class name>.update(...)"""
+
+    def setUp(self):
+        """Create a User in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.id = self.console("create User").strip()
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp.cleanup()
+
+    def console(self, *lines):
+        """Run the console with the commands 'lines' and return its
+        output"""
+        return console(self.tmp.name, *lines)
+
+    def test_unknown_syntax(self):
+        """Test that arguments that do not parse print the unknown
+        syntax message and do not update the instance"""
+        commands = [f'User.update({self.id} first_name "Betty")',
+                    f'User.update({self.id} {{"first_name": "Betty"}})',
+                    f'User.update({self.id}, first name, "Betty")',
+                    f'User.update({self.id}, "first_name" "Betty")',
+                    f'User.update({self.id}, "first_name", Betty Holberton)',
+                    f'User.update({self.id}, {{"first_name": "Betty")']
+        for command in commands:
+            with self.subTest(command=command):
+                self.assertEqual(self.console(command),
+                                 f"*** Unknown syntax: {command}\n")
+        self.assertNotIn("Betty", self.console(f"show User {self.id}"))
+
+    def test_update(self):
+        """Test that arguments that parse update the instance"""
+        output = self.console(
+            f'User.update("{self.id}", "first_name", "Betty Holberton")',
+            f'User.update({self.id}, {{"age": 30, "email": "b@h.io"}})',
+            f'User.update({self.id}, last_name, Holberton)',
+            f"show User {self.id}")
+        self.assertNotIn("***", output)
+        for text in ["'first_name': 'Betty Holberton'", "'age': 30",
+                     "'email': 'b@h.io'", "'last_name': 'Holberton'"]:
+            self.assertIn(text, output)
+
+
+class TestStats(unittest.TestCase):
+    """Impliment unittest cases for the stats command"""
+
+    def test_dump(self):
+        """Test that stats dump writes the recorded commands"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = console(tmp, "stats", "stats on", "create User",
+                             "User.count()", "stats dump stats.json",
+                             "stats off")
+            self.assertTrue(output.startswith(
+                "** metrics are off (stats on) **\n"))
+            with open(os.path.join(tmp, "stats.json")) as f:
+                stats = json.load(f)
+            self.assertEqual(stats["console.create"]["count"], 1)
+            self.assertEqual(stats["console.User.count()"]["count"], 1)
+
+    def test_dump_error(self):
+        """Test that a file that can't be written prints an error"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = console(tmp, "stats on", "stats dump missing/x.json",
+                             "stats dump", "create User")
+            self.assertEqual(output.split("\n")[:2],
+                             ["** can't write missing/x.json **",
+                              "** invalid arguments **"])
+
+
+class TestProfile(unittest.TestCase):
+    """Impliment unittest cases for the profile command"""
+
+    def test_profile(self):
+        """Test that profile off prints the report and writes the
+        profile"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = console(tmp, "profile off", "profile on",
+                             "create User", "profile off profile.out")
+            self.assertTrue(output.startswith("** profile is off **\n"))
+            self.assertIn("Memory allocated by line:", output)
+            self.assertTrue(os.path.getsize(
+                os.path.join(tmp, "profile.out")))
+
+    def test_profile_error(self):
+        """Test that a file that can't be written prints an error after
+        the report, and the profile mode is stopped"""
+        with tempfile.TemporaryDirectory() as tmp:
+            output = console(tmp, "profile on", "create User",
+                             "profile off missing/profile.out",
+                             "profile off")
+            self.assertIn("Memory allocated by line:", output)
+            self.assertTrue(output.endswith(
+                "** can't write missing/profile.out **\n"
+                "** profile is off **\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+
+"""
+In this module defines run(), running code in a new process so each
+test has its own storage (and file.json in a temporary directory).
+
+The tests importing models in this process (ex: models.engine.columns)
+run in a temporary directory too, so the storage they load and its
+lock file are not the ones of the repository.
+"""
+
+import atexit
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))))
+WORKDIR = tempfile.mkdtemp()
+os.chdir(WORKDIR)
+atexit.register(shutil.rmtree, WORKDIR, True)
+
+
+def run(script, cwd, check=True, **env):
+    """Run the Python code 'script' in a new process in the directory
+    'cwd', with the environment variables 'env', and return its output
+
+    Raises
+    ------
+    AssertionError
+        if the process fails (with its error output) and 'check' is
+        True
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys\nsys.path.insert(0, {REPO!r})\n"
+         + script], cwd=cwd, env={**os.environ, **env},
+        capture_output=True, text=True)
+    if check and result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return result.stdout
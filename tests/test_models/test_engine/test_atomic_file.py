@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of models.engine.atomic_file and of
+the storage file surviving a process killed while writing it
+"""
+
+import glob
+import os
+import tempfile
+import unittest
+from models.engine.atomic_file import atomic_open
+from tests.test_models.test_engine import run
+
+# Replaces atomic_open() in models.engine.file_storage by a version
+# killing the process once half of the new content is written
+KILLED = """
+import os
+import signal
+from contextlib import contextmanager
+import models.engine.file_storage as file_storage
+from models.engine.atomic_file import atomic_open
+
+
+class Killed:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, data):
+        self.f.write(data[:len(data) // 2])
+        self.f.flush()
+        os.kill(os.getpid(), signal.SIGKILL)
+
+
+@contextmanager
+def killed_open(path, mode='w', fsync=True):
+    with atomic_open(path, mode, fsync) as f:
+        yield Killed(f)
+
+
+file_storage.atomic_open = killed_open
+"""
+
+SAVE = """
+from models import storage
+from models.user import User
+for i in range({count}):
+    User().email = "user{{}}@hbnb.io".format(i)
+storage.save()
+"""
+
+COUNT = """
+import warnings
+warnings.simplefilter("error")
+from models import storage
+print(storage.count())
+"""
+
+
+class TestAtomicOpen(unittest.TestCase):
+    """Tests of atomic_open()"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "data.txt")
+        with open(self.path, "w") as f:
+            f.write("old")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read(self):
+        """Return the content of the file"""
+        with open(self.path) as f:
+            return f.read()
+
+    def test_replace(self):
+        """The file is replaced once the block ends"""
+        with atomic_open(self.path) as f:
+            f.write("new")
+            self.assertEqual(self.read(), "old")
+        self.assertEqual(self.read(), "new")
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_error(self):
+        """The file is kept if the block raises an exception"""
+        with self.assertRaises(RuntimeError):
+            with atomic_open(self.path, "wb") as f:
+                f.write(b"partial")
+                raise RuntimeError("interrupted")
+        self.assertEqual(self.read(), "old")
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_killed(self):
+        """The file is kept if the process is killed while writing"""
+        run(f"from models.engine.atomic_file import atomic_open\n"
+            f"import os\n"
+            f"import signal\n"
+            f"with atomic_open({self.path!r}) as f:\n"
+            f"    f.write('partial')\n"
+            f"    f.flush()\n"
+            f"    os.kill(os.getpid(), signal.SIGKILL)\n",
+            self.directory.name, check=False)
+        self.assertEqual(self.read(), "old")
+
+
+class TestKilledSave(unittest.TestCase):
+    """Tests of the storage file when the process is killed while
+    saving"""
+
+    def check(self, **env):
+        """Check a save killed half way leaves the previous file,
+        with the environment variables 'env'"""
+        with tempfile.TemporaryDirectory() as directory:
+            run(SAVE.format(count=100), directory, **env)
+            run(KILLED + SAVE.format(count=10), directory, check=False,
+                **env)
+            self.assertEqual(run(COUNT, directory, **env), "100\n")
+            self.assertEqual(glob.glob(os.path.join(directory,
+                                                    "*.damaged-*")), [])
+
+    def test_json(self):
+        """file.json is kept"""
+        self.check()
+
+    def test_binary(self):
+        """file.bin is kept"""
+        self.check(HBNB_STORAGE_FORMAT="binary")
+
+    def test_group_commit(self):
+        """file.json is kept when the saves are grouped"""
+        self.check(HBNB_GROUP_COMMIT_SIZE="5")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of models.engine.columns: the filters
+of ColumnStore.where() with NumPy and without it (pure Python)
+"""
+
+import random
+import unittest
+from models.engine import columns
+from models.engine.columns import OPERATORS, ColumnStore
+
+
+class Row:
+    """Object holding the values of a row"""
+
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class TestWhere(unittest.TestCase):
+    """Tests of ColumnStore.where()"""
+
+    VALUES = (0, 1, 2, 2.5, 3, -1, None, "2", float("inf"))
+
+    def setUp(self):
+        self.numpy = columns.numpy
+        rng = random.Random(0)
+        self.store = ColumnStore(("rooms", "price"))
+        self.objects = {}
+        for i in range(300):
+            key = f"Place.{i}"
+            attrs = {"rooms": rng.choice(self.VALUES),
+                     "price": rng.choice(self.VALUES)}
+            if i % 7 == 0:
+                # Attribute not set
+                del attrs["price"]
+            self.objects[key] = Row(**attrs)
+            self.store.put(key, self.objects[key])
+        # Deleted rows, some of them reused
+        for i in range(0, 300, 5):
+            self.store.remove(f"Place.{i}")
+            del self.objects[f"Place.{i}"]
+        for i in range(300, 320):
+            key = f"Place.{i}"
+            self.objects[key] = Row(rooms=i % 4, price=2)
+            self.store.put(key, self.objects[key])
+        self.objects["Place.1"].rooms = 3
+        self.store.update("Place.1", self.objects["Place.1"], "rooms")
+        self.conditions = [[(attr, op, value)]
+                           for attr in ("rooms", "price")
+                           for op in OPERATORS for value in (-1, 2, 2.5)]
+        self.conditions += [[("rooms", ">=", 1), ("price", "!=", 2)],
+                            [("rooms", "<", 3), ("price", "==", 2),
+                             ("rooms", "!=", 0)],
+                            []]
+
+    def tearDown(self):
+        columns.numpy = self.numpy
+
+    def expected(self, conditions):
+        """Return the keys of the objects matching 'conditions',
+        values that are not numbers being compared as NaN"""
+        return sorted(key for key, obj in self.objects.items()
+                      if all(OPERATORS[op](
+                          columns.to_float(getattr(obj, attr, None)),
+                          value) for attr, op, value in conditions))
+
+    def check(self):
+        """Check every condition against the objects"""
+        for conditions in self.conditions:
+            with self.subTest(conditions=conditions):
+                self.assertEqual(sorted(self.store.where(conditions)),
+                                 self.expected(conditions))
+
+    def test_python(self):
+        """Filters without NumPy"""
+        columns.numpy = None
+        self.check()
+
+    @unittest.skipIf(columns.numpy is None, "NumPy is not installed")
+    def test_numpy(self):
+        """Filters with NumPy give the keys of the filters without
+        NumPy"""
+        self.check()
+        for conditions in self.conditions:
+            found = self.store.where(conditions)
+            columns.numpy = None
+            self.assertEqual(sorted(self.store.where(conditions)),
+                             sorted(found))
+            columns.numpy = self.numpy
+
+    def test_not_a_number(self):
+        """Values that are not numbers only match != conditions"""
+        columns.numpy = None
+        nan = [key for key, obj in self.objects.items()
+               if columns.to_float(getattr(obj, "price", None)) !=
+               columns.to_float(getattr(obj, "price", None))]
+        self.assertTrue(nan)
+        for op in OPERATORS:
+            found = set(self.store.where([("price", op, 2)]))
+            if op == "!=":
+                self.assertLessEqual(set(nan), found)
+            else:
+                self.assertFalse(set(nan) & found)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of DBStorage (HBNB_TYPE_STORAGE=db),
+its rows (models.engine.db_storage) and models.engine.migrate
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from models import storage
+from models.engine.db_storage import (connect, declared_attrs,
+                                      delete_rows, read_rows, write_rows)
+from models.place import Place
+from tests.test_models.test_engine import run
+
+# Values of Place attributes stored in their column or in 'extra'
+VALUES = {"name": "flat", "number_rooms": 3, "latitude": 1.5,
+          "amenity_ids": ["wifi"], "max_guest": "four",
+          "price_by_night": 2 ** 70, "description": None,
+          "rules": {"pets": False}, "longitude": -0.5}
+
+SETUP = """
+from models import storage
+from models.place import Place
+from models.user import User
+place = Place(**{values!r})
+place.save()
+User(email="a@b.c").save()
+User(email="d@e.f").save()
+open("id", "w").write(place.id)
+"""
+
+OBJECTS = """
+from models import storage
+for key, obj in sorted(storage.all().items()):
+    print(key.split(".")[0], sorted(obj.to_dict().items()))
+"""
+
+
+class TestRows(unittest.TestCase):
+    """Tests of the rows of the objects in the database"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.db")
+        self.classes = storage.classes()
+        self.connection = connect(self.path, self.classes)
+
+    def tearDown(self):
+        self.connection.close()
+        self.directory.cleanup()
+
+    def test_declared_attrs(self):
+        """The columns of a class are its class attributes"""
+        attrs = declared_attrs(Place)
+        self.assertEqual(attrs["city_id"], str)
+        self.assertEqual(attrs["number_rooms"], int)
+        self.assertEqual(attrs["latitude"], float)
+        self.assertEqual(attrs["amenity_ids"], list)
+        self.assertNotIn("id", attrs)
+
+    def test_round_trip(self):
+        """Objects are read as they were written, whatever the types
+        of their values"""
+        obj_dict = dict(VALUES, __class__="Place", id="1",
+                        created_at="2024-05-17T10:30:00.000001",
+                        updated_at="2024-05-17T10:30:00.000002",
+                        undeclared=[1, {"a": None}])
+        user_dict = {"__class__": "User", "id": "2", "email": "a@b.c"}
+        with self.connection:
+            write_rows(self.connection, self.classes, [obj_dict, user_dict])
+        self.assertEqual(read_rows(self.connection, self.classes),
+                         {"Place.1": obj_dict, "User.2": user_dict})
+        columns = self.connection.execute(
+            'SELECT number_rooms, max_guest, extra FROM "Place"').fetchone()
+        self.assertEqual(columns[:2], (3, None))
+        self.assertEqual(json.loads(columns[2])["max_guest"], "four")
+
+    def test_replace_delete(self):
+        """Objects written again are replaced and deleted objects are
+        removed"""
+        with self.connection:
+            write_rows(self.connection, self.classes,
+                       [{"__class__": "User", "id": str(i), "email": "x"}
+                        for i in range(3)])
+            write_rows(self.connection, self.classes,
+                       [{"__class__": "User", "id": "1", "email": "y"}])
+            delete_rows(self.connection, ["User.0"])
+        self.assertEqual(read_rows(self.connection, self.classes),
+                         {f"User.{i}": {"__class__": "User", "id": str(i),
+                                        "email": email}
+                          for i, email in [(1, "y"), (2, "x")]})
+
+
+class TestDBStorage(unittest.TestCase):
+    """Tests of DBStorage across restarts"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.run_engine(SETUP.format(values=VALUES))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_engine(self, script):
+        """Run 'script' in a new process with the db engine"""
+        return run(script, self.directory.name, HBNB_TYPE_STORAGE="db")
+
+    def test_restart(self):
+        """Saved objects are loaded as they were after a restart"""
+        output = self.run_engine(OBJECTS)
+        place = json.loads(self.run_engine(
+            "import json\n"
+            "from models import storage\n"
+            "place = storage.get('Place', open('id').read())\n"
+            "print(json.dumps(place.to_dict()))\n"))
+        for name, value in VALUES.items():
+            self.assertEqual(place[name], value)
+        self.assertEqual(output.count("User "), 2)
+
+    def test_update_delete(self):
+        """Updated and deleted objects are saved in the database, and
+        the objects saved by another process are kept"""
+        self.run_engine("from models import storage\n"
+                        "from models.user import User\n"
+                        "key = 'Place.' + open('id').read()\n"
+                        "storage.update(key, name='house', number_rooms=4)\n"
+                        "user = list(storage.all('User').values())[0]\n"
+                        "other = '; '.join(['import sys', "
+                        "'sys.path.insert(0, ' + repr(sys.path[0]) + ')', "
+                        "'from models.user import User', "
+                        "'User(email=\"g@h.i\").save()'])\n"
+                        "import subprocess\n"
+                        "subprocess.run([sys.executable, '-c', other], "
+                        "check=True)\n"
+                        "storage.delete('User.' + user.id)\n")
+        connection = sqlite3.connect(os.path.join(self.directory.name,
+                                                  "file.db"))
+        try:
+            self.assertEqual(connection.execute(
+                'SELECT name, number_rooms FROM "Place"').fetchall(),
+                [("house", 4)])
+            self.assertEqual(connection.execute(
+                'SELECT COUNT(*) FROM "User"').fetchone()[0], 2)
+        finally:
+            connection.close()
+        self.assertEqual(self.run_engine(OBJECTS).count("User "), 2)
+
+
+class TestMigrate(unittest.TestCase):
+    """Tests of the import of file.json into the database"""
+
+    def test_migrate(self):
+        """The objects of file.json are loaded by DBStorage once
+        imported, and importing again replaces them"""
+        with tempfile.TemporaryDirectory() as directory:
+            run(SETUP.format(values=VALUES), directory)
+            expected = run(OBJECTS, directory)
+            for _ in range(2):
+                self.assertEqual(run(
+                    "from models.engine.migrate import migrate\n"
+                    "print(migrate())\n", directory), "3\n")
+            self.assertEqual(run(OBJECTS, directory,
+                                 HBNB_TYPE_STORAGE="db"), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of FileStorage with objects changed
+in place (attributes holding lists or dictionaries) and of the reload of
+files it can't load
+"""
+
+import os
+import tempfile
+import unittest
+from tests.test_models.test_engine import run
+
+SETUP = """
+from models import storage
+from models.place import Place
+place = Place()
+place.amenity_ids = ["wifi"]
+place.meta = {"rooms": 1}
+storage.save()
+"""
+
+
+class TestRenderCache(unittest.TestCase):
+    """Tests of the cache of str() and to_dict()"""
+
+    def test_changed_in_place(self):
+        """str() and to_dict() show the values changed in place"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = run(SETUP + "str(place)\n"
+                         "place.to_dict()\n"
+                         "place.amenity_ids.append('pool')\n"
+                         "place.meta['rooms'] = 2\n"
+                         "print('pool' in str(place))\n"
+                         "print(place.to_dict()['amenity_ids'])\n"
+                         "print(place.to_dict()['meta'])\n", directory)
+            self.assertEqual(output,
+                             "True\n['wifi', 'pool']\n{'rooms': 2}\n")
+
+    def test_cached(self):
+        """Objects without lists or dictionaries are cached"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = run("from models import storage\n"
+                         "from models.user import User\n"
+                         "user = User()\n"
+                         "str(user)\n"
+                         "str(user)\n"
+                         "print(storage.render_stats()['str_hits'])\n",
+                         directory)
+            self.assertEqual(output, "1\n")
+
+
+class TestChangedInPlace(unittest.TestCase):
+    """Tests of the save of objects changed in place"""
+
+    CHANGE = ("place = storage.get('Place', open('id').read())\n"
+              "place.amenity_ids.append('pool')\n"
+              "place.meta['rooms'] = 2\n")
+    CHECK = ("from models import storage\n"
+             "place = storage.get('Place', open('id').read())\n"
+             "print(place.amenity_ids, place.meta)\n")
+
+    def check(self, engine, change):
+        """Check the change made by the code 'change' is saved with
+        the engine 'engine'"""
+        with tempfile.TemporaryDirectory() as directory:
+            run(SETUP + "open('id', 'w').write(place.id)\n", directory,
+                HBNB_TYPE_STORAGE=engine)
+            run("from models import storage\n" + change, directory,
+                HBNB_TYPE_STORAGE=engine)
+            self.assertEqual(run(self.CHECK, directory,
+                                 HBNB_TYPE_STORAGE=engine),
+                             "['wifi', 'pool'] {'rooms': 2}\n")
+
+    def test_save(self):
+        """Lists and dictionaries changed in place are saved"""
+        for engine in ("file", "journal", "wal", "sharded", "db"):
+            with self.subTest(engine=engine):
+                self.check(engine, self.CHANGE + "storage.save()\n")
+
+    def test_merge(self):
+        """Changes made in place are kept when another process saved
+        in the meantime"""
+        other = ("import subprocess\n"
+                 "subprocess.run([sys.executable, '-c', 'import sys; "
+                 "sys.path.insert(0, ' + repr(sys.path[0]) + '); "
+                 "from models.user import User; User().save()'], "
+                 "check=True)\n")
+        for engine in ("file", "journal", "wal"):
+            with self.subTest(engine=engine):
+                self.check(engine, self.CHANGE + other +
+                           "storage.get('User', 'missing')\n"
+                           "storage.save()\n")
+
+
+class TestRelatedChangedInPlace(unittest.TestCase):
+    """Tests of the reverse index (related()) of lists changed in
+    place"""
+
+    RELATED = ("print(len(storage.related('Amenity', 'places', 'wifi')),"
+               " len(storage.related('Amenity', 'places', 'pool')))\n")
+
+    def test_saved(self):
+        """A list changed in place is indexed again once saved"""
+        for engine in ("file", "journal", "wal"):
+            with self.subTest(engine=engine):
+                with tempfile.TemporaryDirectory() as directory:
+                    run(SETUP + "open('id', 'w').write(place.id)\n",
+                        directory, HBNB_TYPE_STORAGE=engine)
+                    output = run(
+                        "from models import storage\n" +
+                        TestChangedInPlace.CHANGE.replace(
+                            "append('pool')", "remove('wifi')\n"
+                            "place.amenity_ids.append('pool')") +
+                        "storage.save()\n" + self.RELATED, directory,
+                        HBNB_TYPE_STORAGE=engine)
+                    self.assertEqual(output, "0 1\n")
+                    self.assertEqual(run("from models import storage\n" +
+                                         self.RELATED, directory,
+                                         HBNB_TYPE_STORAGE=engine),
+                                     "0 1\n")
+
+    def test_new_list(self):
+        """A list assigned then changed in place before the object is
+        saved is indexed as it is saved"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = run(SETUP + "place.amenity_ids = []\n"
+                         "place.amenity_ids.append('pool')\n"
+                         "storage.save()\n" + self.RELATED, directory)
+            self.assertEqual(output, "0 1\n")
+
+
+# Adds the entries of 'entries' to the storage file 'path' (cut to 'size'
+# characters) and prints the error raised by reload() with 'workers'
+# processes, the number of objects loaded and the files moved aside
+RELOAD = """
+import json
+import os
+import warnings
+from models import storage
+from models.user import User
+User().save()
+User().save()
+with open({path!r}) as f:
+    obj_dicts = json.load(f)
+obj_dicts.update({entries!r})
+with open({path!r}, "w") as f:
+    f.write(json.dumps(obj_dicts)[:{size}])
+storage._reset()
+storage.RELOAD_WORKERS = {workers}
+warnings.simplefilter("ignore")
+try:
+    storage.reload()
+except Exception as e:
+    print(type(e).__name__)
+print(len(storage._FileStorage__objects),
+      [name for name in os.listdir(os.path.dirname({path!r}) or ".")
+       if ".damaged-" in name])
+"""
+
+UNKNOWN = {"Nothing.1": {"__class__": "Nothing", "id": "1"}}
+
+
+class TestReload(unittest.TestCase):
+    """Tests of reload() with files it can't load"""
+
+    def reload(self, path, entries, size=None, workers=1, **env):
+        """Return the output of RELOAD and whether the file 'path' is
+        still there after it"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = run(RELOAD.format(path=path, entries=entries,
+                                       size=size, workers=workers),
+                         directory, **env)
+            return output, os.path.exists(os.path.join(directory, path))
+
+    def test_unknown_class(self):
+        """An object of an unknown class raises a KeyError, the file
+        is kept and no object is loaded"""
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                self.assertEqual(self.reload("file.json", UNKNOWN,
+                                             workers=workers),
+                                 ("KeyError\n0 []\n", True))
+
+    def test_damaged(self):
+        """A file that can't be decoded is moved aside and no object
+        is loaded"""
+        output, kept = self.reload("file.json", {}, size=-3)
+        self.assertRegex(output, r"^0 \['file\.json\.damaged-\d+'\]\n$")
+        self.assertFalse(kept)
+
+    def test_sharded(self):
+        """A shard holding an object of an unknown class raises a
+        KeyError, the file is kept and no shard is loaded"""
+        self.assertEqual(self.reload(
+            os.path.join("file.shards", "User", "0.json"), UNKNOWN,
+            HBNB_TYPE_STORAGE="sharded", HBNB_SHARDS="1"),
+            ("KeyError\n0 []\n", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of models.engine.geo_index and of the
+spatial queries of the storage (within(), near() and nearest())
+"""
+
+import random
+import tempfile
+import unittest
+from models.engine.geo_index import GeoIndex, distance
+from tests.test_models.test_engine import run
+
+SETUP = """
+from models import storage
+from models.place import Place
+for name, latitude, longitude in [("paris", 48.8566, 2.3522),
+                                  ("versailles", 48.8049, 2.1204),
+                                  ("lyon", 45.764, 4.8357),
+                                  ("fiji", -17.7134, 178.065),
+                                  ("samoa", -13.759, -172.1046),
+                                  ("nowhere", None, None)]:
+    Place(name=name, latitude=latitude, longitude=longitude).save()
+"""
+
+QUERIES = """
+from models import storage
+def names(objs):
+    return [obj.name for obj in objs.values()]
+print(sorted(names(storage.within("Place", 48, 2, 49, 3))))
+print(names(storage.near("Place", 48.85, 2.35, 20)))
+print(names(storage.nearest("Place", 45, 4, 2)))
+print(sorted(names(storage.within("Place", -20, 170, -10, -170))))
+"""
+
+
+class TestGeoIndex(unittest.TestCase):
+    """Tests of GeoIndex against a search through every point"""
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.index = GeoIndex(cell_size=5)
+        self.points = {}
+        for i in range(500):
+            point = (rng.uniform(-90, 90), rng.uniform(-180, 180))
+            self.points[f"Place.{i}"] = point
+            self.index.put(f"Place.{i}", *point)
+        # Moved and removed points
+        for i in range(0, 500, 10):
+            point = (rng.uniform(-90, 90), rng.uniform(-180, 180))
+            self.points[f"Place.{i}"] = point
+            self.index.put(f"Place.{i}", *point)
+        for i in range(5, 500, 50):
+            del self.points[f"Place.{i}"]
+            self.index.remove(f"Place.{i}")
+
+    def test_within(self):
+        """within() returns the points in the box, across the 180th
+        meridian too"""
+        for box in [(-10, -20, 30, 40), (40, 170, 80, -170),
+                    (-90, -180, 90, 180), (10, 10, 0, 20)]:
+            min_lat, min_lon, max_lat, max_lon = box
+            expected = {key for key, (lat, lon) in self.points.items()
+                        if min_lat <= lat <= max_lat and
+                        (min_lon <= lon <= max_lon if min_lon <= max_lon
+                         else lon >= min_lon or lon <= max_lon)}
+            with self.subTest(box=box):
+                self.assertEqual(set(self.index.within(*box)), expected)
+
+    def test_near(self):
+        """near() returns the points within the distance, nearest
+        first"""
+        for center, km in [((0, 0), 2000), ((85, 30), 1500),
+                           ((-30, 179), 3000), ((10, 10), -1)]:
+            expected = sorted((distance(*center, *point), key)
+                              for key, point in self.points.items()
+                              if distance(*center, *point) <= km)
+            with self.subTest(center=center, km=km):
+                self.assertEqual(self.index.near(*center, km), expected)
+
+    def test_nearest(self):
+        """nearest() returns the 'k' nearest points"""
+        for center, k in [((0, 0), 1), ((60, -170), 7), ((-89, 0), 20),
+                          ((0, 0), 1000)]:
+            expected = sorted((distance(*center, *point), key)
+                              for key, point in self.points.items())[:k]
+            with self.subTest(center=center, k=k):
+                self.assertEqual(self.index.nearest(*center, k), expected)
+
+    def test_invalid(self):
+        """Points that are not valid coordinates are not indexed"""
+        index = GeoIndex()
+        for key, point in [("a", (None, 1)), ("b", (91, 0)),
+                           ("c", (0, "1")), ("d", (0, 181))]:
+            index.put(key, *point)
+        self.assertEqual(index.points, {})
+
+
+class TestStorage(unittest.TestCase):
+    """Tests of the spatial queries of the storage"""
+
+    def test_queries(self):
+        """The queries find the saved places after a restart, and the
+        places moved or deleted since"""
+        with tempfile.TemporaryDirectory() as directory:
+            run(SETUP, directory)
+            self.assertEqual(run(QUERIES, directory),
+                             "['paris', 'versailles']\n"
+                             "['paris', 'versailles']\n"
+                             "['lyon', 'versailles']\n"
+                             "['fiji', 'samoa']\n")
+            output = run("from models import storage\n"
+                         "places = {place.name: place for place in "
+                         "storage.all('Place').values()}\n"
+                         "storage.within('Place', 0, 0, 1, 1)\n"
+                         "places['paris'].latitude = 45.75\n"
+                         "places['paris'].longitude = 4.85\n"
+                         "places['paris'].save()\n"
+                         "storage.delete('Place.' + places['lyon'].id)\n" +
+                         QUERIES.split("\n", 2)[2],
+                         directory)
+            self.assertEqual(output,
+                             "['versailles']\n"
+                             "['versailles']\n"
+                             "['paris', 'versailles']\n"
+                             "['fiji', 'samoa']\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
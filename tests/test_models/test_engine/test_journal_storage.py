@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of the recovery of JournalStorage
+(HBNB_TYPE_STORAGE=journal) after a process was killed while writing
+and of its automatic compaction
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from tests.test_models.test_engine import run
+from tests.test_models.test_engine.test_atomic_file import KILLED
+
+SAVE = """
+from models import storage
+from models.user import User
+for i in range({count}):
+    User().save()
+"""
+
+COUNT = """
+from models import storage
+print(storage.count())
+"""
+
+# compact() only runs once the save that started it has returned
+COMPACT = """
+import threading
+from models import storage
+from models.user import User
+storage.COMPACT_MIN_RECORDS = 10
+saved = threading.Event()
+compact = storage.compact
+
+
+def compact_after_save():
+    print(threading.current_thread().name, saved.wait(10))
+    compact()
+
+
+storage.compact = compact_after_save
+user = User()
+for i in range(20):
+    user.first_name = str(i)
+    user.save()
+    if i == 10:
+        saved.set()
+"""
+
+
+class TestRecovery(unittest.TestCase):
+    """Tests of the recovery of the log file"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.jsonl")
+        self.run_engine(SAVE.format(count=5))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_engine(self, script, check=True):
+        """Run 'script' in a new process with the journal engine"""
+        return run(script, self.directory.name, check,
+                   HBNB_TYPE_STORAGE="journal")
+
+    def test_partial_record(self):
+        """A record partially appended is skipped and dropped from the
+        log, and the next records are read"""
+        with open(self.path, "a") as f:
+            f.write('{"op": "put", "key": "User.1", "obj": {"id"')
+        self.assertEqual(self.run_engine(COUNT), "5\n")
+        with open(self.path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 5)
+        self.run_engine(SAVE.format(count=1))
+        self.assertEqual(self.run_engine(COUNT), "6\n")
+
+    def test_killed_compact(self):
+        """The log is kept if the process is killed while compacting
+        it"""
+        self.run_engine(KILLED.replace("file_storage", "journal_storage") +
+                        "from models import storage\n"
+                        "storage.compact()\n", check=False)
+        self.assertEqual(self.run_engine(COUNT), "5\n")
+
+
+# The list of the user is changed in place once compact() has written
+# its record, and saved while the log is still being rewritten
+CHANGED_DURING_COMPACT = """
+import contextlib
+import threading
+from models import storage
+from models.engine import journal_storage
+from models.user import User
+user = User()
+user.tags = []
+user.save()
+written = threading.Event()
+changed = threading.Event()
+atomic_open = journal_storage.atomic_open
+
+
+@contextlib.contextmanager
+def paused_open(path):
+    with atomic_open(path) as f:
+        write = f.write
+
+        def paused_write(text):
+            write(text)
+            if user.id in text:
+                written.set()
+                changed.wait(10)
+        f.write = paused_write
+        yield f
+
+
+journal_storage.atomic_open = paused_open
+compactor = threading.Thread(target=storage.compact)
+compactor.start()
+written.wait(10)
+user.tags.append("A1")
+changed.set()
+storage.save()
+compactor.join()
+"""
+
+TAGS = """
+from models import storage
+print(list(storage.all().values())[0].tags)
+"""
+
+
+class TestCompaction(unittest.TestCase):
+    """Tests of the automatic compaction of the log file"""
+
+    def test_background(self):
+        """The log is compacted in another thread once it is too large,
+        without blocking the save, and before the process exits"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = run(COMPACT, directory, HBNB_TYPE_STORAGE="journal")
+            self.assertEqual(output, "journal-compact True\n")
+            with open(os.path.join(directory, "file.jsonl")) as f:
+                records = [json.loads(line) for line in f]
+            self.assertLessEqual(len(records), 10)
+            self.assertEqual(records[-1]["obj"]["first_name"], "19")
+            self.assertEqual(run(COUNT, directory,
+                                 HBNB_TYPE_STORAGE="journal"), "1\n")
+
+    def test_changed_during_compact(self):
+        """An object changed in place while the log is compacted is
+        saved by the next save"""
+        with tempfile.TemporaryDirectory() as directory:
+            run(CHANGED_DURING_COMPACT, directory,
+                HBNB_TYPE_STORAGE="journal")
+            self.assertEqual(run(TAGS, directory,
+                                 HBNB_TYPE_STORAGE="journal"), "['A1']\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
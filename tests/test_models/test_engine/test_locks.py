@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of the storage used by several
+processes (and threads) at the same time: file lock, merge of the
+changes saved by other processes and group commit
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from tests.test_models.test_engine import REPO, run
+
+WORKER = """
+import sys
+sys.path.insert(0, {repo!r})
+from models import storage
+from models.user import User
+users = []
+for i in range({objects}):
+    user = User()
+    user.email = "{name}-" + str(i)
+    user.save()
+    users.append(user)
+for user in users:
+    user.first_name = "final"
+    user.save()
+storage.flush()
+"""
+
+THREADS = """
+import threading
+from models import storage
+from models.user import User
+
+
+def work(name):
+    users = []
+    for i in range({objects}):
+        user = User()
+        user.email = name + "-" + str(i)
+        user.save()
+        users.append(user)
+    for user in users:
+        user.first_name = "final"
+        user.save()
+
+
+threads = [threading.Thread(target=work, args=("worker" + str(i),))
+           for i in range({workers})]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+storage.flush()
+"""
+
+CHECK = """
+from models import storage
+print(sum(getattr(user, "first_name", None) == "final"
+          for user in storage.all("User").values()))
+"""
+
+WORKERS = 4
+OBJECTS = 25
+
+
+class TestConcurrentSaves(unittest.TestCase):
+    """Tests of saves by several processes or threads at once"""
+
+    def processes(self, **env):
+        """Run WORKERS processes saving OBJECTS users each on the same
+        storage and check no write is lost"""
+        with tempfile.TemporaryDirectory() as directory:
+            processes = [subprocess.Popen(
+                [sys.executable, "-c",
+                 WORKER.format(repo=REPO, name=f"worker{i}",
+                               objects=OBJECTS)],
+                cwd=directory, env={**os.environ, **env})
+                for i in range(WORKERS)]
+            for process in processes:
+                self.assertEqual(process.wait(), 0)
+            self.assertEqual(run(CHECK, directory, **env),
+                             f"{WORKERS * OBJECTS}\n")
+
+    def test_processes(self):
+        """No write is lost by processes saving at once"""
+        for engine in ("file", "journal", "wal", "sharded"):
+            with self.subTest(engine=engine):
+                self.processes(HBNB_TYPE_STORAGE=engine)
+
+    def test_group_commit(self):
+        """No write is lost by processes grouping their saves"""
+        self.processes(HBNB_GROUP_COMMIT_WINDOW="0.02")
+        self.processes(HBNB_GROUP_COMMIT_SIZE="10")
+
+    def test_threads(self):
+        """No write is lost by threads saving at once"""
+        with tempfile.TemporaryDirectory() as directory:
+            run(THREADS.format(workers=WORKERS, objects=OBJECTS),
+                directory)
+            self.assertEqual(run(CHECK, directory),
+                             f"{WORKERS * OBJECTS}\n")
+
+
+class TestGroupCommitTimer(unittest.TestCase):
+    """Tests of the write of the saves waiting for the group commit"""
+
+    def test_timer(self):
+        """The saves are written once the window ends, without any
+        other save (and before the process exits)"""
+        with tempfile.TemporaryDirectory() as directory:
+            output = run("import json\n"
+                         "import os\n"
+                         "import time\n"
+                         "from models import storage\n"
+                         "from models.user import User\n"
+                         "user = User()\n"
+                         "user.save()\n"
+                         "print(os.path.exists('file.json'))\n"
+                         "time.sleep(1)\n"
+                         "with open('file.json') as f:\n"
+                         "    print('User.' + user.id in json.load(f))\n"
+                         "# Exit without the handlers flushing the saves\n"
+                         "os._exit(0)\n", directory,
+                         HBNB_GROUP_COMMIT_WINDOW="0.1")
+            self.assertEqual(output, "False\nTrue\n")
+
+
+class TestMerge(unittest.TestCase):
+    """Tests of the merge of the changes saved by another process"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        ids = run("from models import storage\n"
+                  "from models.user import User\n"
+                  "for name in ('a', 'b', 'c'):\n"
+                  "    user = User()\n"
+                  "    user.first_name = name\n"
+                  "    print(user.id)\n"
+                  "storage.save()\n", self.directory.name).split()
+        self.ids = dict(zip("abc", ids))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_merge(self):
+        """Each process keeps the changes of the other one, and the
+        last process saving an object wins"""
+        other = ("from models import storage\n"
+                 "a = storage.get('User', '{a}')\n"
+                 "a.last_name = 'other'\n"
+                 "b = storage.get('User', '{b}')\n"
+                 "b.last_name = 'other'\n"
+                 "storage.delete('User.{c}')\n"
+                 "storage.save()\n").format(**self.ids)
+        script = ("import subprocess\n"
+                  "from models import storage\n"
+                  "a = storage.get('User', '{a}')\n"
+                  "a.last_name = 'this'\n"
+                  "subprocess.run([sys.executable, '-c', 'import sys; "
+                  "sys.path.insert(0, ' + repr(sys.path[0]) + ')\\n' + "
+                  "{other!r}], check=True)\n"
+                  "# Changes of the other process are seen on access\n"
+                  "print(storage.get('User', '{b}').last_name)\n"
+                  "print(storage.get('User', '{c}'))\n"
+                  "storage.save()\n").format(other=other, **self.ids)
+        self.assertEqual(run(script, self.directory.name), "other\nNone\n")
+        with open(os.path.join(self.directory.name, "file.json")) as f:
+            saved = json.load(f)
+        self.assertEqual(sorted(saved), sorted(
+            f"User.{self.ids[name]}" for name in "ab"))
+        self.assertEqual(saved[f"User.{self.ids['a']}"]["last_name"],
+                         "this")
+        self.assertEqual(saved[f"User.{self.ids['b']}"]["last_name"],
+                         "other")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of models.engine.offset_index and of
+the lazy reload (HBNB_LAZY_RELOAD=1) using it
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from models.engine import offset_index
+from tests.test_models.test_engine import run
+
+
+class TestScan(unittest.TestCase):
+    """Tests of offset_index.scan()"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.json")
+        self.chunk_size = offset_index.CHUNK_SIZE
+
+    def tearDown(self):
+        offset_index.CHUNK_SIZE = self.chunk_size
+        self.directory.cleanup()
+
+    def check(self, objs):
+        """Check the entries indexed in the file of 'objs' at every
+        chunk size"""
+        content = json.dumps(objs).encode()
+        with open(self.path, "wb") as f:
+            f.write(content)
+        for chunk_size in (1, 5, 64, 1 << 20):
+            offset_index.CHUNK_SIZE = chunk_size
+            positions, offsets = offset_index.scan(self.path)
+            found = {}
+            for keys in positions.values():
+                for key, i in keys.items():
+                    entry = content[offsets[2 * i]:offsets[2 * i + 1]]
+                    found.update(json.loads(b"{" + entry + b"}"))
+            self.assertEqual(found, objs)
+
+    def test_entries(self):
+        """Entries of several classes are indexed"""
+        self.check({"User.1": {"id": "1", "__class__": "User"},
+                    "Place.2": {"id": "2", "__class__": "Place"}})
+
+    def test_dict_attribute(self):
+        """A dictionary in an object is not taken for the end of the
+        object"""
+        self.check({"Place.1": {"id": "1", "meta": {"k": 1},
+                                "__class__": "Place"},
+                    "User.2": {"id": "2", "__class__": "User"}})
+        self.check({"Place.1": {"meta": {"a": {"b": [{"c": 2}, "d"]},
+                                         "e": 1}, "id": "1"},
+                    "Place.2": {"text": '}, "{', "id": "2"},
+                    "Place.3": {"meta": {}, "id": "3"}})
+
+    def test_truncated(self):
+        """A truncated file is not indexed"""
+        with open(self.path, "w") as f:
+            f.write('{"Place.1": {"meta": {"k": 1}, "id": "1"}, '
+                    '"User.2": {"id": "2"')
+        with self.assertRaises(ValueError):
+            offset_index.scan(self.path)
+
+
+class TestLazyReload(unittest.TestCase):
+    """Tests of the lazy reload of objects with dictionary attributes"""
+
+    def test_dict_attribute(self):
+        """Objects with dictionary attributes are counted and built"""
+        with tempfile.TemporaryDirectory() as directory:
+            run("from models import storage\n"
+                "from models.place import Place\n"
+                "from models.user import User\n"
+                "place = Place()\n"
+                "place.meta = {'k': 1}\n"
+                "User()\n"
+                "storage.save()\n", directory)
+            script = ("from models import storage\n"
+                      "print(storage.count())\n"
+                      "print(len(storage.all()))\n"
+                      "print([place.meta for place in\n"
+                      "       storage.all('Place').values()])\n")
+            expected = "2\n2\n[{'k': 1}]\n"
+            self.assertEqual(run(script, directory, HBNB_LAZY_RELOAD="1"),
+                             expected)
+            # Second time from the index saved next to the file
+            self.assertTrue(os.path.exists(
+                os.path.join(directory, "file.json.idx")))
+            self.assertEqual(run(script, directory, HBNB_LAZY_RELOAD="1"),
+                             expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
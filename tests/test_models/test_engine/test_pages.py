@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of the all command of the console
+(streamed by chunks) and of its pages (limit, offset and after)
+"""
+
+import json
+import tempfile
+import unittest
+from tests.test_models.test_engine import run
+
+SETUP = """
+from models.city import City
+from models.user import User
+for i in range(7):
+    User(email=f"{i}@hbnb.io").save()
+    if i % 2:
+        City(name=f"city {i}").save()
+"""
+
+# Runs the commands of 'commands' in the console with CHUNK_SIZE 3 and
+# prints the users, their keys and the outputs of the commands ('{keys[i]}'
+# in a command is the key of the user i)
+COMMANDS = """
+import io
+import json
+from contextlib import redirect_stdout
+from console import HBNBCommand
+from models import storage
+console = HBNBCommand()
+console.CHUNK_SIZE = 3
+
+
+def output(line):
+    f = io.StringIO()
+    with redirect_stdout(f):
+        console.onecmd(line)
+    return f.getvalue()
+
+
+users = [str(obj) for obj in storage.all("User").values()]
+keys = list(storage.all("User"))
+outputs = [output(line.format(keys=keys)) for line in {commands!r}]
+print(json.dumps([users, keys, outputs]))
+"""
+
+
+class TestAll(unittest.TestCase):
+    """Tests of the all command"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        run(SETUP, self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def commands(self, *commands):
+        """Return the string representations of the users, their keys
+        and the outputs of 'commands'"""
+        return json.loads(run(COMMANDS.format(commands=commands),
+                              self.directory.name))
+
+    def test_all(self):
+        """The output is the same as printing the list of the string
+        representations, whatever the chunks"""
+        users, _, outputs = self.commands("all User", "User.all()",
+                                          "all City", "all")
+        self.assertEqual(outputs[0], f"{users}\n")
+        self.assertEqual(outputs[1], "[" + ", ".join(users) + "]\n")
+        self.assertEqual(outputs[2].count("[City]"), 3)
+        self.assertEqual(outputs[3].count("[User]"), 7)
+        self.assertEqual(outputs[3].count("[City]"), 3)
+
+    def test_empty(self):
+        """Classes without instances are printed as an empty list"""
+        _, _, outputs = self.commands("all Review", "Review.all()")
+        self.assertEqual(outputs, ["[]\n", "[]\n"])
+
+    def test_pages(self):
+        """Following the cursors prints every instance once, in
+        order"""
+        users, keys, outputs = self.commands(
+            "all User limit=3", "all User limit=3 after={keys[2]}",
+            "all User limit=3 after={keys[5]}",
+            "all User offset=5", "all User limit=2 offset=1",
+            'User.all(limit=2, after="{keys[4]}")', "all User limit=0")
+        self.assertEqual(outputs[0], f"{users[:3]}\n"
+                         f"** next page: after={keys[2]} **\n")
+        self.assertEqual(outputs[1], f"{users[3:6]}\n"
+                         f"** next page: after={keys[5]} **\n")
+        self.assertEqual(outputs[2], f"{users[6:]}\n")
+        self.assertEqual(outputs[3], f"{users[5:]}\n")
+        self.assertEqual(outputs[4], f"{users[1:3]}\n"
+                         f"** next page: after={keys[2]} **\n")
+        self.assertEqual(outputs[5], "[" + ", ".join(users[5:7]) + "]\n")
+        self.assertEqual(outputs[6], "[]\n")
+
+    def test_invalid(self):
+        """Invalid options and unknown cursors print an error"""
+        _, _, outputs = self.commands("all User limit=-1",
+                                      "all User page=2", "all User offset=x",
+                                      "all User after=User.missing",
+                                      "all Nothing limit=1")
+        self.assertEqual(outputs, ["** invalid arguments **\n"] * 3 +
+                         ["** no instance found **\n",
+                          "** class doesn't exist **\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()
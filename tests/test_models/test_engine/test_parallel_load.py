@@ -0,0 +1,65 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of models.engine.parallel_load
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from models.base_model import attributes_of
+from models.engine import offset_index, parallel_load
+
+
+class TestParallelLoad(unittest.TestCase):
+    """Tests of parallel_load.load()"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.json")
+        self.min_size = parallel_load.MIN_SIZE
+        # Every file is parsed by several processes
+        parallel_load.MIN_SIZE = 0
+        self.objs = {}
+        for i in range(50):
+            class_name = ("Place", "User")[i % 2]
+            obj_dict = {"id": str(i), "created_at": "2024-01-01T00:00:00",
+                        "updated_at": "2024-01-01T00:00:00",
+                        "__class__": class_name}
+            if i % 3 == 0:
+                obj_dict["meta"] = {"k": i, "nested": {"l": [{"m": 1}]}}
+            self.objs[f"{class_name}.{i}"] = obj_dict
+        with open(self.path, "w") as f:
+            json.dump(self.objs, f)
+
+    def tearDown(self):
+        parallel_load.MIN_SIZE = self.min_size
+        self.directory.cleanup()
+
+    def test_split(self):
+        """Ranges hold every entry once, in the order of the file"""
+        offsets = offset_index.scan(self.path)[1]
+        for parts in (1, 2, 3, 7, 100):
+            ranges = parallel_load.split(offsets, parts)
+            self.assertLessEqual(len(ranges), parts)
+            entries = []
+            for start, end in ranges:
+                entries += parallel_load.load_range(self.path, start, end,
+                                                    attributes_of)
+            self.assertEqual([key for key, _, _ in entries],
+                             list(self.objs))
+
+    @unittest.skipUnless(hasattr(os, "fork"), "processes can't be forked")
+    def test_dict_attributes(self):
+        """Objects holding dictionaries are parsed by the workers"""
+        for workers in (2, 3, 8):
+            entries = parallel_load.load(self.path, workers)
+            self.assertEqual([key for key, _, _ in entries],
+                             list(self.objs))
+            self.assertEqual(entries[0][2]["meta"], self.objs["Place.0"]
+                             ["meta"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of models.engine.serializers (the
+JSON and binary formats of the storage) and models.engine.convert
+"""
+
+from datetime import datetime, timedelta, timezone
+import io
+import json
+import os
+import tempfile
+import unittest
+from models.engine.serializers import (MAGIC, BinarySerializer,
+                                       JSONSerializer, detect_format,
+                                       format_of)
+from models.place import Place
+from models.user import User
+from tests.test_models.test_engine import run
+
+SETUP = """
+from models import storage
+from models.place import Place
+from models.user import User
+User(email="a@b.c", first_name="Zoé").save()
+place = Place(name="flat", number_rooms=3, latitude=1.5,
+              amenity_ids=["wifi", "pool"], rules={"pets": False})
+place.save()
+"""
+
+OBJECTS = """
+from models import storage
+for key, obj in sorted(storage.all().items()):
+    attrs = obj.to_dict()
+    del attrs["id"], attrs["created_at"], attrs["updated_at"]
+    print(key.split(".")[0], sorted(attrs.items()))
+"""
+
+
+def attributes(i, **attrs):
+    """Return the attributes of an object with id 'i'"""
+    date = datetime(2024, 5, 17, 10, 30, 0, i)
+    return {"id": str(i), "created_at": date, "updated_at": date, **attrs}
+
+
+class TestBinary(unittest.TestCase):
+    """Tests of BinarySerializer"""
+
+    def round_trip(self, objects):
+        """Return the dictionaries of 'objects' dumped and loaded"""
+        f = io.BytesIO()
+        BinarySerializer().dump(f, objects)
+        f.seek(0)
+        return BinarySerializer().load(f)
+
+    def test_round_trip(self):
+        """Every type of value is loaded as it was dumped"""
+        aware = datetime(2024, 1, 1, tzinfo=timezone(timedelta(hours=2)))
+        rows = [attributes(0, name="a\0b", number=2 ** 70, price=1.5,
+                           ids=["x"], when=aware),
+                attributes(1, name="é\ud800", number=3, price=2,
+                           ids=None, when=aware),
+                attributes(2, name="", number=-1, price=float("inf"),
+                           ids={"a": [1]}, when=aware),
+                attributes(3, name="plain", number=0, price=0.0,
+                           ids=[], when=None),
+                attributes(4)]
+        objects = {f"Place.{row['id']}": Place.from_attributes(row)
+                   for row in rows}
+        user = User.from_attributes(attributes(5, email="a@b.c"))
+        objects["User.5"] = user
+        loaded = self.round_trip(objects)
+        self.assertEqual(list(loaded), list(objects))
+        for key, obj in objects.items():
+            with self.subTest(key=key):
+                expected = dict(obj._attributes(),
+                                __class__=obj.__class__.__name__)
+                if isinstance(expected.get("when"), datetime):
+                    # Datetimes with a time zone are written as JSON
+                    expected["when"] = expected["when"].isoformat()
+                self.assertEqual(loaded[key], expected)
+
+    def test_empty(self):
+        """An empty storage is written as MAGIC only"""
+        f = io.BytesIO()
+        BinarySerializer().dump(f, {})
+        self.assertEqual(f.getvalue(), MAGIC)
+        self.assertEqual(self.round_trip({}), {})
+
+    def test_invalid(self):
+        """Files that are not in the binary format or are truncated
+        (anywhere after MAGIC in a file of one section) raise a
+        ValueError"""
+        f = io.BytesIO()
+        BinarySerializer().dump(f, {"Place.1": Place.from_attributes(
+            attributes(1, name="x" * 100, ids=[1]))})
+        data = f.getvalue()
+        for content in [b"{}", b"HBNB\x02"] + [
+                data[:size] for size in range(len(MAGIC) + 1, len(data))]:
+            with self.subTest(size=len(content)):
+                with self.assertRaises(ValueError):
+                    BinarySerializer().load(io.BytesIO(content))
+
+
+class TestFormats(unittest.TestCase):
+    """Tests of the choice of the format of a file"""
+
+    def test_format_of(self):
+        """The format is chosen from the extension"""
+        self.assertIsInstance(format_of("file.bin"), BinarySerializer)
+        self.assertIsInstance(format_of("file.json"), JSONSerializer)
+        self.assertIsInstance(format_of("file.txt"), JSONSerializer)
+
+    def test_detect_format(self):
+        """The format of a file is read from its first bytes"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "file.bin")
+            with open(path, "wb") as f:
+                f.write(b"{}")
+            self.assertIsInstance(detect_format(path), JSONSerializer)
+            with open(path, "wb") as f:
+                BinarySerializer().dump(f, {})
+            self.assertIsInstance(detect_format(path), BinarySerializer)
+
+
+class TestStorage(unittest.TestCase):
+    """Tests of the storage saving in the binary format"""
+
+    def test_restart(self):
+        """Objects saved in file.bin are loaded after a restart, and
+        file.bin converted to JSON holds the same objects"""
+        with tempfile.TemporaryDirectory() as directory:
+            run(SETUP, directory, HBNB_STORAGE_FORMAT="binary")
+            self.assertEqual(os.listdir(directory).count("file.json"), 0)
+            with open(os.path.join(directory, "file.bin"), "rb") as f:
+                self.assertEqual(f.read(len(MAGIC)), MAGIC)
+            expected = ("Place [('__class__', 'Place'), ('amenity_ids', "
+                        "['wifi', 'pool']), ('latitude', 1.5), ('name', "
+                        "'flat'), ('number_rooms', 3), ('rules', "
+                        "{'pets': False})]\n"
+                        "User [('__class__', 'User'), ('email', 'a@b.c'), "
+                        "('first_name', 'Zoé')]\n")
+            self.assertEqual(run(OBJECTS, directory,
+                                 HBNB_STORAGE_FORMAT="binary"), expected)
+            run("from models.engine.convert import convert\n"
+                "convert('file.bin', 'file.json')\n", directory)
+            with open(os.path.join(directory, "file.json")) as f:
+                self.assertEqual(len(json.load(f)), 2)
+            self.assertEqual(run(OBJECTS, directory), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of ShardedStorage
+(HBNB_TYPE_STORAGE=sharded): its files, the shards rewritten by save()
+and reload() with threads or processes
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from models.engine.sharded_storage import shard_of
+from tests.test_models.test_engine import run
+
+SETUP = """
+from models.city import City
+from models.user import User
+for i in range(40):
+    User(email=f"{i}@hbnb.io").save()
+    if i % 4 == 0:
+        City(name=f"city {i}").save()
+"""
+
+OBJECTS = """
+from models import storage
+print(storage.count("User"), storage.count("City"),
+      sorted(obj.email for obj in storage.all("User").values())[:2])
+"""
+
+
+class TestShardOf(unittest.TestCase):
+    """Tests of shard_of()"""
+
+    def test_shard_of(self):
+        """The shard depends only on the class name and the id"""
+        self.assertEqual(shard_of("User.1234", 8), ("User", 2615402659 % 8))
+        shards = {shard_of(f"User.{i}", 5) for i in range(100)}
+        self.assertEqual(shards, {("User", n) for n in range(5)})
+
+
+class TestShardedStorage(unittest.TestCase):
+    """Tests of ShardedStorage across restarts"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, "file.shards")
+        self.run_engine(SETUP)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_engine(self, script, **env):
+        """Run 'script' in a new process with the sharded engine and 4
+        shards by class"""
+        return run(script, self.directory.name, HBNB_TYPE_STORAGE="sharded",
+                   HBNB_SHARDS="4", **env)
+
+    def files(self):
+        """Return the (inode, modification time) of each shard file by
+        path relative to the root"""
+        files = {}
+        for class_name in os.listdir(self.root):
+            directory = os.path.join(self.root, class_name)
+            if os.path.isdir(directory):
+                for name in os.listdir(directory):
+                    stat = os.stat(os.path.join(directory, name))
+                    files[f"{class_name}/{name}"] = (stat.st_ino,
+                                                     stat.st_mtime_ns)
+        return files
+
+    def test_files(self):
+        """Each object is in the file of its shard"""
+        expected = {f"{class_name}/{n}.json"
+                    for class_name in ("City", "User") for n in range(4)}
+        self.assertLessEqual(set(self.files()), expected)
+        self.assertEqual(len([path for path in self.files()
+                              if path.startswith("User/")]), 4)
+        with open(os.path.join(self.root, "meta.json")) as f:
+            self.assertEqual(json.load(f), {"shards": 4})
+        for path in self.files():
+            with open(os.path.join(self.root, path)) as f:
+                for key in json.load(f):
+                    class_name, number = shard_of(key, 4)
+                    self.assertEqual(path, f"{class_name}/{number}.json")
+
+    def test_restart(self):
+        """The objects of every shard are loaded by threads or
+        processes, and a directory keeps its number of shards"""
+        expected = "40 10 ['0@hbnb.io', '10@hbnb.io']\n"
+        files = set(self.files())
+        self.assertEqual(self.run_engine(OBJECTS), expected)
+        self.assertEqual(self.run_engine(
+            "from models import storage\n"
+            "storage.RELOAD_POOL = 'processes'\n"
+            "storage._reset()\n"
+            "storage.reload()\n" + OBJECTS), expected)
+        self.assertEqual(run(OBJECTS + "from models.user import User\n"
+                             "for i in range(20):\n"
+                             "    User().save()\n", self.directory.name,
+                             HBNB_TYPE_STORAGE="sharded",
+                             HBNB_SHARDS="16"), expected)
+        self.assertEqual(set(self.files()), files)
+        self.assertEqual(self.run_engine(OBJECTS).split()[0], "60")
+
+    def test_save(self):
+        """save() only rewrites the shards of the objects changed or
+        deleted, and removes the files of empty shards"""
+        before = self.files()
+        output = self.run_engine(
+            "from models import storage\n"
+            "user = min(storage.all('User').values(), "
+            "key=lambda user: user.email)\n"
+            "user.first_name = 'Betty'\n"
+            "user.save()\n"
+            "storage.delete(min(storage.all('City')))\n"
+            "print(user.id)\n")
+        after = self.files()
+        user_shard = "User/%d.json" % shard_of("User." + output.strip(),
+                                               4)[1]
+        changed = [path for path in before if before[path] !=
+                   after.get(path)]
+        self.assertEqual(sorted(path.split("/")[0] for path in changed),
+                         ["City", "User"])
+        self.assertIn(user_shard, changed)
+        self.assertEqual(self.run_engine(
+            "from models import storage\n"
+            "print(len(storage.find_by('User', 'first_name', 'Betty')),\n"
+            "      storage.count('City'))\n"
+            "for key in list(storage.all('City')):\n"
+            "    storage.delete(key)\n"), "1 9\n")
+        self.assertEqual([path for path in self.files()
+                          if path.startswith("City/")], [])
+        self.assertEqual(self.run_engine(OBJECTS),
+                         "40 0 ['0@hbnb.io', '10@hbnb.io']\n")
+
+    def test_binary(self):
+        """Shards are saved in the binary format too"""
+        script = SETUP + "print(len(storage.all()))\n"
+        output = run("from models import storage\n" + script,
+                     self.directory.name, HBNB_TYPE_STORAGE="sharded",
+                     HBNB_STORAGE_ROOT="binary.shards",
+                     HBNB_STORAGE_FORMAT="binary")
+        self.assertEqual(output, "50\n")
+        names = os.listdir(os.path.join(self.directory.name,
+                                        "binary.shards", "User"))
+        self.assertTrue(names)
+        self.assertTrue(all(name.endswith(".bin") for name in names))
+        self.assertEqual(run(OBJECTS, self.directory.name,
+                             HBNB_TYPE_STORAGE="sharded",
+                             HBNB_STORAGE_ROOT="binary.shards",
+                             HBNB_STORAGE_FORMAT="binary"),
+                         "40 10 ['0@hbnb.io', '10@hbnb.io']\n")
+
+    def test_damaged(self):
+        """A damaged shard is moved aside and the others are loaded"""
+        with open(os.path.join(self.root, "User", "0.json"), "r+") as f:
+            count = len(json.load(f))
+            f.truncate(1)
+        output = self.run_engine("import warnings\n"
+                                 "warnings.simplefilter('ignore')\n" +
+                                 OBJECTS)
+        self.assertEqual(output.split()[:2], [str(40 - count), "10"])
+        self.assertTrue(any(name.startswith("0.json.damaged-") for name in
+                            os.listdir(os.path.join(self.root, "User"))))
+
+
+if __name__ == "__main__":
+    unittest.main()
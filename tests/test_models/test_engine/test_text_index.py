@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of models.engine.text_index (queries,
+BM25 ranking and saved indexes) and of storage.search()
+"""
+
+import math
+import os
+import tempfile
+import unittest
+from models.engine import text_index
+from models.engine.text_index import TextIndex, tokenize
+from tests.test_models.test_engine import run
+
+TEXTS = {"Place.1": ["Sea view", "Flat with a pool and wifi"],
+         "Place.2": ["Pool house", "Pool, pool and more pool"],
+         "Place.3": ["Cabin", "Quiet cabin in the woods, no wifi"],
+         "Place.4": ["Loft", "Swimming pool on the roof"],
+         "Place.5": [None, 3]}
+
+SETUP = """
+from models.place import Place
+from models.review import Review
+Place(name="Sea view", description="Flat with a pool and wifi").save()
+Place(name="Pool house", description="Pool, pool and more pool").save()
+Place(name="Cabin", description="Quiet cabin in the woods").save()
+Review(text="Great pool").save()
+"""
+
+# Prints the names of the places found and the number of objects indexed
+# by the process (0 when the saved index is used)
+SEARCH = """
+from models import storage
+from models.engine.text_index import TextIndex
+puts = []
+put = TextIndex.put
+TextIndex.put = lambda self, *args: puts.append(1) or put(self, *args)
+for query in ["pool", "cabin OR sea", "swim*"]:
+    print(query, [obj.name for obj in storage.search("Place", query).values()])
+print(len(puts))
+"""
+
+
+def bm25(texts, terms, key):
+    """Return the BM25 score of 'key' for 'terms', computed from every
+    text of 'texts'"""
+    documents = {key: [term for text in values if type(text) is str
+                       for term in tokenize(text)]
+                 for key, values in texts.items()}
+    documents = {key: terms for key, terms in documents.items() if terms}
+    average = sum(map(len, documents.values())) / len(documents)
+    score = 0.0
+    for term in terms:
+        holding = [k for k, document in documents.items()
+                   if term in document]
+        idf = math.log(1 + (len(documents) - len(holding) + 0.5) /
+                       (len(holding) + 0.5))
+        frequency = documents[key].count(term)
+        score += idf * frequency * (text_index.K1 + 1) / (
+            frequency + text_index.K1 * (
+                1 - text_index.B + text_index.B *
+                len(documents[key]) / average))
+    return score
+
+
+class TestTextIndex(unittest.TestCase):
+    """Tests of TextIndex"""
+
+    def setUp(self):
+        self.index = TextIndex()
+        for key, texts in TEXTS.items():
+            self.index.put(key, texts)
+
+    def keys(self, query, limit=None):
+        """Return the keys matching 'query', best first"""
+        return [key for key, _ in self.index.search(query, limit)]
+
+    def test_tokenize(self):
+        """Terms are the words of a text in lower case"""
+        self.assertEqual(tokenize("Pool, POOL_2 & café!"),
+                         ["pool", "pool_2", "café"])
+
+    def test_queries(self):
+        """Words, AND, OR and prefixes select the matching objects"""
+        self.assertEqual(sorted(self.keys("wifi")), ["Place.1", "Place.3"])
+        self.assertEqual(self.keys("wifi pool"), ["Place.1"])
+        self.assertEqual(self.keys("wifi AND pool"), ["Place.1"])
+        self.assertEqual(sorted(self.keys("cabin OR sea")),
+                         ["Place.1", "Place.3"])
+        self.assertEqual(sorted(self.keys("woods wifi OR roof")),
+                         ["Place.3", "Place.4"])
+        self.assertEqual(self.keys("swim*"), ["Place.4"])
+        self.assertEqual(self.keys("Sea-view"), ["Place.1"])
+        for query in ["", "unknown", "!!", "OR", "pool unknown"]:
+            self.assertEqual(self.keys(query), [])
+
+    def test_ranking(self):
+        """Matching objects are ranked by BM25 score"""
+        for query, terms in [("pool", ["pool"]), ("pool OR wifi",
+                                                  ["pool", "wifi"])]:
+            results = self.index.search(query)
+            for key, score in results:
+                self.assertAlmostEqual(score, bm25(TEXTS, terms, key))
+            self.assertEqual(results, sorted(
+                results, key=lambda item: (-item[1], item[0])))
+        self.assertEqual(self.keys("pool")[0], "Place.2")
+        self.assertEqual(self.keys("pool", limit=2),
+                         self.keys("pool")[:2])
+
+    def test_put_remove(self):
+        """Objects indexed again or removed are searched as they are"""
+        self.assertFalse(self.index.put("Place.1", ["sea VIEW",
+                                                    "flat with a pool, "
+                                                    "and wifi"]))
+        self.assertTrue(self.index.put("Place.1", ["Sea view"]))
+        self.assertEqual(self.keys("wifi"), ["Place.3"])
+        self.index.remove("Place.3")
+        self.index.remove("Place.missing")
+        self.assertEqual(self.keys("wifi OR cabin"), [])
+        self.assertEqual(self.keys("swim*"), ["Place.4"])
+        self.assertNotIn("Place.5", self.index.documents)
+
+    def test_to_json(self):
+        """An index rebuilt from to_json() finds the same objects with
+        the same scores"""
+        saved = TextIndex(self.index.to_json())
+        for query in ["pool", "wifi OR cabin", "s*"]:
+            self.assertEqual(saved.search(query), self.index.search(query))
+
+
+class TestSaved(unittest.TestCase):
+    """Tests of the indexes saved next to the storage file"""
+
+    def test_dump_load(self):
+        """Saved indexes are loaded only for the state they match"""
+        index = TextIndex()
+        for key, texts in TEXTS.items():
+            index.put(key, texts)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "file.json")
+            self.assertIsNone(text_index.load(path, (1, 2, 3)))
+            text_index.dump(path, (1, 2, 3), {"Place": index})
+            loaded = text_index.load(path, (1, 2, 3))
+            self.assertEqual(loaded["Place"].search("pool"),
+                             index.search("pool"))
+            self.assertIsNone(text_index.load(path, (1, 2, 4)))
+            self.assertIsNone(text_index.load(path, None))
+            with open(text_index.index_path(path), "r+") as f:
+                f.seek(os.path.getsize(text_index.index_path(path)) // 2)
+                f.truncate()
+            self.assertIsNone(text_index.load(path, (1, 2, 3)))
+
+
+class TestSearch(unittest.TestCase):
+    """Tests of storage.search() across restarts"""
+
+    def test_search(self):
+        """The index saved on exit is used after a restart, is rebuilt
+        once another process changed the storage file, and follows the
+        objects updated or deleted"""
+        with tempfile.TemporaryDirectory() as directory:
+            expected = ("pool ['Pool house', 'Sea view']\n"
+                        "cabin OR sea ['Cabin', 'Sea view']\n"
+                        "swim* []\n")
+            self.assertEqual(run(SETUP + SEARCH, directory), expected + "3\n")
+            self.assertTrue(os.path.exists(os.path.join(directory,
+                                                        "file.json.text")))
+            self.assertEqual(run(SEARCH, directory), expected + "0\n")
+            run("from models.place import Place\n"
+                "Place(name='Swimming pool').save()\n", directory)
+            self.assertEqual(run(SEARCH, directory),
+                             "pool ['Pool house', 'Swimming pool', "
+                             "'Sea view']\n"
+                             "cabin OR sea ['Cabin', 'Sea view']\n"
+                             "swim* ['Swimming pool']\n"
+                             "4\n")
+            changed = ("pool ['Pool house', 'Swimming pool']\n"
+                       "cabin OR sea ['Sea view']\n"
+                       "swim* ['Swimming pool']\n")
+            self.assertEqual(run(
+                "from models import storage\n"
+                "storage.search('Place', 'pool')\n"
+                "for place in storage.all('Place').values():\n"
+                "    if place.name == 'Sea view':\n"
+                "        place.description = 'Flat by the sea'\n"
+                "        place.save()\n"
+                "storage.delete([key for key, obj in "
+                "storage.all('Place').items() if obj.name == 'Cabin'][0])\n"
+                + SEARCH, directory), changed + "0\n")
+            self.assertEqual(run(SEARCH, directory), changed + "0\n")
+            self.assertEqual(run(
+                "from models import storage\n"
+                "print(list(storage.search('Review', 'pool')) == "
+                "list(storage.all('Review')))\n", directory), "True\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of storage.update() and of the update
+commands of the console using it
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from tests.test_models.test_engine import REPO, run
+
+SETUP = """
+from models import storage
+from models.place import Place
+place = Place(name="flat", city_id="c1", number_rooms=2)
+place.save()
+open("id", "w").write(place.id)
+"""
+
+UPDATE = """
+from models import storage
+commits = []
+commit = storage._commit
+
+
+def counted_commit():
+    commits.append(1)
+    commit()
+
+
+storage._commit = counted_commit
+key = "Place." + open("id").read()
+place = storage.get("Place", key.split(".")[1])
+storage.where("Place", [("number_rooms", ">", 0)])
+updated_at = place.updated_at
+obj = storage.update(key, name="house", city_id="c2", number_rooms=5)
+print(obj is place, len(commits), place.updated_at > updated_at)
+print(len(storage.find_by("Place", "city_id", "c1")),
+      len(storage.find_by("Place", "city_id", "c2")),
+      len(storage.where("Place", [("number_rooms", "==", 5)])))
+print(storage.update("Place.missing", name="x"), len(commits))
+for attrs in [{"id": "1"}, {"name": "x", "created_at": None}]:
+    try:
+        storage.update(key, **attrs)
+    except ValueError as e:
+        print(e)
+print(place.name, len(commits))
+"""
+
+RESTART = """
+from models import storage
+place = storage.get("Place", open("id").read())
+print(place.name, place.city_id, place.number_rooms,
+      len(storage.find_by("Place", "city_id", "c2")))
+"""
+
+
+class TestUpdate(unittest.TestCase):
+    """Tests of storage.update()"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        run(SETUP, self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_update(self):
+        """The stored object is changed in place and saved once, its
+        indexes follow, and the changes are kept after a restart"""
+        self.assertEqual(run(UPDATE, self.directory.name),
+                         "True 1 True\n"
+                         "0 1 1\n"
+                         "None 1\n"
+                         "id can't be updated\n"
+                         "created_at can't be updated\n"
+                         "house 1\n")
+        self.assertEqual(run(RESTART, self.directory.name),
+                         "house c2 5 1\n")
+
+    def test_console(self):
+        """The update commands of the console cast the values like
+        before and save them"""
+        with open(os.path.join(self.directory.name, "id")) as f:
+            place_id = f.read()
+        commands = (f'update Place {place_id} number_rooms "7"\n'
+                    f'update Place {place_id} latitude 1.5\n'
+                    f'update Place {place_id} city_id c2\n'
+                    f'Place.update("{place_id}", {{"name": "house", '
+                    f'"max_guest": 3}})\n'
+                    f'update Place {place_id} id 1\n')
+        result = subprocess.run(
+            [sys.executable, os.path.join(REPO, "console.py")],
+            cwd=self.directory.name, input=commands, capture_output=True,
+            text=True, check=True)
+        self.assertNotIn("**", result.stdout)
+        self.assertEqual(run(RESTART + "print(place.latitude, "
+                             "place.max_guest)\n", self.directory.name),
+                         "house c2 7 1\n1.5 3\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
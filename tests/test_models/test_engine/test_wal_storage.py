@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+
+"""
+In this module defines the tests of the recovery of WALStorage
+(HBNB_TYPE_STORAGE=wal) after a process was killed while writing
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from models.engine.wal_storage import list_files
+from tests.test_models.test_engine import run
+from tests.test_models.test_engine.test_atomic_file import KILLED
+from tests.test_models.test_engine.test_journal_storage import COUNT, SAVE
+
+
+class TestRecovery(unittest.TestCase):
+    """Tests of the recovery of the snapshots and log files"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "file.wal")
+        # A snapshot every 3 records: 2 snapshots and a record in the
+        # log
+        self.run_engine(SAVE.format(count=7))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_engine(self, script, check=True):
+        """Run 'script' in a new process with the wal engine"""
+        return run(script, self.directory.name, check,
+                   HBNB_TYPE_STORAGE="wal", HBNB_SNAPSHOT_RECORDS="3")
+
+    def test_partial_record(self):
+        """A record partially appended is skipped, a new log is
+        started and the next records are read"""
+        with open(self.path, "a") as f:
+            f.write('{"lsn": 8, "at": "2024-01-01T00:00:00.000000", "o')
+        self.assertEqual(self.run_engine(COUNT), "7\n")
+        with open(self.path) as f:
+            self.assertEqual([json.loads(line) for line in f], [])
+        self.run_engine(SAVE.format(count=1))
+        self.assertEqual(self.run_engine(COUNT), "8\n")
+
+    def test_damaged_snapshot(self):
+        """A damaged snapshot is skipped: the previous snapshot and the
+        archived logs are read instead"""
+        snapshots = list_files(self.path)[0]
+        self.assertEqual(len(snapshots), 2)
+        with open(snapshots[-1][1], "r+") as f:
+            f.truncate(20)
+        self.assertEqual(self.run_engine("import warnings\n"
+                                         "warnings.simplefilter('ignore')\n"
+                                         + COUNT), "7\n")
+
+    def test_killed_checkpoint(self):
+        """The changes are kept if the process is killed while taking
+        a snapshot"""
+        self.run_engine(KILLED.replace("file_storage", "wal_storage") +
+                        "from models import storage\n"
+                        "from models.user import User\n"
+                        "User()\n"
+                        "storage.checkpoint()\n", check=False)
+        self.assertEqual(self.run_engine(COUNT), "8\n")
+        self.assertEqual(len(list_files(self.path)[0]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
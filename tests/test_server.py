@@ -0,0 +1,148 @@
+#!/usr/bin/python3
+
+"""
+In this module defines unittest cases for server (HBNBServer), run in
+a new process on a Unix socket in a temporary directory
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Server with a small MAX_LINE
+SERVER = f"""
+import asyncio
+import sys
+sys.path.insert(0, {REPO!r})
+from server import HBNBServer
+HBNBServer.MAX_LINE = 1000
+asyncio.run(HBNBServer("hbnb.sock").serve_forever())
+"""
+
+
+class Client:
+    """Client of the server reading the responses to its commands"""
+
+    def __init__(self, path):
+        self.socket = socket.socket(socket.AF_UNIX)
+        self.socket.settimeout(10)
+        self.socket.connect(path)
+        self.data = b""
+
+    def send(self, *lines):
+        """Send the commands 'lines' at once"""
+        self.socket.sendall("".join(line + "\n" for line in lines).encode())
+
+    def receive(self):
+        """Return the output of the next command, or None if the server
+        closed the connection"""
+        while b"\n" not in self.data:
+            data = self.socket.recv(4096)
+            if not data:
+                return None
+            self.data += data
+        size, self.data = self.data.split(b"\n", 1)
+        while len(self.data) < int(size):
+            self.data += self.socket.recv(4096)
+        output, self.data = self.data[:int(size)], self.data[int(size):]
+        return output.decode()
+
+    def close(self):
+        self.socket.close()
+
+
+class TestServer(unittest.TestCase):
+    """Impliment unittest cases for HBNBServer"""
+
+    def setUp(self):
+        """Start the server in a temporary directory"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "hbnb.sock")
+        self.server = subprocess.Popen([sys.executable, "-c", SERVER],
+                                       cwd=self.tmp.name)
+        for _ in range(200):
+            if os.path.exists(self.path):
+                break
+            time.sleep(0.05)
+        self.clients = []
+
+    def tearDown(self):
+        """Stop the server and remove the temporary directory"""
+        for client in self.clients:
+            client.close()
+        self.server.terminate()
+        self.server.wait()
+        self.tmp.cleanup()
+
+    def connect(self):
+        """Return a new client of the server"""
+        client = Client(self.path)
+        self.clients.append(client)
+        return client
+
+    def saved(self):
+        """Return the keys of the objects saved in file.json"""
+        with open(os.path.join(self.tmp.name, "file.json")) as f:
+            return set(json.load(f))
+
+    def test_pipeline(self):
+        """Test that pipelined commands get their responses in order"""
+        client = self.connect()
+        client.send("create User", "User.count()", "User.all()",
+                    "show User missing", "quit")
+        user_id = client.receive().strip()
+        self.assertEqual(len(user_id), 36)
+        self.assertEqual(client.receive(), "1\n")
+        self.assertIn(user_id, client.receive())
+        self.assertEqual([client.receive(), client.receive()],
+                         ["** no instance found **\n", ""])
+        self.assertIsNone(client.receive())
+
+    def test_error(self):
+        """Test that a command error is a response, and the client can
+        send other commands"""
+        client = self.connect()
+        client.send("create Nothing", "Nothing.update(x y z)",
+                    "User.count()")
+        self.assertEqual([client.receive() for _ in range(3)],
+                         ["** class doesn't exist **\n",
+                          "*** Unknown syntax: Nothing.update(x y z)\n",
+                          "0\n"])
+
+    def test_batch(self):
+        """Test that a batch of a client is committed once its commands
+        have run, without deferring the changes of other clients, and
+        when the client disconnects before commit"""
+        client = self.connect()
+        client.send("begin", "create User")
+        client.receive()
+        user_id = client.receive().strip()
+        self.assertIn(f"User.{user_id}", self.saved())
+        other = self.connect()
+        other.send("create State")
+        state_id = other.receive().strip()
+        self.assertIn(f"State.{state_id}", self.saved())
+        client.send("create City")
+        city_id = client.receive().strip()
+        client.close()
+        self.assertIn(f"City.{city_id}", self.saved())
+
+    def test_max_line(self):
+        """Test that a client sending a line longer than MAX_LINE is
+        disconnected"""
+        client = self.connect()
+        client.socket.sendall(b"x" * 2000)
+        self.assertIsNone(client.receive())
+        client = self.connect()
+        client.send("User.count()")
+        self.assertEqual(client.receive(), "0\n")
+
+
+if __name__ == "__main__":
+    unittest.main()